@@ -18,6 +18,10 @@ try:
         CORS_ORIGINS, CORS_ALLOW_CREDENTIALS, CORS_ALLOW_METHODS, CORS_ALLOW_HEADERS
     )
     from app.utils import save_usage_stats, increment_request_count, increment_tool_usage, get_tool_key_from_path
+    from app.utils.http_client import close_http_client
+    from app.utils.monitor import monitor
+    from app.utils.images import shutdown_image_executor
+    from app.utils.hashing import shutdown_hash_pools
     from app.api import health, developer, security, data
 except ImportError as e:
     print(f"Import error: {e}")
@@ -28,6 +32,10 @@ except ImportError as e:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     yield
+    await monitor.stop()
+    await close_http_client()
+    shutdown_image_executor()
+    shutdown_hash_pools()
     save_usage_stats()
 
 app = FastAPI(
@@ -1,13 +1,30 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+import asyncio
 import json
 import csv
 import io
 import random
 from faker import Faker
-import re
 import secrets
-from typing import Optional
+from typing import List, Optional
+
+from ..config import (
+    MAX_SQL_FINGERPRINTS,
+    MAX_SQL_INDENT,
+    MAX_SQL_NORMALIZE_BATCH,
+    MAX_SQL_REPORT_TOP,
+    MAX_SQL_UPLOAD_BYTES,
+    MAX_SQL_WIDTH,
+    MIN_SQL_WIDTH,
+    SQL_RESERVOIR_SIZE,
+    SQL_STREAM_BATCH,
+    SQL_STREAM_CHUNK,
+)
+from ..utils.query_log import LOG_FORMATS, SORT_KEYS, aggregate_log
+from ..utils.sql import DIALECTS, fingerprint_query, format_sql, minify_sql, stream_minify, stream_split
+from ..utils.uploads import spool_upload
 
 class CsvPayload(BaseModel):
     csv: str = None
@@ -19,9 +36,19 @@ class JsonPayload(BaseModel):
 class SqlPayload(BaseModel):
     query: str = None
     data: str = None  # Alternative field name from frontend
+    dialect: str = "generic"  # generic, postgresql, mysql, sqlite, tsql
+    keyword_case: str = "upper"  # upper, lower, preserve
+    indent: int = Field(2, ge=0, le=MAX_SQL_INDENT)
+    width: int = Field(80, ge=MIN_SQL_WIDTH, le=MAX_SQL_WIDTH)
 
 class SqlMinifyPayload(BaseModel):
     query: str
+    dialect: str = "generic"
+
+class SqlNormalizePayload(BaseModel):
+    query: str = None
+    queries: List[str] = Field(None, max_length=MAX_SQL_NORMALIZE_BATCH)
+    dialect: str = "generic"
 
 class BaseConvertPayload(BaseModel):
     value: str
@@ -81,60 +108,13 @@ async def sql_format(payload: SqlPayload):
         if not sql_data:
             raise ValueError("SQL query is required")
 
-        keywords = [
-            "SELECT",
-            "FROM",
-            "WHERE",
-            "AND",
-            "OR",
-            "JOIN",
-            "LEFT",
-            "RIGHT",
-            "INNER",
-            "OUTER",
-            "ON",
-            "GROUP BY",
-            "ORDER BY",
-            "HAVING",
-            "LIMIT",
-            "INSERT",
-            "INTO",
-            "VALUES",
-            "UPDATE",
-            "SET",
-            "DELETE",
-            "CREATE",
-            "TABLE",
-            "INDEX",
-            "DROP",
-            "ALTER",
-            "AS",
-            "DISTINCT",
-            "UNION",
-            "ALL",
-        ]
-
-        formatted = " ".join(sql_data.split())
-
-        for kw in [
-            "SELECT",
-            "FROM",
-            "WHERE",
-            "JOIN",
-            "LEFT JOIN",
-            "RIGHT JOIN",
-            "INNER JOIN",
-            "GROUP BY",
-            "ORDER BY",
-            "HAVING",
-            "LIMIT",
-            "AND",
-            "OR",
-        ]:
-            formatted = formatted.replace(f" {kw} ", f"\n{kw} ")
-            formatted = formatted.replace(f" {kw.lower()} ", f"\n{kw} ")
-
-        formatted = formatted.strip()
+        formatted = format_sql(
+            sql_data,
+            dialect=payload.dialect,
+            indent=payload.indent,
+            keyword_case=payload.keyword_case,
+            width=payload.width,
+        )
 
         return {"success": True, "formatted": formatted}
     except Exception as e:
@@ -143,13 +123,96 @@ async def sql_format(payload: SqlPayload):
 @router.post("/sql/minify")
 async def sql_minify(payload: SqlMinifyPayload):
     try:
-        q = re.sub(r"/\*.*?\*/", "", payload.query, flags=re.S)
-        q = re.sub(r"--.*", "", q)
-        q = " ".join(q.split())
-        return {"success": True, "minified": q.strip()}
+        q = minify_sql(payload.query, dialect=payload.dialect)
+        return {"success": True, "minified": q}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/sql/minify/stream")
+async def sql_minify_stream(request: Request, dialect: str = Query("generic")):
+    """Minify an uploaded script statement by statement, one per output line."""
+    if dialect not in DIALECTS:
+        raise HTTPException(status_code=400, detail=f"dialect must be one of {', '.join(DIALECTS)}")
+    fileobj, _ = await spool_upload(request, max_bytes=MAX_SQL_UPLOAD_BYTES)
+    fileobj.seek(0)
+
+    def generate():
+        try:
+            yield from stream_minify(fileobj, dialect, SQL_STREAM_CHUNK, SQL_STREAM_BATCH)
+        finally:
+            fileobj.close()
+
+    return StreamingResponse(generate(), media_type="application/sql")
+
+@router.post("/sql/split")
+async def sql_split(
+    request: Request,
+    dialect: str = Query("generic"),
+    minify: bool = Query(False),
+):
+    """Split an uploaded script into statements, streamed as NDJSON."""
+    if dialect not in DIALECTS:
+        raise HTTPException(status_code=400, detail=f"dialect must be one of {', '.join(DIALECTS)}")
+    fileobj, _ = await spool_upload(request, max_bytes=MAX_SQL_UPLOAD_BYTES)
+    fileobj.seek(0)
+
+    def generate():
+        try:
+            yield from stream_split(fileobj, dialect, minify, SQL_STREAM_CHUNK, SQL_STREAM_BATCH)
+        finally:
+            fileobj.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@router.post("/sql/normalize")
+async def sql_normalize(payload: SqlNormalizePayload):
+    try:
+        queries = payload.queries if payload.queries is not None else [payload.query] if payload.query else []
+        if not queries:
+            raise ValueError("query or queries is required")
+        if payload.dialect not in DIALECTS:
+            raise ValueError(f"dialect must be one of {', '.join(DIALECTS)}")
+
+        def normalize():
+            results = []
+            for query in queries:
+                fingerprint, normalized = fingerprint_query(query.strip(), payload.dialect)
+                results.append({"query": query, "normalized": normalized, "fingerprint": fingerprint})
+            return results
+
+        results = await asyncio.to_thread(normalize)
+        return {"success": True, "count": len(results), "results": results}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/sql/analyze")
+async def sql_analyze(
+    request: Request,
+    format: str = Query("auto"),
+    dialect: str = Query("generic"),
+    top: int = Query(50, ge=1, le=MAX_SQL_REPORT_TOP),
+    sort: str = Query("total"),
+):
+    """Aggregate an uploaded query log (MySQL slow log, PostgreSQL log, NDJSON
+    or a plain SQL script) by fingerprint."""
+    if format not in LOG_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(LOG_FORMATS)}")
+    if dialect not in DIALECTS:
+        raise HTTPException(status_code=400, detail=f"dialect must be one of {', '.join(DIALECTS)}")
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SORT_KEYS)}")
+    fileobj, _ = await spool_upload(request, max_bytes=MAX_SQL_UPLOAD_BYTES)
+    fileobj.seek(0)
+
+    def analyze():
+        try:
+            return aggregate_log(fileobj, format, dialect, top, sort, MAX_SQL_FINGERPRINTS, SQL_RESERVOIR_SIZE)
+        finally:
+            fileobj.close()
+
+    report = await asyncio.to_thread(analyze)
+    return {"success": True, **report}
+
 @router.post("/fake/generate")
 async def fake_data_generate(payload: FakeDataPayload):
     try:
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Union
 import base64
+import importlib.util
 import json
 import uuid
 import re
@@ -9,10 +11,88 @@ import hashlib
 import html
 import urllib.parse
 import io
+import time
+import asyncio
+import zipfile
 from datetime import datetime, timedelta
 from difflib import unified_diff, HtmlDiff
 import os
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+
+from ..config import (
+    MAX_PING_URLS,
+    MAX_PING_SAMPLES,
+    MAX_PING_CONCURRENCY,
+    MONITOR_MAX_TARGETS,
+    MONITOR_MIN_INTERVAL,
+    MAX_IMAGE_SIZES,
+    MAX_UUID_COUNT,
+    MAX_UUID_STREAM_COUNT,
+    MAX_UUID_NAMES,
+    UUID_STREAM_BATCH,
+    MAX_UUID_VALIDATE_BATCH,
+    MAX_JWT_BATCH,
+    MAX_CRON_RUNS,
+    MAX_CRON_EXPRESSIONS,
+    MAX_CRON_WINDOW_RUNS,
+    MAX_CRON_TOTAL_RUNS,
+    MAX_CRON_OVERLAPS,
+    MAX_CRONTAB_LINES,
+    MAX_CRON_ANALYZE_MINUTES,
+    MAX_TIMESTAMP_BATCH,
+    MAX_TIMESTAMP_UPLOAD_BYTES,
+    TIMESTAMP_STREAM_BATCH,
+    MAX_SLUG_BATCH,
+    MAX_SLUG_EXISTING,
+)
+from ..utils.cron import get_schedule as get_cron_schedule, get_timezone as get_cron_timezone, overlapping_pairs
+from ..utils.crontab import analyze_crontab, parse_crontab
+from ..utils.hmac_keys import decode_value
+from ..utils.jwt_tokens import (
+    SUPPORTED_ALGORITHMS as JWT_ALGORITHMS,
+    KeySet as JwtKeySet,
+    b64url_decode,
+    jwks_cache,
+    key_from_pem,
+    key_from_secret,
+    verify_token as verify_jwt,
+    verify_tokens as verify_jwts,
+)
+from ..utils.http_client import latency_stats, ping_method, ping_many, ping_once
+from ..utils.monitor import monitor
+from ..utils.slugs import slugify, slugify_batch
+from ..utils.timestamps import (
+    ColumnParser,
+    Formatter as TimestampFormatter,
+    check_csv_columns,
+    convert_values as convert_timestamps,
+    get_zone,
+    stream_convert as stream_timestamps,
+)
+from ..utils.uploads import read_upload, read_uploads, spool_upload
+from ..utils.uuids import (
+    UUID_KINDS,
+    generate as generate_uuids,
+    generate_batches as generate_uuid_batches,
+    resolve_namespace,
+    uuid5_batch,
+    validate_ids,
+)
+from ..utils.images import (
+    IMAGE_FORMATS,
+    RESAMPLE_FILTERS,
+    FIT_MODES,
+    parse_sizes,
+    render_sizes,
+    run_image_job,
+    expand_image_uploads,
+    safe_archive_name,
+    derivative_cache,
+    size_label,
+    unique_archive_name,
+    attachment_header,
+    image_format,
+)
 
 class JsonPayload(BaseModel):
     data: str = Field(..., description="JSON string to process")
@@ -27,6 +107,11 @@ class YamlPayload(BaseModel):
 class TextPayload(BaseModel):
     data: str = Field(..., description="Text data to process")
 
+class UuidNamesPayload(BaseModel):
+    names: List[str] = Field(..., min_length=1, max_length=MAX_UUID_NAMES)
+    namespace: Optional[str] = Field("dns", description="dns, url, oid, x500 or a UUID")
+    format: str = Field("json", description="json or ndjson")
+
 class TextPair(BaseModel):
 
     a: str = Field(..., description="First text")
@@ -57,14 +142,75 @@ class JWTPayload(BaseModel):
 
     token: str = Field(..., description="JWT token to decode")
 
+class JwtVerifyPayload(BaseModel):
+    token: Optional[str] = Field(None, description="Single JWT to verify")
+    tokens: List[str] = Field(default_factory=list, max_length=MAX_JWT_BATCH, description="Batch of JWTs")
+    key: Optional[str] = Field(None, description="HMAC secret, PEM public key or certificate")
+    key_encoding: str = Field("utf-8", description="Encoding of an HMAC secret: utf-8, hex or base64")
+    jwks: Optional[dict] = Field(None, description="JWKS document")
+    jwks_file: Optional[str] = Field(None, description="JWKS file name in the server's JWKS directory")
+    algorithms: Optional[List[str]] = Field(None, description="Allowed algorithms (default: all supported)")
+    audience: Optional[str] = None
+    issuer: Optional[str] = None
+    leeway: int = Field(0, ge=0, le=86400, description="Clock skew allowance in seconds")
+    require: List[str] = Field(default_factory=list, description="Claims that must be present, e.g. exp")
+
+class TimestampBatchPayload(BaseModel):
+    values: List[Union[str, int, float]] = Field(..., min_length=1, max_length=MAX_TIMESTAMP_BATCH)
+    from_format: str = Field("auto", description="auto, unix, unix_ms, unix_us, unix_ns, iso or rfc2822")
+    timezone: str = Field("UTC", description="IANA timezone for the output")
+    assume_timezone: str = Field("UTC", description="Timezone for inputs without an offset")
+    output: str = Field("iso", description="iso, unix, unix_ms, unix_us, unix_ns or rfc2822")
+    pattern: Optional[str] = Field(None, description="strftime pattern; overrides output")
+
 class CronPayload(BaseModel):
 
     expression: str = Field(..., description="Cron expression (5 or 6 fields)")
     count: Optional[int] = Field(5, description="Number of next run times to return")
+    timezone: str = Field("UTC", description="IANA timezone the expression is evaluated in")
+    start: Optional[str] = Field(None, description="ISO start time (default: now)")
+    direction: str = Field("next", description="next or prev")
+
+class CronSchedulePayload(BaseModel):
+    expressions: List[str] = Field(..., min_length=1, max_length=MAX_CRON_EXPRESSIONS)
+    timezone: str = Field("UTC", description="IANA timezone the expressions are evaluated in")
+    start: Optional[str] = Field(None, description="ISO start time (default: now)")
+    end: Optional[str] = Field(None, description="ISO end time; returns every run in [start, end)")
+    count: int = Field(10, ge=1, le=MAX_CRON_RUNS, description="Runs per expression when no end is given")
+    direction: str = Field("next", description="next or prev (ignored when end is given)")
+    detect_overlaps: bool = True
+
+class CrontabAnalyzePayload(BaseModel):
+    crontab: str = Field(..., description="Crontab contents, one job per line")
+    timezone: str = Field("UTC", description="IANA timezone the crontab runs in")
+    start: Optional[str] = Field(None, description="ISO window start (default: now)")
+    end: Optional[str] = Field(None, description="ISO window end (default: start + 1 day)")
+    system: Optional[bool] = Field(None, description="System crontab with a user column (default: guess)")
+    threshold: int = Field(2, ge=2, description="Jobs per minute that count as a hotspot")
+    top: int = Field(20, ge=1, le=500, description="Hotspots to return")
+    suggest: bool = Field(True, description="Suggest minute offsets that flatten the load")
 
 class HttpPingPayload(BaseModel):
 
-    url: str = Field(..., description="URL to ping")
+    url: Optional[str] = Field(None, description="URL to ping")
+    urls: Optional[List[str]] = Field(
+        None, description="Several URLs to ping concurrently"
+    )
+    method: Optional[str] = Field("GET", description="HTTP method")
+    timeout: Optional[float] = Field(10.0, description="Request timeout in seconds")
+    samples: int = Field(
+        1, ge=1, le=MAX_PING_SAMPLES, description="Number of requests per URL"
+    )
+    concurrency: int = Field(
+        10, ge=1, le=MAX_PING_CONCURRENCY, description="Maximum requests in flight"
+    )
+
+class MonitorTargetPayload(BaseModel):
+
+    url: str = Field(..., description="URL to check")
+    interval: float = Field(
+        60.0, ge=MONITOR_MIN_INTERVAL, description="Seconds between checks"
+    )
     method: Optional[str] = Field("GET", description="HTTP method")
     timeout: Optional[float] = Field(10.0, description="Request timeout in seconds")
 
@@ -130,6 +276,16 @@ class SlugPayload(BaseModel):
     text: str = Field(..., description="Text to convert to slug")
     separator: Optional[str] = Field("-", description="Word separator")
     lowercase: Optional[bool] = Field(True, description="Convert to lowercase")
+    transliterate: bool = Field(True, description="Romanize Cyrillic, Greek, Hangul, kana and other scripts")
+    max_length: Optional[int] = Field(None, ge=1, description="Truncate at a word boundary")
+
+class SlugBatchPayload(BaseModel):
+    titles: List[str] = Field(..., min_length=1, max_length=MAX_SLUG_BATCH)
+    existing: List[str] = Field(default_factory=list, max_length=MAX_SLUG_EXISTING, description="Slugs already taken")
+    separator: str = Field("-", description="Word separator")
+    lowercase: bool = Field(True, description="Convert to lowercase")
+    transliterate: bool = Field(True, description="Romanize non-Latin scripts")
+    max_length: Optional[int] = Field(None, ge=1, description="Maximum slug length, suffix included")
 
 class NumberBasePayload(BaseModel):
 
@@ -160,9 +316,6 @@ class ImageResizePayload(BaseModel):
     format: Optional[str] = Field("jpeg", description="jpeg/png/webp")
     quality: Optional[int] = Field(80, ge=1, le=100)
 
-    format: Optional[str] = Field("jpeg", description="jpeg/png/webp")
-    quality: Optional[int] = Field(80, ge=1, le=100)
-
 router = APIRouter()
 
 @router.post(
@@ -839,39 +992,81 @@ async def regex_replace(payload: RegexPayload):
     "/uuid/generate", summary="Generate UUID", description="Generate a new UUID"
 )
 async def uuid_generate(
-    version: int = Query(4, description="UUID version: 1, 4, or 5"),
-    count: int = Query(1, description="Number of UUIDs to generate (max 100)"),
+    version: str = Query("4", description="UUID version: 1, 4, 5, 6, 7 or ulid"),
+    count: int = Query(1, description=f"Number of UUIDs to generate (max {MAX_UUID_COUNT})"),
     namespace: Optional[str] = Query(
-        None, description="Namespace for UUID5 (dns, url, oid, x500)"
+        None, description="Namespace for UUID5 (dns, url, oid, x500 or a UUID)"
     ),
     name: Optional[str] = Query(None, description="Name for UUID5"),
 ):
-    count = min(count, 100)
-    uuids = []
-
-    for _ in range(count):
-        if version == 1:
-            new_uuid = str(uuid.uuid1())
-        elif version == 4:
-            new_uuid = str(uuid.uuid4())
-        elif version == 5:
+    version = version.lower()
+    count = max(1, min(count, MAX_UUID_COUNT))
+    try:
+        if version == "5":
             if not name:
                 raise HTTPException(status_code=400, detail="name required for UUID5")
-            ns_map = {
-                "dns": uuid.NAMESPACE_DNS,
-                "url": uuid.NAMESPACE_URL,
-                "oid": uuid.NAMESPACE_OID,
-                "x500": uuid.NAMESPACE_X500,
-            }
-            ns = ns_map.get(namespace, uuid.NAMESPACE_DNS)
-            new_uuid = str(uuid.uuid5(ns, name))
+            # The same name always maps to the same UUID.
+            uuids = uuid5_batch([name], resolve_namespace(namespace)) * count
+        elif count > 1000:
+            uuids = await asyncio.to_thread(generate_uuids, version, count)
         else:
-            new_uuid = str(uuid.uuid4())
-        uuids.append(new_uuid)
+            uuids = generate_uuids(version, count)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    label = int(version) if version.isdigit() else version
     if count == 1:
-        return {"success": True, "uuid": uuids[0], "version": version}
-    return {"success": True, "uuids": uuids, "count": len(uuids), "version": version}
+        return {"success": True, "uuid": uuids[0], "version": label}
+    return {"success": True, "uuids": uuids, "count": len(uuids), "version": label}
+
+@router.get(
+    "/uuid/generate/stream",
+    summary="Generate UUIDs in Bulk (streamed)",
+    description="Stream up to 10M UUIDs/ULIDs as plain text or NDJSON",
+)
+async def uuid_generate_stream(
+    version: str = Query("4", description="UUID version: 1, 4, 6, 7 or ulid"),
+    count: int = Query(1000, ge=1, le=MAX_UUID_STREAM_COUNT),
+    format: str = Query("text", description="text (one per line) or ndjson"),
+):
+    version = version.lower()
+    if version not in UUID_KINDS or version == "5":
+        raise HTTPException(status_code=400, detail="version must be 1, 4, 6, 7 or ulid")
+    if format not in ("text", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be text or ndjson")
+
+    def stream():
+        for batch in generate_uuid_batches(version, count, UUID_STREAM_BATCH):
+            if format == "ndjson":
+                yield "".join(f'{{"id": "{u}"}}\n' for u in batch)
+            else:
+                yield "\n".join(batch) + "\n"
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/plain"
+    return StreamingResponse(stream(), media_type=media_type, headers={"X-UUID-Count": str(count)})
+
+@router.post(
+    "/uuid/v5",
+    summary="Generate Name-Based UUIDs",
+    description="UUID5 for many names against one namespace",
+)
+async def uuid_v5_batch(payload: UuidNamesPayload):
+    try:
+        ns = resolve_namespace(payload.namespace)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    uuids = await asyncio.to_thread(uuid5_batch, payload.names, ns)
+    if payload.format == "ndjson":
+        return StreamingResponse(
+            (f"{json.dumps({'name': n, 'id': u})}\n" for n, u in zip(payload.names, uuids)),
+            media_type="application/x-ndjson",
+        )
+    return {
+        "success": True,
+        "namespace": str(ns),
+        "count": len(uuids),
+        "uuids": [{"name": n, "uuid": u} for n, u in zip(payload.names, uuids)],
+    }
 
 @router.post(
     "/uuid/validate",
@@ -891,6 +1086,33 @@ async def uuid_validate(payload: TextPayload):
     except ValueError:
         return {"success": True, "valid": False, "error": "Invalid UUID format"}
 
+@router.post(
+    "/uuid/validate/batch",
+    summary="Validate UUIDs in Bulk",
+    description="Validate a newline-separated list or uploaded file of UUIDs/ULIDs and extract embedded timestamps",
+)
+async def uuid_validate_batch(
+    request: Request,
+    invalid_only: bool = Query(False, description="Only return results for invalid ids"),
+):
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            text = TextPayload(**await request.json()).data
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Expected JSON body with a 'data' field")
+    else:
+        data, _ = await read_upload(request)
+        text = data.decode("utf-8", errors="replace")
+
+    lines = [line for line in text.lstrip("\ufeff").splitlines() if line.strip()]
+    if not lines:
+        raise HTTPException(status_code=400, detail="No ids found")
+    if len(lines) > MAX_UUID_VALIDATE_BATCH:
+        raise HTTPException(status_code=400, detail=f"Maximum ids per batch is {MAX_UUID_VALIDATE_BATCH}")
+
+    report = await asyncio.to_thread(validate_ids, lines, invalid_only)
+    return {"success": True, **report}
+
 @router.post(
     "/diff/text",
     summary="Text Diff",
@@ -955,26 +1177,17 @@ async def jwt_decode(payload: JWTPayload):
         if len(parts) < 2:
             raise ValueError("Invalid JWT structure - must have at least 2 parts")
 
-        header_b64 = parts[0]
-        header_b64 += "=" * (4 - len(header_b64) % 4)
-        header = json.loads(base64.urlsafe_b64decode(header_b64))
-
-        payload_b64 = parts[1]
-        payload_b64 += "=" * (4 - len(payload_b64) % 4)
-        body = json.loads(base64.urlsafe_b64decode(payload_b64))
+        header = json.loads(b64url_decode(parts[0]))
+        body = json.loads(b64url_decode(parts[1]))
 
+        now = time.time()
         exp_info = None
         if "exp" in body:
-            exp_time = datetime.fromtimestamp(body["exp"])
-            is_expired = datetime.utcnow() > exp_time
+            remaining = body["exp"] - now
             exp_info = {
-                "expires_at": exp_time.isoformat(),
-                "is_expired": is_expired,
-                "expires_in_seconds": (
-                    (exp_time - datetime.utcnow()).total_seconds()
-                    if not is_expired
-                    else None
-                ),
+                "expires_at": datetime.fromtimestamp(body["exp"]).isoformat(),
+                "is_expired": remaining < 0,
+                "expires_in_seconds": remaining if remaining >= 0 else None,
             }
 
         iat_info = None
@@ -993,41 +1206,93 @@ async def jwt_decode(payload: JWTPayload):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post(
+    "/jwt/verify",
+    summary="Verify JWT",
+    description="Verify HS/RS/PS/ES/EdDSA signatures and exp/nbf/aud/iss claims for one or many tokens",
+)
+async def jwt_verify(payload: JwtVerifyPayload):
+    tokens = ([payload.token] if payload.token else []) + payload.tokens
+    if not tokens:
+        raise HTTPException(status_code=400, detail="token or tokens required")
+    if len(tokens) > MAX_JWT_BATCH:
+        raise HTTPException(status_code=400, detail=f"Maximum tokens per batch is {MAX_JWT_BATCH}")
+    if payload.algorithms:
+        unknown = [a for a in payload.algorithms if a not in JWT_ALGORITHMS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unsupported algorithms: {', '.join(unknown)}")
+
+    try:
+        if payload.jwks is not None:
+            keys = jwks_cache.from_document(payload.jwks)
+        elif payload.jwks_file:
+            keys = jwks_cache.from_file(payload.jwks_file)
+        elif payload.key:
+            if payload.key.lstrip().startswith("-----BEGIN"):
+                keys = JwtKeySet([key_from_pem(payload.key)])
+            else:
+                keys = JwtKeySet([key_from_secret(decode_value(payload.key, payload.key_encoding))])
+        else:
+            raise HTTPException(status_code=400, detail="key, jwks or jwks_file required")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    options = {
+        "algorithms": payload.algorithms,
+        "audience": payload.audience,
+        "issuer": payload.issuer,
+        "leeway": payload.leeway,
+        "require": payload.require,
+    }
+    if payload.token and not payload.tokens:
+        return {"success": True, **verify_jwt(payload.token, keys, **options)}
+    report = await asyncio.to_thread(verify_jwts, tokens, keys, **options)
+    return {"success": True, "keys_loaded": len(keys), **report}
+
+def _cron_time(value: Optional[str], tz) -> datetime:
+    if not value:
+        return datetime.now(tz)
+    parsed = datetime.fromisoformat(value)
+    return parsed.replace(tzinfo=tz) if parsed.tzinfo is None else parsed
+
+def _cron_iso(t: datetime, tz_name: str) -> str:
+    # UTC results keep the naive format /cron/next has always returned.
+    return t.replace(tzinfo=None).isoformat() if tz_name.upper() == "UTC" else t.isoformat()
+
 @router.post(
     "/cron/next",
     summary="Cron Next Runs",
     description="Get next execution times for cron expression",
 )
 async def cron_next(payload: CronPayload):
+    if payload.direction not in ("next", "prev"):
+        raise HTTPException(status_code=400, detail="direction must be next or prev")
     try:
-        from croniter import croniter
-    except ImportError:
-        raise HTTPException(status_code=500, detail="croniter not installed")
+        tz = get_cron_timezone(payload.timezone)
+        schedule = get_cron_schedule(payload.expression)
+        now = _cron_time(payload.start, tz)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    try:
-        now = datetime.utcnow()
-        itr = croniter(payload.expression, now)
-        count = max(1, min(payload.count, 50))
-
-        times = []
-        for _ in range(count):
-            next_time = itr.get_next(datetime)
-            times.append(
-                {
-                    "datetime": next_time.isoformat(),
-                    "timestamp": int(next_time.timestamp()),
-                    "relative": get_relative_time(next_time, now),
-                }
-            )
+    count = max(1, min(payload.count or 5, MAX_CRON_RUNS))
+    if payload.direction == "prev":
+        runs = schedule.prev(count, now, tz)
+    else:
+        runs = schedule.next(count, now, tz)
 
-        return {
-            "success": True,
-            "expression": payload.expression,
-            "next_runs": times,
-            "timezone": "UTC",
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    times = []
+    for run in runs:
+        entry = {"datetime": _cron_iso(run, payload.timezone), "timestamp": int(run.timestamp())}
+        if payload.direction == "next":
+            entry["relative"] = get_relative_time(run, now)
+        times.append(entry)
+
+    return {
+        "success": True,
+        "expression": payload.expression,
+        "next_runs" if payload.direction == "next" else "previous_runs": times,
+        "timezone": payload.timezone,
+    }
 
 @router.post(
     "/cron/explain",
@@ -1035,61 +1300,244 @@ async def cron_next(payload: CronPayload):
     description="Get human-readable explanation of cron expression",
 )
 async def cron_explain(payload: CronPayload):
-    parts = payload.expression.split()
-    if len(parts) < 5:
-        raise HTTPException(
-            status_code=400, detail="Cron expression must have at least 5 fields"
-        )
-
-    explanations = {
-        "minute": explain_cron_field(parts[0], "minute", 0, 59),
-        "hour": explain_cron_field(parts[1], "hour", 0, 23),
-        "day_of_month": explain_cron_field(parts[2], "day of month", 1, 31),
-        "month": explain_cron_field(parts[3], "month", 1, 12),
-        "day_of_week": explain_cron_field(parts[4], "day of week", 0, 6),
-    }
+    try:
+        schedule = get_cron_schedule(payload.expression)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    explanations = schedule.explain()
     return {
         "success": True,
         "expression": payload.expression,
         "fields": explanations,
+        "values": schedule.values(),
         "summary": build_cron_summary(explanations),
     }
 
 @router.post(
-    "/http/ping", summary="HTTP Ping", description="Check URL response time and status"
+    "/cron/schedule",
+    summary="Cron Schedules",
+    description="Runs for many cron expressions at once, with overlap detection",
 )
-async def http_ping(payload: HttpPingPayload):
+async def cron_schedule(payload: CronSchedulePayload):
+    if payload.direction not in ("next", "prev"):
+        raise HTTPException(status_code=400, detail="direction must be next or prev")
     try:
-        import httpx
-    except ImportError:
-        raise HTTPException(status_code=500, detail="httpx not installed")
+        tz = get_cron_timezone(payload.timezone)
+        start = _cron_time(payload.start, tz)
+        end = _cron_time(payload.end, tz) if payload.end else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if end is not None and end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end is None and len(payload.expressions) * payload.count > MAX_CRON_TOTAL_RUNS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"expressions x count must not exceed {MAX_CRON_TOTAL_RUNS} runs",
+        )
 
-    try:
-        start = datetime.utcnow()
-        async with httpx.AsyncClient(
-            timeout=payload.timeout, follow_redirects=True
-        ) as client:
-            if payload.method.upper() == "HEAD":
-                resp = await client.head(payload.url)
+    def compute():
+        schedules, run_lists, by_time = [], [], {}
+        budget = MAX_CRON_TOTAL_RUNS
+        computed = {}  # repeated expressions share one compiled schedule
+        for index, expression in enumerate(payload.expressions):
+            try:
+                schedule = get_cron_schedule(expression)
+            except ValueError as e:
+                schedules.append({"expression": expression, "valid": False, "error": str(e)})
+                run_lists.append([])
+                continue
+            if end is not None:
+                # Windowed runs share one budget across all expressions.
+                limit = min(MAX_CRON_WINDOW_RUNS, budget)
+                runs = computed.get(schedule)
+                if runs is None or len(runs) > limit:
+                    runs = schedule.between(start, end, tz, limit) if limit else []
+            elif schedule in computed:
+                runs = computed[schedule]
+            elif payload.direction == "prev":
+                runs = schedule.prev(payload.count, start, tz)
             else:
-                resp = await client.get(payload.url)
-        elapsed = (datetime.utcnow() - start).total_seconds() * 1000
+                runs = schedule.next(payload.count, start, tz)
+            computed[schedule] = runs
+            budget -= len(runs)
+            entry = {
+                "expression": expression,
+                "valid": True,
+                "count": len(runs),
+                "runs": [_cron_iso(r, payload.timezone) for r in runs],
+            }
+            if end is not None:
+                entry["truncated"] = len(runs) >= limit
+            schedules.append(entry)
+            run_lists.append(runs)
+            if payload.detect_overlaps:
+                for run in runs:
+                    by_time.setdefault(run, []).append(index)
+
+        result = {"schedules": schedules}
+        if payload.detect_overlaps:
+            shared = sorted((t, idx) for t, idx in by_time.items() if len(idx) > 1)
+            pair_count, pairs = overlapping_pairs(run_lists, MAX_CRON_OVERLAPS)
+            result["overlap_count"] = len(shared)
+            result["overlaps"] = [
+                {"time": _cron_iso(t, payload.timezone), "expressions": [payload.expressions[i] for i in idx]}
+                for t, idx in shared[:MAX_CRON_OVERLAPS]
+            ]
+            result["overlapping_pair_count"] = pair_count
+            result["overlapping_pairs"] = [
+                {"a": payload.expressions[a], "b": payload.expressions[b], "shared_runs": n}
+                for a, b, n in pairs
+            ]
+        return result
+
+    result = await asyncio.to_thread(compute)
+    return {"success": True, "timezone": payload.timezone, **result}
+
+@router.post(
+    "/cron/analyze",
+    summary="Crontab Load Analysis",
+    description="Per-minute job density across a crontab, with hotspots, heatmaps and offset suggestions",
+)
+async def cron_analyze(payload: CrontabAnalyzePayload):
+    jobs = parse_crontab(payload.crontab, payload.system)
+    if not jobs:
+        raise HTTPException(status_code=400, detail="No cron jobs found")
+    if len(jobs) > MAX_CRONTAB_LINES:
+        raise HTTPException(status_code=400, detail=f"Maximum jobs per crontab is {MAX_CRONTAB_LINES}")
+    try:
+        tz = get_cron_timezone(payload.timezone)
+        start = _cron_time(payload.start, tz)
+        end = _cron_time(payload.end, tz) if payload.end else start + timedelta(days=1)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    window = (end - start).total_seconds() / 60
+    if window < 1 or window > MAX_CRON_ANALYZE_MINUTES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Window must be between 1 and {MAX_CRON_ANALYZE_MINUTES} minutes",
+        )
+
+    report = await asyncio.to_thread(
+        analyze_crontab, jobs, start, end, tz, payload.threshold, payload.top, payload.suggest
+    )
+    return {"success": True, "timezone": payload.timezone, "start": start.isoformat(), "end": end.isoformat(), **report}
 
+@router.post(
+    "/http/ping", summary="HTTP Ping", description="Check URL response time and status"
+)
+async def http_ping(payload: HttpPingPayload):
+    try:
+        method = ping_method(payload.method)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if payload.urls:
+        if len(payload.urls) > MAX_PING_URLS:
+            raise HTTPException(
+                status_code=400, detail=f"At most {MAX_PING_URLS} URLs per request"
+            )
+        start = time.perf_counter()
+        results = await ping_many(
+            payload.urls,
+            samples=payload.samples,
+            concurrency=payload.concurrency,
+            method=method,
+            timeout=payload.timeout,
+        )
         return {
             "success": True,
-            "url": payload.url,
-            "status_code": resp.status_code,
-            "status_text": resp.reason_phrase,
-            "response_time_ms": round(elapsed, 2),
-            "headers": dict(resp.headers),
-            "content_length": resp.headers.get("content-length"),
-            "content_type": resp.headers.get("content-type"),
-            "server": resp.headers.get("server"),
-            "redirects": len(resp.history),
+            "results": results,
+            "samples_per_url": payload.samples,
+            "concurrency": payload.concurrency,
+            "total_time_ms": round((time.perf_counter() - start) * 1000, 2),
         }
-    except Exception as e:
+
+    if not payload.url:
+        raise HTTPException(status_code=400, detail="url or urls is required")
+
+    samples = []
+    for _ in range(payload.samples):
+        samples.append(await ping_once(payload.url, method, payload.timeout))
+    ok = [s for s in samples if s["ok"]]
+    if not ok:
+        raise HTTPException(status_code=400, detail=samples[-1]["error"])
+
+    last = ok[-1]
+    return {
+        "success": True,
+        "url": payload.url,
+        "status_code": last["status_code"],
+        "status_text": last["status_text"],
+        "response_time_ms": last["elapsed_ms"],
+        "headers": last["headers"],
+        "content_length": last["headers"].get("content-length"),
+        "content_type": last["headers"].get("content-type"),
+        "server": last["headers"].get("server"),
+        "redirects": last["redirects"],
+        "timings": last["phases"],
+        "stats": latency_stats([s["elapsed_ms"] for s in ok]),
+        "errors": len(samples) - len(ok),
+    }
+
+@router.post(
+    "/monitor/targets",
+    summary="Add Monitor Target",
+    description="Register a URL to be checked on an interval",
+)
+async def monitor_add_target(payload: MonitorTargetPayload):
+    if not payload.url.startswith(("http://", "https://")):
+        raise HTTPException(status_code=400, detail="URL must start with http:// or https://")
+    try:
+        method = ping_method(payload.method)
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if len(monitor.targets) >= MONITOR_MAX_TARGETS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MONITOR_MAX_TARGETS} targets can be monitored"
+        )
+
+    target = monitor.add(payload.url, payload.interval, method, payload.timeout)
+    return {"success": True, "target": target.info()}
+
+@router.get(
+    "/monitor/targets",
+    summary="List Monitor Targets",
+    description="List monitored URLs with rolling availability and latency",
+)
+async def monitor_list_targets():
+    targets = [
+        {**target.info(), "stats": target.stats()} for target in monitor.targets.values()
+    ]
+    return {"success": True, "targets": targets, "count": len(targets)}
+
+@router.get(
+    "/monitor/targets/{target_id}",
+    summary="Monitor Target Stats",
+    description="Rolling latency percentiles, availability and recent checks for a target",
+)
+async def monitor_target_stats(
+    target_id: str,
+    recent: int = Query(20, ge=0, le=500, description="Number of recent checks to return"),
+):
+    target = monitor.targets.get(target_id)
+    if target is None:
+        raise HTTPException(status_code=404, detail="Monitor target not found")
+    return {
+        "success": True,
+        "target": target.info(),
+        "stats": target.stats(),
+        "recent": target.recent(recent),
+    }
+
+@router.delete(
+    "/monitor/targets/{target_id}",
+    summary="Remove Monitor Target",
+    description="Stop checking a URL",
+)
+async def monitor_remove_target(target_id: str):
+    if not monitor.remove(target_id):
+        raise HTTPException(status_code=404, detail="Monitor target not found")
+    return {"success": True, "removed": target_id}
 
 @router.post(
     "/git/generate",
@@ -1188,6 +1636,74 @@ async def timestamp_convert(payload: TimestampPayload):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post(
+    "/timestamp/convert/batch",
+    summary="Convert Timestamps in Bulk",
+    description="Convert a list of mixed epoch/ISO/RFC 2822 values to one timezone and format",
+)
+async def timestamp_convert_batch(payload: TimestampBatchPayload):
+    try:
+        parser = ColumnParser(payload.from_format, get_zone(payload.assume_timezone))
+        formatter = TimestampFormatter(payload.output, get_zone(payload.timezone), payload.pattern)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    report = await asyncio.to_thread(convert_timestamps, payload.values, parser, formatter)
+    return {"success": True, "timezone": payload.timezone, **report}
+
+@router.post(
+    "/timestamp/convert/stream",
+    summary="Convert Timestamp File (streamed)",
+    description="Convert one-per-line values (NDJSON out) or timestamp columns of a CSV (CSV out)",
+)
+async def timestamp_convert_stream(
+    request: Request,
+    input: str = Query("lines", description="lines or csv"),
+    columns: Optional[str] = Query(None, description="Comma-separated CSV columns (default: detected)"),
+    replace: bool = Query(False, description="Overwrite CSV columns instead of appending new ones"),
+    from_format: str = Query("auto"),
+    timezone: str = Query("UTC", description="IANA timezone for the output"),
+    assume_timezone: str = Query("UTC", description="Timezone for inputs without an offset"),
+    output: str = Query("iso"),
+    pattern: Optional[str] = Query(None, description="strftime pattern; overrides output"),
+):
+    if input not in ("lines", "csv"):
+        raise HTTPException(status_code=400, detail="input must be lines or csv")
+    try:
+        assume_tz = get_zone(assume_timezone)
+        ColumnParser(from_format, assume_tz)
+        formatter = TimestampFormatter(output, get_zone(timezone), pattern)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    fileobj, _ = await spool_upload(request, max_bytes=MAX_TIMESTAMP_UPLOAD_BYTES)
+    fileobj.seek(0)
+    wanted = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    if input == "csv":
+        try:
+            check_csv_columns(fileobj, wanted)
+        except ValueError as e:
+            fileobj.close()
+            raise HTTPException(status_code=400, detail=str(e))
+
+    def generate():
+        try:
+            yield from stream_timestamps(
+                fileobj,
+                input,
+                lambda: ColumnParser(from_format, assume_tz),
+                formatter,
+                wanted,
+                replace,
+                TIMESTAMP_STREAM_BATCH,
+            )
+        except ValueError as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+        finally:
+            fileobj.close()
+
+    media_type = "text/csv" if input == "csv" else "application/x-ndjson"
+    return StreamingResponse(generate(), media_type=media_type)
+
 @router.get(
     "/timestamp/now",
     summary="Current Timestamp",
@@ -1209,18 +1725,13 @@ async def timestamp_now():
     description="Convert text to URL-friendly slug",
 )
 async def slug_generate(payload: SlugPayload):
-    import unicodedata
-
-    text = payload.text
-
-    text = unicodedata.normalize("NFKD", text)
-    text = text.encode("ascii", "ignore").decode("ascii")
-
-    if payload.lowercase:
-        text = text.lower()
-
-    text = re.sub(r"[^\w\s-]", "", text)
-    text = re.sub(r"[-\s]+", payload.separator, text).strip("-_")
+    text = slugify(
+        payload.text,
+        payload.separator,
+        payload.lowercase,
+        payload.max_length,
+        payload.transliterate,
+    )
 
     return {
         "success": True,
@@ -1229,6 +1740,26 @@ async def slug_generate(payload: SlugPayload):
         "length": len(text),
     }
 
+@router.post(
+    "/slug/batch",
+    summary="Generate Unique Slugs",
+    description="Slugify many titles, keeping slugs unique within the batch and against existing ones",
+)
+async def slug_batch(payload: SlugBatchPayload):
+    try:
+        result = await asyncio.to_thread(
+            slugify_batch,
+            payload.titles,
+            payload.existing,
+            payload.separator,
+            payload.lowercase,
+            payload.max_length,
+            payload.transliterate,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, **result}
+
 @router.post(
     "/base/convert",
     summary="Convert Number Base",
@@ -1375,40 +1906,270 @@ async def css_inline(payload: CssInlinePayload):
     description="Resize and/or convert base64 images",
 )
 async def image_resize(payload: ImageResizePayload):
-    try:
-        from PIL import Image
-    except ImportError:
+    if importlib.util.find_spec("PIL") is None:
         raise HTTPException(status_code=500, detail="Pillow not installed")
 
+    fmt = (payload.format or "jpeg").lower()
     try:
         raw_data = payload.data.split(",")[-1]
         img_bytes = base64.b64decode(raw_data)
-        img = Image.open(io.BytesIO(img_bytes))
+        outputs = await run_image_job(
+            render_sizes,
+            img_bytes,
+            [(payload.width, payload.height)],
+            fmt,
+            payload.quality,
+            "bicubic",
+            "stretch",
+        )
 
-        target_w = payload.width or img.width
-        target_h = payload.height or img.height
-        img = img.resize((target_w, target_h))
+        _, mime_type, _ = image_format(fmt)
+        result = f"data:{mime_type};base64," + base64.b64encode(
+            outputs[0]["data"]
+        ).decode("utf-8")
+        return {"success": True, "image": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        fmt = (payload.format or "jpeg").upper()
-        fmt = "WEBP" if fmt.lower() == "webp" else fmt
+@router.post(
+    "/image/resize/binary",
+    summary="Resize image (binary)",
+    description=(
+        "Resize an image sent as a multipart 'file' field or raw request body and "
+        "return the raw image. Several comma-separated sizes return a zip srcset."
+    ),
+)
+async def image_resize_binary(
+    request: Request,
+    width: Optional[int] = Query(None, ge=1),
+    height: Optional[int] = Query(None, ge=1),
+    sizes: Optional[str] = Query(
+        None, description="Comma-separated sizes like 320,640,1280 or 640x480"
+    ),
+    format: str = Query("jpeg", description="jpeg/png/webp/gif"),
+    quality: int = Query(80, ge=1, le=100),
+    resample: str = Query("bicubic", description=", ".join(RESAMPLE_FILTERS)),
+    fit: str = Query("contain", description=", ".join(FIT_MODES)),
+):
+    if importlib.util.find_spec("PIL") is None:
+        raise HTTPException(status_code=500, detail="Pillow not installed")
 
-        if fmt == "JPEG" and img.mode in ("RGBA", "LA", "P"):
-            img = img.convert("RGB")
+    fmt = format.lower()
+    if fmt not in IMAGE_FORMATS:
+        raise HTTPException(
+            status_code=400, detail=f"Unsupported format. Available: {', '.join(IMAGE_FORMATS)}"
+        )
+    if resample not in RESAMPLE_FILTERS:
+        raise HTTPException(
+            status_code=400, detail=f"Unsupported resample. Available: {', '.join(RESAMPLE_FILTERS)}"
+        )
+    if fit not in FIT_MODES:
+        raise HTTPException(
+            status_code=400, detail=f"Unsupported fit. Available: {', '.join(FIT_MODES)}"
+        )
 
-        out = io.BytesIO()
-        save_kwargs = {"format": fmt}
-        if fmt in ("JPEG", "WEBP") and payload.quality:
-            save_kwargs["quality"] = payload.quality
-        img.save(out, **save_kwargs)
+    try:
+        targets = parse_sizes(sizes) or [(width, height)]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(targets) > MAX_IMAGE_SIZES:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_IMAGE_SIZES} sizes per request"
+        )
 
-        result = (
-            f"data:image/{fmt.lower()};base64,"
-            + base64.b64encode(out.getvalue()).decode("utf-8")
+    img_bytes, file_name = await read_upload(request)
+    try:
+        outputs = await run_image_job(
+            render_sizes, img_bytes, targets, fmt, quality, resample, fit
         )
-        return {"success": True, "image": result}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    _, mime_type, ext = IMAGE_FORMATS[fmt]
+    if len(outputs) == 1:
+        out = outputs[0]
+        return Response(
+            content=out["data"],
+            media_type=mime_type,
+            headers={
+                "X-Image-Width": str(out["width"]),
+                "X-Image-Height": str(out["height"]),
+            },
+        )
+
+    stem = Path(file_name).stem if file_name else "image"
+    # Name entries by the requested box: 640x480 and 640x100 both come out
+    # 640 px wide but are different images.
+    written = set()
+    names = [unique_archive_name(f"{stem}-{size_label(*t)}.{ext}", written) for t in targets]
+    buf = io.BytesIO()
+    # Encoded images do not compress further, so store them as-is.
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as zf:
+        for name, out in zip(names, outputs):
+            zf.writestr(name, out["data"])
+    # A srcset lists each width descriptor once; headers must stay ASCII.
+    srcset, widths = [], set()
+    for name, out in zip(names, outputs):
+        if out["width"] not in widths:
+            widths.add(out["width"])
+            srcset.append(f"{urllib.parse.quote(name)} {out['width']}w")
+    return Response(
+        content=buf.getvalue(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": attachment_header(f"{stem}-srcset.zip"),
+            "X-Srcset": ", ".join(srcset),
+        },
+    )
+
+@router.post(
+    "/image/batch",
+    summary="Batch image transform",
+    description=(
+        "Apply one transform spec to many images (repeated multipart 'files' "
+        "fields and/or zip archives) in parallel. Results are cached on disk by "
+        "content hash and returned as a zip with a manifest.json."
+    ),
+)
+async def image_batch(
+    request: Request,
+    width: Optional[int] = Query(None, ge=1),
+    height: Optional[int] = Query(None, ge=1),
+    sizes: Optional[str] = Query(
+        None, description="Comma-separated sizes like 320,640,1280 or 640x480"
+    ),
+    format: str = Query("jpeg", description="jpeg/png/webp/gif"),
+    quality: int = Query(80, ge=1, le=100),
+    resample: str = Query("bicubic", description=", ".join(RESAMPLE_FILTERS)),
+    fit: str = Query("contain", description=", ".join(FIT_MODES)),
+    strip_metadata: bool = Query(True, description="Drop EXIF data from outputs"),
+):
+    if importlib.util.find_spec("PIL") is None:
+        raise HTTPException(status_code=500, detail="Pillow not installed")
+
+    fmt = format.lower()
+    if fmt not in IMAGE_FORMATS:
+        raise HTTPException(
+            status_code=400, detail=f"Unsupported format. Available: {', '.join(IMAGE_FORMATS)}"
+        )
+    if resample not in RESAMPLE_FILTERS or fit not in FIT_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"resample must be one of {', '.join(RESAMPLE_FILTERS)}; fit one of {', '.join(FIT_MODES)}",
+        )
+    try:
+        targets = parse_sizes(sizes) or [(width, height)]
+        images = expand_image_uploads(await read_uploads(request))
+    except (ValueError, zipfile.BadZipFile) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(targets) > MAX_IMAGE_SIZES:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_IMAGE_SIZES} sizes per request"
+        )
+
+    spec = {
+        "format": fmt,
+        "quality": quality,
+        "resample": resample,
+        "fit": fit,
+        "strip_metadata": strip_metadata,
+    }
+    digests = await asyncio.to_thread(
+        lambda: [hashlib.sha256(data).hexdigest() for data, _ in images]
+    )
+
+    key_rows = [
+        [derivative_cache.make_key(digest, {**spec, "size": list(t)}) for t in targets]
+        for digest in digests
+    ]
+    # The cache reads and writes disk; keep that off the event loop.
+    cached_rows = await asyncio.to_thread(
+        lambda: [[derivative_cache.get(key) for key in keys] for keys in key_rows]
+    )
+
+    results: List[List[Optional[dict]]] = []
+    jobs = []
+    for (data, name), keys, cached in zip(images, key_rows, cached_rows):
+        row = [
+            {"data": hit, "key": key, "cached": True} if hit is not None else None
+            for hit, key in zip(cached, keys)
+        ]
+        results.append(row)
+        missing = [i for i, hit in enumerate(cached) if hit is None]
+        if missing:
+            jobs.append((len(results) - 1, missing, keys, data))
+
+    async def run(job):
+        index, missing, keys, data = job
+        try:
+            outputs = await run_image_job(
+                render_sizes,
+                data,
+                [targets[i] for i in missing],
+                fmt,
+                quality,
+                resample,
+                fit,
+                strip_metadata,
+            )
+        except Exception as e:
+            return index, missing, keys, e
+        return index, missing, keys, outputs
+
+    errors = {}
+    fresh = []
+    for index, missing, keys, outputs in await asyncio.gather(*(run(j) for j in jobs)):
+        if isinstance(outputs, Exception):
+            errors[index] = str(outputs)
+            continue
+        for i, out in zip(missing, outputs):
+            fresh.append((keys[i], out["data"]))
+            results[index][i] = {"data": out["data"], "key": keys[i], "cached": False}
+
+    def store():
+        for key, data in fresh:
+            derivative_cache.put(key, data)
+        return derivative_cache.stats()
+
+    cache_stats = await asyncio.to_thread(store)
+
+    _, _, ext = IMAGE_FORMATS[fmt]
+    manifest = []
+    written = {"manifest.json"}
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as zf:
+        for index, ((_, name), row) in enumerate(zip(images, results)):
+            entry = {"source": name, "sha256": digests[index], "outputs": []}
+            if index in errors:
+                entry["error"] = errors[index]
+                manifest.append(entry)
+                continue
+            # Entry names come from the client; never let them escape the
+            # archive root or overwrite each other.
+            stem = str(PurePosixPath(safe_archive_name(name)).with_suffix(""))
+            for target, item in zip(targets, row):
+                out_name = unique_archive_name(f"{stem}-{size_label(*target)}.{ext}", written)
+                zf.writestr(out_name, item["data"])
+                entry["outputs"].append(
+                    {"file": out_name, "bytes": len(item["data"]), "cached": item["cached"]}
+                )
+            manifest.append(entry)
+        zf.writestr(
+            "manifest.json",
+            json.dumps({"spec": spec, "images": manifest, "cache": cache_stats}, indent=2),
+        )
+
+    hits = sum(1 for row in results for item in row if item and item["cached"])
+    return Response(
+        content=buf.getvalue(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": 'attachment; filename="images.zip"',
+            "X-Cache-Hits": str(hits),
+            "X-Cache-Misses": str(sum(len(j[1]) for j in jobs)),
+        },
+    )
+
 @router.post(
     "/lorem/generate",
     summary="Generate Lorem Ipsum",
@@ -1546,19 +2307,6 @@ def get_relative_time(dt, now):
     else:
         return f"in {int(seconds / 86400)} days"
 
-def explain_cron_field(value, name, min_val, max_val):
-    if value == "*":
-        return f"every {name}"
-    elif value.startswith("*/"):
-        step = value[2:]
-        return f"every {step} {name}s"
-    elif "-" in value:
-        return f"{name}s {value}"
-    elif "," in value:
-        return f"{name}s {value}"
-    else:
-        return f"at {name} {value}"
-
 def build_cron_summary(explanations):
     parts = []
     for field, explanation in explanations.items():
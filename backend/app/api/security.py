@@ -1,13 +1,75 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List
+from pathlib import Path
+import asyncio
+import csv
+import json
+import zipfile
 import hashlib
 import secrets
-import string
-import re
 import base64
 import hmac
 
+from ..config import (
+    METADATA_ROOT,
+    MAX_METADATA_UPLOAD_BYTES,
+    MAX_HASH_UPLOAD_BYTES,
+    MAX_MANIFEST_ENTRIES,
+    MAX_PASSWORD_COUNT,
+    MAX_PASSWORD_STREAM_COUNT,
+    PASSWORD_STREAM_BATCH,
+    MAX_POLICY_AUDIT_PASSWORDS,
+    MAX_OTP_WINDOW,
+    MAX_OTP_COUNTER,
+    MAX_OTP_BULK_CODES,
+    MAX_HMAC_BATCH,
+    MAX_EMAIL_BATCH,
+    MAX_XOR_STREAM_BYTES,
+    XOR_CHUNK_SIZE,
+    MAX_MINT_COUNT,
+)
+from ..utils.api_keys import (
+    PREFIX_RE as API_KEY_PREFIX_RE,
+    TOKEN_FORMATS,
+    format_token,
+    key_store,
+    lookup_id as api_key_lookup_id,
+    mint_keys,
+    verify_checksum as verify_key_checksum,
+)
+from ..utils.email_validation import (
+    check_address,
+    is_disposable_domain,
+    parse_address_list,
+    validate_batch,
+)
+from ..utils.file_metadata import analyze_buffer, analyze_file
+from ..utils.hashing import (
+    HASH_FACTORIES,
+    MultiHasher,
+    hash_chunks,
+    normalize_member_name,
+    parse_algorithms,
+    parse_manifest,
+    verify_manifest,
+)
+from ..utils.passwords import (
+    build_charset,
+    diceware_entropy,
+    entropy_bits,
+    load_wordlist,
+    password_generator,
+    pronounceable_entropy,
+)
+from ..utils import hmac_keys as hmac_service, otp
+from ..utils.hmac_keys import HMAC_ALGORITHMS
+from ..utils.password_policy import compile_policy, policy_registry
+from ..utils.password_strength import PATTERN_WARNINGS, analyze_password
+from ..utils.uploads import iter_upload, read_upload, spool_upload
+from ..utils.xor import XorStream, xor_bytes, backend as xor_backend
+
 class PasswordGenerateOptions(BaseModel):
     length: int = Field(16, ge=4, le=128)
     include_uppercase: bool = True
@@ -15,7 +77,11 @@ class PasswordGenerateOptions(BaseModel):
     include_numbers: bool = True
     include_symbols: bool = True
     exclude_ambiguous: bool = False
-    count: int = Field(1, ge=1, le=50)
+    count: int = Field(1, ge=1, le=MAX_PASSWORD_COUNT)
+    mode: str = "random"
+    words: int = Field(6, ge=3, le=20)
+    separator: str = Field("-", max_length=5)
+    capitalize: bool = False
 
 class PasswordPayload(BaseModel):
     password: str
@@ -35,17 +101,62 @@ class HmacPayload(BaseModel):
     key: str
     algorithm: str = "sha256"
 
+class HmacKeyPayload(BaseModel):
+    key: str
+    key_encoding: str = "utf-8"
+    algorithm: str = "sha256"
+    key_id: Optional[str] = Field(None, max_length=128)
+
+class HmacSignPayload(BaseModel):
+    messages: List[str]
+    key_id: Optional[str] = None
+    key: Optional[str] = None
+    key_encoding: str = "utf-8"
+    algorithm: str = "sha256"
+    message_encoding: str = "utf-8"
+    output: str = "both"
+
+class HmacVerifyItem(BaseModel):
+    message: str
+    signature: str
+
+class HmacVerifyPayload(BaseModel):
+    items: List[HmacVerifyItem]
+    key_id: Optional[str] = None
+    key: Optional[str] = None
+    key_encoding: str = "utf-8"
+    algorithm: str = "sha256"
+    message_encoding: str = "utf-8"
+    signature_encoding: str = "hex"
+
 class EmailValidatePayload(BaseModel):
     email: str
 
 class EncryptPayload(BaseModel):
     data: str
     key: str
+    key_encoding: str = "utf-8"
 
 class SecretTokenPayload(BaseModel):
     length: int = Field(32, ge=8, le=256)
     format: str = "hex"
 
+class SecretMintPayload(BaseModel):
+    count: int = Field(1, ge=1, le=MAX_MINT_COUNT)
+    length: int = Field(32, ge=16, le=256, description="Random bytes per key")
+    format: str = "hex"
+    prefix: Optional[str] = "sk"
+    checksum: bool = True
+    store: bool = False
+    label: Optional[str] = Field(None, max_length=200)
+
+class SecretVerifyPayload(BaseModel):
+    key: str
+    checksum: bool = True
+
+class SecretRevokePayload(BaseModel):
+    lookup_id: str
+
 class ChecksumPayload(BaseModel):
     data: str
     algorithm: str = "crc32"
@@ -53,10 +164,34 @@ class ChecksumPayload(BaseModel):
 class OTPPayload(BaseModel):
     secret: Optional[str] = None
     digits: int = Field(6, ge=6, le=8)
-    period: int = 30
+    period: int = Field(30, ge=1, le=3600)
+    algorithm: str = "sha1"
+
+class OTPVerifyPayload(BaseModel):
+    secret: str
+    code: str
+    type: str = "totp"
+    counter: Optional[int] = Field(None, ge=0, le=MAX_OTP_COUNTER, description="HOTP counter")
+    timestamp: Optional[float] = Field(
+        None, ge=0, le=MAX_OTP_COUNTER, description="TOTP time, defaults to now"
+    )
+    digits: int = Field(6, ge=6, le=8)
+    period: int = Field(30, ge=1, le=3600)
+    algorithm: str = "sha1"
+    window: int = Field(1, ge=0, le=MAX_OTP_WINDOW)
+
+class OTPBulkPayload(BaseModel):
+    secrets: List[str]
+    type: str = "totp"
+    start: Optional[float] = Field(
+        None, ge=0, le=MAX_OTP_COUNTER, description="Unix time (TOTP) or counter (HOTP); defaults to now / 0"
+    )
+    count: int = Field(1, ge=1)
+    digits: int = Field(6, ge=6, le=8)
+    period: int = Field(30, ge=1, le=3600)
+    algorithm: str = "sha1"
 
-class PasswordPolicyPayload(BaseModel):
-    password: str
+class PasswordPolicySettings(BaseModel):
     min_length: int = 8
     require_uppercase: bool = True
     require_lowercase: bool = True
@@ -65,8 +200,62 @@ class PasswordPolicyPayload(BaseModel):
     max_repeated: int = 3
     banned_words: Optional[List[str]] = None
 
+class PasswordPolicyPayload(PasswordPolicySettings):
+    password: str
+
+class PasswordPolicyAuditPayload(BaseModel):
+    passwords: List[str]
+    policy_id: Optional[str] = None
+    policy: Optional[PasswordPolicySettings] = None
+    include_passed: bool = False
+
 router = APIRouter()
 
+PASSWORD_MODES = ["random", "pronounceable", "diceware"]
+
+def _password_batch(
+    mode: str,
+    length: int,
+    words: int,
+    separator: str,
+    capitalize: bool,
+    alphabet: str,
+    required: List[str],
+    count: int,
+):
+    if mode == "pronounceable":
+        return password_generator.pronounceable(length, count, capitalize)
+    if mode == "diceware":
+        return password_generator.diceware(words, count, separator, capitalize)
+    return password_generator.random(length, alphabet, required, count)
+
+def _password_settings(
+    mode: str,
+    length: int,
+    words: int,
+    include_uppercase: bool,
+    include_lowercase: bool,
+    include_numbers: bool,
+    include_symbols: bool,
+    exclude_ambiguous: bool,
+):
+    if mode not in PASSWORD_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {PASSWORD_MODES}")
+    alphabet, char_sets_used, required = build_charset(
+        include_lowercase, include_uppercase, include_numbers, include_symbols, exclude_ambiguous
+    )
+    if mode == "random" and not alphabet:
+        raise HTTPException(
+            status_code=400, detail="At least one character set must be selected"
+        )
+    if mode == "pronounceable":
+        entropy, charset_size, char_sets_used = pronounceable_entropy(length), None, ["pronounceable"]
+    elif mode == "diceware":
+        entropy, charset_size, char_sets_used = diceware_entropy(words), len(load_wordlist()), ["diceware"]
+    else:
+        entropy, charset_size = entropy_bits(len(alphabet), length), len(alphabet)
+    return alphabet, char_sets_used, required, entropy, charset_size
+
 @router.get("/password/generate", summary="Generate Password")
 async def password_generate(
     length: int = Query(16, ge=4, le=128),
@@ -75,67 +264,30 @@ async def password_generate(
     include_numbers: bool = Query(True),
     include_symbols: bool = Query(True),
     exclude_ambiguous: bool = Query(False),
-    count: int = Query(1, ge=1, le=50),
+    count: int = Query(1, ge=1, le=MAX_PASSWORD_COUNT),
+    mode: str = Query("random", description="random, pronounceable or diceware"),
+    words: int = Query(6, ge=3, le=20, description="Word count for diceware mode"),
+    separator: str = Query("-", max_length=5),
+    capitalize: bool = Query(False),
 ):
-    chars = ""
-    char_sets_used = []
-
-    if include_lowercase:
-        lowercase = string.ascii_lowercase
-        if exclude_ambiguous:
-            lowercase = lowercase.replace("l", "").replace("o", "")
-        chars += lowercase
-        char_sets_used.append("lowercase")
-
-    if include_uppercase:
-        uppercase = string.ascii_uppercase
-        if exclude_ambiguous:
-            uppercase = uppercase.replace("I", "").replace("O", "")
-        chars += uppercase
-        char_sets_used.append("uppercase")
-
-    if include_numbers:
-        digits = string.digits
-        if exclude_ambiguous:
-            digits = digits.replace("0", "").replace("1", "")
-        chars += digits
-        char_sets_used.append("numbers")
-
-    if include_symbols:
-        symbols = "!@#$%^&*()_+-=[]{}|;:,.<>?"
-        chars += symbols
-        char_sets_used.append("symbols")
-
-    if not chars:
-        raise HTTPException(
-            status_code=400, detail="At least one character set must be selected"
-        )
+    alphabet, char_sets_used, required, entropy, charset_size = _password_settings(
+        mode, length, words, include_uppercase, include_lowercase,
+        include_numbers, include_symbols, exclude_ambiguous,
+    )
+    passwords = list(
+        _password_batch(mode, length, words, separator, capitalize, alphabet, required, count)
+    )
 
-    passwords = []
-    for _ in range(count):
-        password_chars = []
-        if include_lowercase:
-            password_chars.append(secrets.choice(string.ascii_lowercase))
-        if include_uppercase:
-            password_chars.append(secrets.choice(string.ascii_uppercase))
-        if include_numbers:
-            password_chars.append(secrets.choice(string.digits))
-        if include_symbols:
-            password_chars.append(secrets.choice("!@#$%^&*()_+-=[]{}|;:,.<>?"))
-
-        remaining = length - len(password_chars)
-        password_chars.extend(secrets.choice(chars) for _ in range(remaining))
-        secrets.SystemRandom().shuffle(password_chars)
-        passwords.append("".join(password_chars[:length]))
-
-    entropy = len(passwords[0]) * (len(chars).bit_length())
     result = {
         "success": True,
+        "mode": mode,
         "length": length,
         "character_sets": char_sets_used,
-        "charset_size": len(chars),
+        "charset_size": charset_size,
         "entropy_bits": entropy,
     }
+    if mode == "diceware":
+        result["words"] = words
 
     if count == 1:
         result["password"] = passwords[0]
@@ -155,6 +307,52 @@ async def password_generate_post(options: PasswordGenerateOptions):
         options.include_symbols,
         options.exclude_ambiguous,
         options.count,
+        options.mode,
+        options.words,
+        options.separator,
+        options.capitalize,
+    )
+
+@router.get("/password/generate/stream", summary="Generate Passwords in Bulk (streamed)")
+async def password_generate_stream(
+    count: int = Query(1000, ge=1, le=MAX_PASSWORD_STREAM_COUNT),
+    length: int = Query(16, ge=4, le=128),
+    include_uppercase: bool = Query(True),
+    include_lowercase: bool = Query(True),
+    include_numbers: bool = Query(True),
+    include_symbols: bool = Query(True),
+    exclude_ambiguous: bool = Query(False),
+    mode: str = Query("random", description="random, pronounceable or diceware"),
+    words: int = Query(6, ge=3, le=20),
+    separator: str = Query("-", max_length=5),
+    capitalize: bool = Query(False),
+    format: str = Query("text", description="text (one per line) or ndjson"),
+):
+    if format not in ("text", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be text or ndjson")
+    alphabet, _, required, entropy, _ = _password_settings(
+        mode, length, words, include_uppercase, include_lowercase,
+        include_numbers, include_symbols, exclude_ambiguous,
+    )
+
+    def generate():
+        # Runs in Starlette's threadpool; each batch is built with one
+        # urandom draw and written out before the next is generated.
+        remaining = count
+        while remaining > 0:
+            batch = min(remaining, PASSWORD_STREAM_BATCH)
+            items = _password_batch(mode, length, words, separator, capitalize, alphabet, required, batch)
+            if format == "ndjson":
+                yield "".join(json.dumps({"password": p}) + "\n" for p in items)
+            else:
+                yield "".join(p + "\n" for p in items)
+            remaining -= batch
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/plain"
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"X-Entropy-Bits": str(entropy), "X-Password-Count": str(count)},
     )
 
 @router.post("/password/strength", summary="Check Password Strength")
@@ -174,50 +372,33 @@ async def password_strength(payload: PasswordPayload):
     if length >= 16:
         score += 1
 
-    has_lower = bool(re.search(r"[a-z]", pwd))
-    has_upper = bool(re.search(r"[A-Z]", pwd))
-    has_digit = bool(re.search(r"\d", pwd))
-    has_symbol = bool(re.search(r"[!@#$%^&*()_+\-=\[\]{}|;':\",./<>?]", pwd))
+    analysis = analyze_password(pwd)
+    classes = analysis["classes"]
+
+    for key, advice in (
+        ("has_lowercase", "Add lowercase letters"),
+        ("has_uppercase", "Add uppercase letters"),
+        ("has_numbers", "Add numbers"),
+        ("has_symbols", "Add special characters"),
+    ):
+        if classes[key]:
+            score += 1
+        else:
+            feedback.append(advice)
 
-    if has_lower:
-        score += 1
-    else:
-        feedback.append("Add lowercase letters")
-    if has_upper:
-        score += 1
-    else:
-        feedback.append("Add uppercase letters")
-    if has_digit:
+    patterns = analysis["patterns"]
+    if not any(p in patterns for p in ("dictionary", "spatial", "repeat", "date")):
         score += 1
-    else:
-        feedback.append("Add numbers")
-    if has_symbol:
+    if "sequence" not in patterns:
         score += 1
-    else:
-        feedback.append("Add special characters")
+    warnings.extend(PATTERN_WARNINGS[p] for p in patterns)
+    if analysis["common_password_rank"] is not None:
+        warnings.append("This is a commonly used password")
+    if analysis["breached"]:
+        warnings.append("This password appears in a breach corpus")
 
-    common_patterns = [r"^123", r"abc", r"qwerty", r"password", r"(.)\1{2,}"]
-    if not any(re.search(p, pwd, re.IGNORECASE) for p in common_patterns):
-        score += 1
-    else:
-        warnings.append("Contains common patterns")
-
-    sequential = any(
-        ord(pwd[i]) + 1 == ord(pwd[i + 1]) == ord(pwd[i + 2]) - 1
-        for i in range(len(pwd) - 2)
-    )
-    if not sequential:
-        score += 1
-    else:
-        warnings.append("Contains sequential characters")
-
-    charset_size = (
-        (26 if has_lower else 0)
-        + (26 if has_upper else 0)
-        + (10 if has_digit else 0)
-        + (32 if has_symbol else 0)
-    )
-    entropy = length * (charset_size.bit_length() if charset_size > 0 else 0)
+    # A password that is cheap to guess is never rated above its pattern score.
+    score = min(score, 2 + analysis["pattern_score"] * 2)
 
     strength = (
         "weak"
@@ -234,35 +415,6 @@ async def password_strength(payload: PasswordPayload):
         else "orange" if score <= 5 else "yellow" if score <= 7 else "green"
     )
 
-    guesses_per_second = 10_000_000_000
-    possible = charset_size**length if charset_size > 0 else 1
-    secs = possible / guesses_per_second
-    crack_time = (
-        "instantly"
-        if secs < 1
-        else (
-            f"{int(secs)} seconds"
-            if secs < 60
-            else (
-                f"{int(secs/60)} minutes"
-                if secs < 3600
-                else (
-                    f"{int(secs/3600)} hours"
-                    if secs < 86400
-                    else (
-                        f"{int(secs/86400)} days"
-                        if secs < 31536000
-                        else (
-                            f"{int(secs/31536000)} years"
-                            if secs < 31536000 * 100
-                            else "centuries"
-                        )
-                    )
-                )
-            )
-        )
-    )
-
     return {
         "success": True,
         "strength": strength,
@@ -271,58 +423,25 @@ async def password_strength(payload: PasswordPayload):
         "percentage": int((score / max_score) * 100),
         "color": color,
         "length": length,
-        "entropy_bits": entropy,
-        "crack_time_estimate": crack_time,
+        "entropy_bits": analysis["entropy_bits"],
+        "guesses_log10": analysis["guesses_log10"],
+        "pattern_score": analysis["pattern_score"],
+        "crack_time_estimate": analysis["crack_time_estimate"],
         "character_analysis": {
-            "has_lowercase": has_lower,
-            "has_uppercase": has_upper,
-            "has_numbers": has_digit,
-            "has_symbols": has_symbol,
-            "charset_size": charset_size,
+            **classes,
+            "charset_size": analysis["charset_size"],
         },
+        "matches": [m for m in analysis["sequence"] if m["pattern"] != "bruteforce"],
+        "common_password_rank": analysis["common_password_rank"],
+        "breached": analysis["breached"],
         "feedback": feedback,
         "warnings": warnings,
     }
 
 @router.post("/password/policy", summary="Check Password Policy")
 async def password_policy(payload: PasswordPolicyPayload):
-    pwd, violations, passed = payload.password, [], []
-
-    if len(pwd) >= payload.min_length:
-        passed.append(f"Length >= {payload.min_length}")
-    else:
-        violations.append(f"Must be at least {payload.min_length} characters")
-
-    if payload.require_uppercase:
-        if re.search(r"[A-Z]", pwd):
-            passed.append("Contains uppercase")
-        else:
-            violations.append("Must contain uppercase letter")
-    if payload.require_lowercase:
-        if re.search(r"[a-z]", pwd):
-            passed.append("Contains lowercase")
-        else:
-            violations.append("Must contain lowercase letter")
-    if payload.require_numbers:
-        if re.search(r"\d", pwd):
-            passed.append("Contains numbers")
-        else:
-            violations.append("Must contain number")
-    if payload.require_symbols:
-        if re.search(r"[!@#$%^&*()_+\-=\[\]{}|;':\",./<>?]", pwd):
-            passed.append("Contains symbols")
-        else:
-            violations.append("Must contain special character")
-
-    if re.search(f"(.)\\1{{{payload.max_repeated},}}", pwd):
-        violations.append(f"Too many repeated characters")
-    else:
-        passed.append("No excessive repetition")
-
-    if payload.banned_words:
-        for word in payload.banned_words:
-            if word.lower() in pwd.lower():
-                violations.append(f"Contains banned word: {word}")
+    policy = compile_policy(payload.model_dump(exclude={"password"}))
+    violations, passed = policy.check(payload.password)
 
     return {
         "success": True,
@@ -331,6 +450,48 @@ async def password_policy(payload: PasswordPolicyPayload):
         "passed": passed,
     }
 
+@router.post("/password/policy/register", summary="Register Password Policy")
+async def password_policy_register(settings: PasswordPolicySettings):
+    policy = policy_registry.register(settings.model_dump())
+    return {"success": True, "policy_id": policy.policy_id, "policy": policy.settings()}
+
+@router.post("/password/policy/audit", summary="Audit Passwords Against a Policy")
+async def password_policy_audit(payload: PasswordPolicyAuditPayload):
+    if len(payload.passwords) > MAX_POLICY_AUDIT_PASSWORDS:
+        raise HTTPException(
+            status_code=400, detail=f"Maximum passwords per audit is {MAX_POLICY_AUDIT_PASSWORDS}"
+        )
+    if payload.policy_id:
+        policy = policy_registry.get(payload.policy_id)
+        if policy is None:
+            raise HTTPException(status_code=404, detail="Policy not found")
+    elif payload.policy is not None:
+        policy = compile_policy(payload.policy.model_dump())
+    else:
+        raise HTTPException(status_code=400, detail="Provide policy_id or policy")
+
+    def audit():
+        results, counts = [], {}
+        for index, pwd in enumerate(payload.passwords):
+            violations, passed = policy.check(pwd)
+            for v in violations:
+                counts[v] = counts.get(v, 0) + 1
+            if violations or payload.include_passed:
+                results.append({"index": index, "valid": not violations, "violations": violations})
+        return results, counts
+
+    results, counts = await asyncio.to_thread(audit)
+    invalid = sum(1 for r in results if not r["valid"])
+    return {
+        "success": True,
+        "policy_id": policy.policy_id,
+        "total": len(payload.passwords),
+        "valid": len(payload.passwords) - invalid,
+        "invalid": invalid,
+        "violation_counts": dict(sorted(counts.items(), key=lambda kv: -kv[1])),
+        "results": results,
+    }
+
 @router.post("/hash/generate", summary="Generate Hash")
 async def hash_generate(payload: HashPayload):
     algorithms = {
@@ -396,97 +557,224 @@ async def hash_verify(payload: HashVerifyPayload):
         "provided_hash": payload.hash,
     }
 
+@router.post("/hash/verify/manifest", summary="Verify files against a checksum manifest")
+async def hash_verify_manifest(request: Request):
+    """Multipart form: ``manifest`` (text or file in sha256sum, BSD --tag or JSON
+    format), optional ``algorithm``, and either an ``archive`` zip or repeated
+    ``files`` parts."""
+    form = await request.form()
+    manifest = form.get("manifest")
+    if manifest is None:
+        raise HTTPException(status_code=400, detail="Multipart field 'manifest' is required")
+    if not isinstance(manifest, str):
+        manifest = (await manifest.read()).decode("utf-8-sig", errors="replace")
+
+    try:
+        entries = parse_manifest(manifest, form.get("algorithm") or None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not entries:
+        raise HTTPException(status_code=400, detail="Manifest has no entries")
+    if len(entries) > MAX_MANIFEST_ENTRIES:
+        raise HTTPException(status_code=400, detail=f"Maximum manifest entries is {MAX_MANIFEST_ENTRIES}")
+
+    openers = {}
+    # Two inputs under one name would silently verify only the last of them.
+    duplicates = set()
+
+    def add_opener(name, opener):
+        if name in openers:
+            duplicates.add(name)
+        openers[name] = opener
+
+    archive = form.get("archive")
+    zf = None
+    if archive is not None and not isinstance(archive, str):
+        try:
+            zf = zipfile.ZipFile(archive.file)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="archive is not a valid zip file")
+        members = [info for info in zf.infolist() if not info.is_dir()]
+        if sum(info.file_size for info in members) > MAX_HASH_UPLOAD_BYTES:
+            zf.close()
+            raise HTTPException(status_code=413, detail="Archive too large")
+        for info in members:
+            add_opener(normalize_member_name(info.filename), lambda info=info: zf.open(info))
+    for upload in form.getlist("files"):
+        if not isinstance(upload, str):
+            add_opener(normalize_member_name(upload.filename or ""), lambda f=upload.file: f)
+    if duplicates:
+        if zf is not None:
+            zf.close()
+        raise HTTPException(status_code=400, detail=f"Duplicate file names: {', '.join(sorted(duplicates)[:10])}")
+    if not openers:
+        raise HTTPException(status_code=400, detail="Provide an 'archive' zip or 'files' to verify")
+
+    try:
+        report = await verify_manifest(entries, openers)
+    finally:
+        if zf is not None:
+            zf.close()
+    return {"success": True, **report}
+
 @router.post("/hash/all", summary="Generate All Hashes")
 async def hash_all(payload: HashPayload):
     data_bytes = payload.data.encode("utf-8")
-    results = {
-        name: func(data_bytes).hexdigest()
-        for name, func in [
-            ("md5", hashlib.md5),
-            ("sha1", hashlib.sha1),
-            ("sha256", hashlib.sha256),
-            ("sha384", hashlib.sha384),
-            ("sha512", hashlib.sha512),
-            ("blake2b", hashlib.blake2b),
-            ("blake2s", hashlib.blake2s),
-        ]
+    hasher = MultiHasher(["md5", "sha1", "sha256", "sha384", "sha512", "blake2b", "blake2s"])
+    await hasher.update_async(data_bytes)
+    return {"success": True, "hashes": hasher.results(), "input_length": len(payload.data)}
+
+async def _hash_upload(request: Request, algorithms: str, encoding: str) -> dict:
+    try:
+        names = parse_algorithms(algorithms)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if encoding not in ("hex", "base64"):
+        raise HTTPException(status_code=400, detail="encoding must be hex or base64")
+
+    hasher = await hash_chunks(iter_upload(request, max_bytes=MAX_HASH_UPLOAD_BYTES), names)
+    return {
+        "success": True,
+        "hashes": hasher.results(encoding),
+        "algorithms": names,
+        "encoding": encoding,
+        "input_length": hasher.length,
     }
-    return {"success": True, "hashes": results, "input_length": len(payload.data)}
+
+@router.post("/hash/stream", summary="Hash uploaded file (streaming)")
+async def hash_stream(
+    request: Request,
+    algorithms: str = Query("sha256", description=f"Comma-separated, or 'all'. Available: {', '.join(HASH_FACTORIES)}"),
+    encoding: str = Query("hex", description="hex or base64"),
+):
+    return await _hash_upload(request, algorithms, encoding)
 
 @router.post("/hmac/generate", summary="Generate HMAC")
 async def hmac_generate(payload: HmacPayload):
-    algorithms = {
-        "sha256": hashlib.sha256,
-        "sha384": hashlib.sha384,
-        "sha512": hashlib.sha512,
-    }
     alg = payload.algorithm.lower()
-    if alg not in algorithms:
+    if alg not in HMAC_ALGORITHMS:
         raise HTTPException(status_code=400, detail="Supported: sha256, sha384, sha512")
 
-    signature = hmac.new(
-        payload.key.encode("utf-8"), payload.data.encode("utf-8"), algorithms[alg]
-    ).hexdigest()
+    context = hmac_service.prepared_context(payload.key.encode("utf-8"), alg)
+    digest = hmac_service.sign(context, payload.data.encode("utf-8"))
     return {
         "success": True,
-        "signature": signature,
+        "signature": digest.hex(),
         "algorithm": alg,
-        "signature_base64": base64.b64encode(bytes.fromhex(signature)).decode("utf-8"),
+        "signature_base64": base64.b64encode(digest).decode("utf-8"),
     }
 
-@router.post("/validate/email", summary="Validate Email")
-async def validate_email(payload: EmailValidatePayload):
-    email = payload.email.strip()
-    pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-    basic_valid = bool(re.match(pattern, email))
-    issues = []
-
-    if not basic_valid:
-        issues.append("Invalid email format")
-    if email.count("@") != 1:
-        issues.append("Must contain exactly one @ symbol")
-    elif "@" in email:
-        local, domain = email.rsplit("@", 1)
-        if len(local) == 0:
-            issues.append("Local part is empty")
-        elif len(local) > 64:
-            issues.append("Local part exceeds 64 characters")
-        if len(domain) == 0:
-            issues.append("Domain is empty")
-        elif "." not in domain:
-            issues.append("Domain must contain a dot")
-        if ".." in email:
-            issues.append("Cannot contain consecutive dots")
-
-    domain = email.split("@")[-1].lower() if "@" in email else ""
-    disposable_domains = [
-        "tempmail.com",
-        "throwaway.email",
-        "guerrillamail.com",
-        "10minutemail.com",
+def _hmac_context(key_id: Optional[str], key: Optional[str], key_encoding: str, algorithm: str):
+    if key_id:
+        entry = hmac_service.hmac_keys.get(key_id)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Key not found")
+        return entry["context"], entry["algorithm"]
+    if key is None:
+        raise HTTPException(status_code=400, detail="Provide key_id or key")
+    try:
+        raw = hmac_service.decode_value(key, key_encoding)
+        return hmac_service.prepared_context(raw, algorithm.lower()), algorithm.lower()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _decode_messages(messages: List[str], encoding: str) -> List[bytes]:
+    if len(messages) > MAX_HMAC_BATCH:
+        raise HTTPException(status_code=400, detail=f"Maximum messages per request is {MAX_HMAC_BATCH}")
+    try:
+        return [hmac_service.decode_value(m, encoding) for m in messages]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/hmac/keys", summary="Register HMAC Key")
+async def hmac_key_register(payload: HmacKeyPayload):
+    try:
+        raw = hmac_service.decode_value(payload.key, payload.key_encoding)
+        entry = hmac_service.hmac_keys.add(raw, payload.algorithm, payload.key_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, "key_id": entry["key_id"], "algorithm": entry["algorithm"]}
+
+@router.get("/hmac/keys", summary="List HMAC Keys")
+async def hmac_key_list():
+    keys = hmac_service.hmac_keys.list()
+    return {"success": True, "keys": keys, "count": len(keys)}
+
+@router.delete("/hmac/keys/{key_id}", summary="Delete HMAC Key")
+async def hmac_key_delete(key_id: str):
+    if not hmac_service.hmac_keys.remove(key_id):
+        raise HTTPException(status_code=404, detail="Key not found")
+    return {"success": True, "deleted": key_id}
+
+@router.post("/hmac/sign", summary="Sign Messages with HMAC")
+async def hmac_sign(payload: HmacSignPayload):
+    if payload.output not in ("hex", "base64", "both"):
+        raise HTTPException(status_code=400, detail="output must be hex, base64 or both")
+    context, alg = _hmac_context(payload.key_id, payload.key, payload.key_encoding, payload.algorithm)
+    messages = _decode_messages(payload.messages, payload.message_encoding)
+
+    signatures = [
+        hmac_service.format_digest(hmac_service.sign(context, m), payload.output) for m in messages
     ]
+    return {"success": True, "algorithm": alg, "count": len(signatures), "signatures": signatures}
+
+@router.post("/hmac/verify", summary="Verify HMAC Signatures")
+async def hmac_verify(payload: HmacVerifyPayload):
+    if payload.signature_encoding not in ("hex", "base64"):
+        raise HTTPException(status_code=400, detail="signature_encoding must be hex or base64")
+    context, alg = _hmac_context(payload.key_id, payload.key, payload.key_encoding, payload.algorithm)
+    messages = _decode_messages([item.message for item in payload.items], payload.message_encoding)
+
+    results = [
+        hmac_service.verify(context, m, item.signature, payload.signature_encoding)
+        for m, item in zip(messages, payload.items)
+    ]
+    return {
+        "success": True,
+        "algorithm": alg,
+        "all_valid": all(results),
+        "valid_count": sum(results),
+        "results": [{"index": i, "valid": ok} for i, ok in enumerate(results)],
+    }
 
+@router.post("/validate/email", summary="Validate Email")
+async def validate_email(payload: EmailValidatePayload):
+    result = check_address(payload.email)
+    domain = result["domain"]
     return {
         "success": True,
-        "email": email,
-        "valid": basic_valid and len(issues) == 0,
-        "issues": issues,
-        "is_disposable": domain in disposable_domains,
-        "local_part": email.split("@")[0] if "@" in email else None,
-        "domain": domain or None,
+        "email": result["email"],
+        "valid": result["valid"],
+        "issues": result["issues"],
+        "is_disposable": bool(domain) and is_disposable_domain(domain),
+        "local_part": result["local_part"],
+        "domain": domain,
     }
 
+@router.post("/validate/email/batch", summary="Validate Email List")
+async def validate_email_batch(
+    request: Request,
+    format: str = Query("auto", description="auto, csv, ndjson or text"),
+    column: Optional[str] = Query(None, description="CSV column / NDJSON field holding the address"),
+    check_mx: bool = Query(False, description="Look up MX records once per distinct domain"),
+):
+    data, _ = await read_upload(request)
+    try:
+        emails = await asyncio.to_thread(parse_address_list, data.decode("utf-8", errors="replace"), format, column)
+    except (ValueError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not emails:
+        raise HTTPException(status_code=400, detail="No addresses found")
+    if len(emails) > MAX_EMAIL_BATCH:
+        raise HTTPException(status_code=400, detail=f"Maximum addresses per batch is {MAX_EMAIL_BATCH}")
+
+    report = await validate_batch(emails, check_mx)
+    return {"success": True, **report}
+
 @router.post("/secret/generate", summary="Generate Secret Token")
 async def secret_generate(payload: SecretTokenPayload):
     length = min(payload.length, 256)
-    token_bytes = secrets.token_bytes(length)
-
-    if payload.format == "base64":
-        token = base64.b64encode(token_bytes).decode("utf-8")
-    elif payload.format == "urlsafe":
-        token = base64.urlsafe_b64encode(token_bytes).decode("utf-8").rstrip("=")
-    else:
-        token = token_bytes.hex()
+    token = format_token(secrets.token_bytes(length), payload.format)
 
     return {
         "success": True,
@@ -496,6 +784,81 @@ async def secret_generate(payload: SecretTokenPayload):
         "entropy_bits": length * 8,
     }
 
+def _public_key_record(record: dict) -> dict:
+    return {k: v for k, v in record.items() if k != "fingerprint"}
+
+KEY_STORE_ERROR = "API key store could not be read or saved"
+
+@router.post("/secret/mint", summary="Mint Secrets / API Keys in Bulk")
+async def secret_mint(payload: SecretMintPayload):
+    if payload.format not in TOKEN_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {TOKEN_FORMATS}")
+    if payload.prefix and not API_KEY_PREFIX_RE.match(payload.prefix):
+        raise HTTPException(status_code=400, detail="prefix must be 1-16 letters/digits starting with a letter")
+
+    try:
+        keys = await asyncio.to_thread(
+            mint_keys,
+            payload.count,
+            payload.length,
+            payload.format,
+            payload.prefix,
+            payload.checksum,
+            key_store if payload.store else None,
+            payload.label,
+        )
+    except (OSError, ValueError):
+        raise HTTPException(status_code=500, detail=KEY_STORE_ERROR)
+    result = {
+        "success": True,
+        "count": len(keys),
+        "format": payload.format,
+        "bytes": payload.length,
+        "entropy_bits": payload.length * 8,
+        "checksum": payload.checksum,
+        "keys": keys,
+    }
+    if payload.store:
+        result["lookup_ids"] = [api_key_lookup_id(k) for k in keys]
+    return result
+
+@router.post("/secret/verify", summary="Verify an Issued Key")
+async def secret_verify(payload: SecretVerifyPayload):
+    checksum_valid = verify_key_checksum(payload.key) if payload.checksum else None
+    record = None
+    if checksum_valid is not False:
+        try:
+            record = key_store.verify(payload.key)
+        except (OSError, ValueError):
+            raise HTTPException(status_code=500, detail=KEY_STORE_ERROR)
+    return {
+        "success": True,
+        "valid": checksum_valid is not False and record is not None and not record["revoked"],
+        "checksum_valid": checksum_valid,
+        "registered": record is not None,
+        "record": _public_key_record(record) if record else None,
+    }
+
+@router.get("/secret/lookup", summary="Look Up an Issued Key by Prefix")
+async def secret_lookup(lookup_id: str = Query(..., description="Key prefix as returned by /secret/mint")):
+    try:
+        record = key_store.get(lookup_id)
+    except (OSError, ValueError):
+        raise HTTPException(status_code=500, detail=KEY_STORE_ERROR)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Key not found")
+    return {"success": True, "record": _public_key_record(record)}
+
+@router.post("/secret/revoke", summary="Revoke an Issued Key")
+async def secret_revoke(payload: SecretRevokePayload):
+    try:
+        revoked = await asyncio.to_thread(key_store.revoke, payload.lookup_id)
+    except (OSError, ValueError):
+        raise HTTPException(status_code=500, detail=KEY_STORE_ERROR)
+    if not revoked:
+        raise HTTPException(status_code=404, detail="Key not found")
+    return {"success": True, "revoked": payload.lookup_id}
+
 @router.get("/secret/api-key", summary="Generate API Key")
 async def generate_api_key(
     prefix: str = Query("sk"), length: int = Query(32, ge=16, le=64)
@@ -535,31 +898,86 @@ async def checksum_calculate(payload: ChecksumPayload):
         "input_length": len(payload.data),
     }
 
+@router.post("/checksum/stream", summary="Checksum uploaded file (streaming)")
+async def checksum_stream(
+    request: Request,
+    algorithms: str = Query("crc32", description="Comma-separated, e.g. crc32,adler32,xxh64"),
+    encoding: str = Query("hex", description="hex or base64"),
+):
+    result = await _hash_upload(request, algorithms, encoding)
+    result["checksums"] = result.pop("hashes")
+    return result
+
+def _xor_key(key: str, encoding: str) -> bytes:
+    try:
+        raw = hmac_service.decode_value(key, encoding)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not raw:
+        raise HTTPException(status_code=400, detail="Key must not be empty")
+    return raw
+
 @router.post("/encrypt/xor", summary="XOR Encrypt")
 async def xor_encrypt(payload: EncryptPayload):
-    data, key = payload.data, payload.key
-    extended_key = (key * (len(data) // len(key) + 1))[: len(data)]
-    encrypted = "".join(chr(ord(d) ^ ord(k)) for d, k in zip(data, extended_key))
+    key = _xor_key(payload.key, payload.key_encoding)
+    encrypted = xor_bytes(payload.data.encode("utf-8"), key)
     return {
         "success": True,
-        "encrypted": base64.b64encode(encrypted.encode("latin-1")).decode("utf-8"),
+        "encrypted": base64.b64encode(encrypted).decode("utf-8"),
         "warning": "XOR is NOT secure for production",
     }
 
 @router.post("/decrypt/xor", summary="XOR Decrypt")
 async def xor_decrypt(payload: EncryptPayload):
+    key = _xor_key(payload.key, payload.key_encoding)
     try:
-        encrypted = base64.b64decode(payload.data).decode("latin-1")
-        key = payload.key
-        extended_key = (key * (len(encrypted) // len(key) + 1))[: len(encrypted)]
-        return {
-            "success": True,
-            "decrypted": "".join(
-                chr(ord(e) ^ ord(k)) for e, k in zip(encrypted, extended_key)
-            ),
-        }
+        decrypted = xor_bytes(base64.b64decode(payload.data), key)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    try:
+        text, encoding = decrypted.decode("utf-8"), "utf-8"
+    except UnicodeDecodeError:
+        # Ciphertexts from the old per-character implementation decode as latin-1.
+        text, encoding = decrypted.decode("latin-1"), "latin-1"
+    return {
+        "success": True,
+        "decrypted": text,
+        "encoding": encoding,
+        "decrypted_base64": base64.b64encode(decrypted).decode("utf-8"),
+    }
+
+@router.post("/xor/stream", summary="XOR Binary Upload (streaming)")
+async def xor_stream(
+    request: Request,
+    key: Optional[str] = Query(None, description="Key; prefer the X-XOR-Key header"),
+    key_encoding: str = Query("utf-8", description="utf-8, hex or base64"),
+):
+    """XOR a multipart or raw upload chunk by chunk. XOR is symmetric, so the
+    same call encrypts and decrypts. Memory use stays at one chunk."""
+    key = request.headers.get("x-xor-key") or key
+    if not key:
+        raise HTTPException(status_code=400, detail="Key is required")
+    stream = XorStream(_xor_key(key, key_encoding))
+    # The body is spooled to disk first: reading the request while the
+    # response is already streaming stalls behind the usage middleware.
+    fileobj, _ = await spool_upload(request, max_bytes=MAX_XOR_STREAM_BYTES)
+    fileobj.seek(0)
+
+    def generate():
+        try:
+            while True:
+                chunk = fileobj.read(XOR_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield stream.update(chunk)
+        finally:
+            fileobj.close()
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/octet-stream",
+        headers={"X-XOR-Backend": xor_backend()},
+    )
 
 @router.post("/otp/generate", summary="Generate TOTP")
 async def otp_generate(payload: OTPPayload):
@@ -569,29 +987,95 @@ async def otp_generate(payload: OTPPayload):
         "utf-8"
     ).rstrip("=")
     current_time = int(time.time())
-    counter = current_time // payload.period
-
-    key = base64.b32decode(secret + "=" * ((8 - len(secret) % 8) % 8))
-    msg = counter.to_bytes(8, "big")
-    hmac_hash = hmac.new(key, msg, hashlib.sha1).digest()
-
-    offset = hmac_hash[-1] & 0x0F
-    code = (
-        ((hmac_hash[offset] & 0x7F) << 24)
-        | ((hmac_hash[offset + 1] & 0xFF) << 16)
-        | ((hmac_hash[offset + 2] & 0xFF) << 8)
-        | (hmac_hash[offset + 3] & 0xFF)
-    )
-    otp = str(code % (10**payload.digits)).zfill(payload.digits)
+    try:
+        prepared = otp.prepare(secret, payload.algorithm)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    code = otp.hotp(prepared, otp.time_counter(payload.period, current_time), payload.digits)
 
     return {
         "success": True,
         "secret": secret,
-        "current_code": otp,
+        "current_code": code,
         "digits": payload.digits,
         "period": payload.period,
+        "algorithm": payload.algorithm.lower(),
         "time_remaining": payload.period - (current_time % payload.period),
-        "provisioning_uri": f"otpauth://totp/UtilityTools:user?secret={secret}&issuer=UtilityTools&digits={payload.digits}&period={payload.period}",
+        "provisioning_uri": otp.provisioning_uri(
+            secret, digits=payload.digits, period=payload.period, algorithm=payload.algorithm.lower()
+        ),
+    }
+
+@router.post("/otp/verify", summary="Verify TOTP/HOTP Code")
+async def otp_verify(payload: OTPVerifyPayload):
+    if payload.type not in ("totp", "hotp"):
+        raise HTTPException(status_code=400, detail="type must be totp or hotp")
+    try:
+        prepared = otp.prepare(payload.secret, payload.algorithm)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if payload.type == "hotp":
+        if payload.counter is None:
+            raise HTTPException(status_code=400, detail="counter is required for hotp")
+        counter = payload.counter
+    else:
+        counter = otp.time_counter(payload.period, payload.timestamp)
+
+    offset = otp.verify(prepared, payload.code, counter, payload.digits, payload.window)
+    result = {
+        "success": True,
+        "valid": offset is not None,
+        "type": payload.type,
+        "offset": offset,
+        "matched_counter": counter + offset if offset is not None else None,
+    }
+    if payload.type == "hotp" and offset is not None:
+        # The next counter the client should present.
+        result["next_counter"] = counter + offset + 1
+    return result
+
+@router.post("/otp/bulk", summary="Generate OTP Codes in Bulk")
+async def otp_bulk(payload: OTPBulkPayload):
+    if payload.type not in ("totp", "hotp"):
+        raise HTTPException(status_code=400, detail="type must be totp or hotp")
+    if not payload.secrets:
+        raise HTTPException(status_code=400, detail="secrets must not be empty")
+    if len(payload.secrets) * payload.count > MAX_OTP_BULK_CODES:
+        raise HTTPException(status_code=400, detail=f"Maximum codes per request is {MAX_OTP_BULK_CODES}")
+
+    if payload.type == "totp":
+        start_counter = otp.time_counter(payload.period, payload.start)
+    else:
+        start_counter = int(payload.start or 0)
+
+    try:
+        prepared = [otp.prepare(s, payload.algorithm) for s in payload.secrets]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def generate():
+        return [
+            otp.codes_for_range(p, start_counter, payload.count, payload.digits)
+            for p in prepared
+        ]
+
+    all_codes = await asyncio.to_thread(generate)
+    results = []
+    for secret, codes in zip(payload.secrets, all_codes):
+        entry = {"secret": secret, "codes": codes, "start_counter": start_counter}
+        if payload.type == "totp":
+            entry["start_time"] = start_counter * payload.period
+        results.append(entry)
+
+    return {
+        "success": True,
+        "type": payload.type,
+        "algorithm": payload.algorithm.lower(),
+        "digits": payload.digits,
+        "period": payload.period if payload.type == "totp" else None,
+        "count": payload.count,
+        "results": results,
     }
 
 class UrlShortenPayload(BaseModel):
@@ -602,7 +1086,6 @@ class FileMetadataPayload(BaseModel):
     file_data: str
     file_name: str
 
-import json
 import os
 
 URL_STORE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "url_store.json")
@@ -671,123 +1154,43 @@ async def redirect_url(slug: str):
 @router.post("/metadata/file", summary="Analyze file metadata")
 async def file_metadata(payload: FileMetadataPayload):
     try:
-        import mimetypes
-        import struct
-        
-        file_name = payload.file_name
-        file_data = payload.file_data
-        
         try:
-            file_bytes = base64.b64decode(file_data)
+            file_bytes = base64.b64decode(payload.file_data)
         except:
-            file_bytes = file_data.encode() if isinstance(file_data, str) else file_data
-        
-        _, ext = file_name.rsplit(".", 1) if "." in file_name else (file_name, "")
-        
-        mime_type, _ = mimetypes.guess_type(file_name)
-        
-        metadata = {
-            "success": True,
-            "file_name": file_name,
-            "file_size_bytes": len(file_bytes),
-            "extension": ext.lower(),
-            "mime_type": mime_type or "application/octet-stream",
-        }
-        
-        if mime_type and mime_type.startswith("image/"):
-            metadata["type"] = "image"
-            
-            if mime_type == "image/jpeg":
-                dimensions = extract_jpeg_dimensions(file_bytes)
-                if dimensions:
-                    metadata["width"], metadata["height"] = dimensions
-            elif mime_type == "image/png":
-                dimensions = extract_png_dimensions(file_bytes)
-                if dimensions:
-                    metadata["width"], metadata["height"] = dimensions
-            elif mime_type == "image/gif":
-                dimensions = extract_gif_dimensions(file_bytes)
-                if dimensions:
-                    metadata["width"], metadata["height"] = dimensions
-        
-        elif mime_type == "application/pdf":
-            metadata["type"] = "pdf"
-            try:
-                page_count = file_bytes.count(b"/Type/Page")
-                if page_count > 0:
-                    metadata["pages"] = page_count
-            except:
-                pass
-        
-        elif mime_type == "application/json":
-            metadata["type"] = "json"
-            try:
-                content = file_bytes.decode("utf-8")
-                import json
-                json_data = json.loads(content)
-                metadata["valid_json"] = True
-                metadata["keys"] = list(json_data.keys()) if isinstance(json_data, dict) else None
-            except:
-                metadata["valid_json"] = False
-        
-        elif mime_type and mime_type.startswith("text/"):
-            metadata["type"] = "text"
-            try:
-                content = file_bytes.decode("utf-8")
-                metadata["line_count"] = content.count("\n") + 1
-                metadata["character_count"] = len(content)
-            except:
-                try:
-                    content = file_bytes.decode("latin-1")
-                    metadata["line_count"] = content.count("\n") + 1
-                    metadata["character_count"] = len(content)
-                except:
-                    pass
-        
-        else:
-            metadata["type"] = "binary"
-        
-        return metadata
-    
+            file_bytes = payload.file_data.encode()
+        return analyze_buffer(file_bytes, len(file_bytes), payload.file_name)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-def extract_jpeg_dimensions(data: bytes):
-    """Extract width and height from JPEG file"""
+@router.post("/metadata/file/upload", summary="Analyze uploaded file metadata")
+async def file_metadata_upload(request: Request, file_name: Optional[str] = Query(None)):
+    fileobj, uploaded_name = await spool_upload(request, max_bytes=MAX_METADATA_UPLOAD_BYTES)
     try:
-        offset = 0
-        while offset < len(data):
-            offset = data.find(b"\xff", offset)
-            if offset == -1:
-                break
-            marker = data[offset + 1]
-            if marker == 0xc0 or marker == 0xc1 or marker == 0xc2:
-                height = (data[offset + 5] << 8) + data[offset + 6]
-                width = (data[offset + 7] << 8) + data[offset + 8]
-                return (width, height)
-            offset += 2
-    except:
-        pass
-    return None
+        return await asyncio.to_thread(
+            analyze_file, fileobj, file_name or uploaded_name or "upload"
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        fileobj.close()
 
-def extract_png_dimensions(data: bytes):
-    """Extract width and height from PNG file"""
-    try:
-        if data.startswith(b"\x89PNG"):
-            width = int.from_bytes(data[16:20], "big")
-            height = int.from_bytes(data[20:24], "big")
-            return (width, height)
-    except:
-        pass
-    return None
+@router.get("/metadata/file/path", summary="Analyze server-side file metadata")
+async def file_metadata_path(path: str = Query(..., description="Path relative to METADATA_ROOT")):
+    if not METADATA_ROOT:
+        raise HTTPException(status_code=403, detail="Server-side path analysis is disabled")
+
+    root = Path(METADATA_ROOT).resolve()
+    target = (root / path).resolve()
+    if not target.is_relative_to(root):
+        raise HTTPException(status_code=403, detail="Path is outside METADATA_ROOT")
+    if not target.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+
+    def analyze():
+        with open(target, "rb") as f:
+            return analyze_file(f, target.name)
 
-def extract_gif_dimensions(data: bytes):
-    """Extract width and height from GIF file"""
     try:
-        if data[:3] in (b"GIF87a", b"GIF89a"):
-            width = int.from_bytes(data[6:8], "little")
-            height = int.from_bytes(data[8:10], "little")
-            return (width, height)
-    except:
-        pass
-    return None
+        return await asyncio.to_thread(analyze)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,3 +1,5 @@
+import os
+import tempfile
 from pathlib import Path
 
 APP_TITLE = "Utility Tools API"
@@ -19,9 +21,17 @@ TOOL_PATH_MAPPING = {
     "/api/developer/html/decode": "html-decode",
     "/api/developer/regex/test": "regex-test",
     "/api/developer/uuid/generate": "uuid-generate",
+    "/api/developer/uuid/generate/stream": "uuid-generate",
+    "/api/developer/uuid/v5": "uuid-generate",
+    "/api/developer/uuid/validate/batch": "uuid-validate",
     "/api/developer/diff": "text-diff",
     "/api/developer/jwt/decode": "jwt-decode",
+    "/api/developer/jwt/verify": "jwt-verify",
     "/api/developer/http/ping": "http-ping",
+    "/api/developer/monitor/targets": "uptime-monitor",
+    "/api/developer/image/resize": "image-resize",
+    "/api/developer/image/resize/binary": "image-resize",
+    "/api/developer/image/batch": "image-batch",
     "/api/developer/yaml-to-json": "yaml-to-json",
     "/api/developer/json-to-yaml": "json-to-yaml",
     "/api/developer/env/netlify": "env-netlify",
@@ -31,19 +41,44 @@ TOOL_PATH_MAPPING = {
     "/api/developer/encodings": "list-encodings",
 
     "/api/security/password/generate": "password-generate",
+    "/api/security/password/generate/stream": "password-generate",
     "/api/security/password/strength": "password-strength",
     "/api/security/password/policy": "password-policy",
+    "/api/security/password/policy/register": "password-policy",
+    "/api/security/password/policy/audit": "password-policy-audit",
     "/api/security/hash/generate": "hash-generate",
     "/api/security/hash/verify": "hash-verify",
     "/api/security/hash/all": "hash-all",
+    "/api/security/hash/stream": "hash-stream",
+    "/api/security/hash/verify/manifest": "hash-verify-manifest",
+    "/api/security/checksum/stream": "checksum-stream",
+    "/api/security/xor/stream": "xor-stream",
+    "/api/security/otp/generate": "otp-generate",
+    "/api/security/otp/verify": "otp-verify",
+    "/api/security/otp/bulk": "otp-bulk",
     "/api/security/hmac/generate": "hmac-generate",
+    "/api/security/hmac/keys": "hmac-keys",
+    "/api/security/hmac/sign": "hmac-sign",
+    "/api/security/hmac/verify": "hmac-verify",
     "/api/security/validate/email": "email-validate",
+    "/api/security/validate/email/batch": "email-validate-batch",
     "/api/security/secret/generate": "secret-generate",
+    "/api/security/secret/mint": "secret-mint",
+    "/api/security/secret/verify": "secret-verify",
+    "/api/security/secret/lookup": "secret-verify",
+    "/api/security/secret/revoke": "secret-verify",
+    "/api/security/metadata/file": "file-metadata",
+    "/api/security/metadata/file/upload": "file-metadata",
+    "/api/security/metadata/file/path": "file-metadata",
 
     "/api/data/csv-to-json": "csv-to-json",
     "/api/data/json-to-csv": "json-to-csv",
     "/api/data/sql/format": "sql-format",
     "/api/data/sql/minify": "sql-minify",
+    "/api/data/sql/minify/stream": "sql-minify",
+    "/api/data/sql/split": "sql-minify",
+    "/api/data/sql/normalize": "sql-analyze",
+    "/api/data/sql/analyze": "sql-analyze",
     "/api/data/fake/generate": "fake-data",
     "/api/data/base/convert": "base-convert",
     "/api/data/text/word-count": "word-count",
@@ -73,15 +108,119 @@ CORS_ALLOW_HEADERS = ["*"]
 RATE_LIMIT_REQUESTS = 100
 
 HTTP_TIMEOUT = 10.0
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+PING_HISTOGRAM_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
 DEFAULT_UUID_COUNT = 1
 DEFAULT_FAKE_DATA_COUNT = 5
 DEFAULT_PASSWORD_LENGTH = 16
 DEFAULT_RANDOM_STRING_LENGTH = 16
 DEFAULT_SECRET_LENGTH = 32
 
-MAX_UUID_COUNT = 100
+MAX_UUID_COUNT = 10000
+MAX_UUID_STREAM_COUNT = 10_000_000
+MAX_UUID_NAMES = 100000
+UUID_STREAM_BATCH = 10000
+MAX_UUID_VALIDATE_BATCH = 200000
+MAX_SLUG_BATCH = 100000
+MAX_SLUG_EXISTING = 1_000_000
 MAX_FAKE_DATA_COUNT = 100
 MAX_PASSWORD_LENGTH = 128
 MAX_RANDOM_STRING_LENGTH = 1024
 MAX_SECRET_LENGTH = 128
 MAX_HAR_ENTRIES = 50
+MAX_PING_URLS = 50
+MAX_PING_SAMPLES = 20
+MAX_PING_CONCURRENCY = 20
+
+MONITOR_MAX_TARGETS = 1000
+MONITOR_MIN_INTERVAL = 5.0
+MONITOR_CONCURRENCY = 20
+MONITOR_HISTORY_SIZE = 500
+MONITOR_JITTER = 0.1
+
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+IMAGE_WORKERS = os.cpu_count() or 1
+MAX_IMAGE_SIZES = 10
+MAX_BATCH_IMAGES = 200
+MAX_BATCH_INFLATED_BYTES = 500 * 1024 * 1024
+IMAGE_CACHE_DIR = Path(tempfile.gettempdir()) / "utility-tools-image-cache"
+IMAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Server-side path analysis is only enabled when a root directory is configured.
+METADATA_ROOT = os.environ.get("METADATA_ROOT")
+MAX_METADATA_UPLOAD_BYTES = 8 * 1024 * 1024 * 1024
+METADATA_TEXT_DECODE_LIMIT = 16 * 1024 * 1024
+METADATA_ZIP_NAME_LIMIT = 100
+METADATA_PDF_STREAM_LIMIT = 64 * 1024 * 1024
+
+MAX_HASH_UPLOAD_BYTES = 8 * 1024 * 1024 * 1024
+HASH_BLOCK_SIZE = 4 * 1024 * 1024
+HASH_PARALLEL_THRESHOLD = 256 * 1024
+HASH_WORKERS = os.cpu_count() or 1
+BLAKE2_TREE_LEAF_SIZE = 1024 * 1024
+MAX_MANIFEST_ENTRIES = 10000
+
+MAX_PASSWORD_COUNT = 1000
+MAX_PASSWORD_STREAM_COUNT = 1_000_000
+PASSWORD_STREAM_BATCH = 1000
+PASSWORD_RANDOM_BLOCK_SIZE = 64 * 1024
+# Optional Bloom filter of breached passwords (see app/utils/password_strength.py).
+PASSWORD_BLOOM_PATH = os.environ.get("PASSWORD_BLOOM_PATH")
+PASSWORD_STRENGTH_MAX_LENGTH = 128
+MAX_REGISTERED_POLICIES = 1000
+MAX_POLICY_AUDIT_PASSWORDS = 10000
+
+OTP_KEY_CACHE_SIZE = 1024
+MAX_OTP_WINDOW = 10
+# HOTP/TOTP counters are packed as 64-bit big-endian; leave headroom for ranges.
+MAX_OTP_COUNTER = 2**63
+MAX_OTP_BULK_CODES = 100000
+
+MAX_HMAC_KEYS = 1000
+MAX_HMAC_BATCH = 10000
+
+MAX_EMAIL_BATCH = 100000
+EMAIL_MX_TTL = 3600
+EMAIL_MX_TIMEOUT = 5.0
+EMAIL_MX_CONCURRENCY = 20
+EMAIL_MX_CACHE_SIZE = 10000
+
+MAX_XOR_STREAM_BYTES = 8 * 1024 * 1024 * 1024
+XOR_CHUNK_SIZE = 1024 * 1024
+
+MAX_MINT_COUNT = 100000
+API_KEY_LOOKUP_CHARS = 8
+API_KEY_STORE_FILE = Path(__file__).resolve().parent.parent / "api_key_store.json"
+
+MAX_CRON_RUNS = 1000
+MAX_CRON_EXPRESSIONS = 500
+MAX_CRON_WINDOW_RUNS = 100000
+MAX_CRON_TOTAL_RUNS = 200000
+MAX_CRON_OVERLAPS = 1000
+CRON_CACHE_SIZE = 1024
+MAX_CRONTAB_LINES = 5000
+MAX_CRON_ANALYZE_MINUTES = 31 * 24 * 60
+MAX_CRON_SUGGEST_JOBS = 250
+
+MAX_SQL_UPLOAD_BYTES = 8 * 1024 * 1024 * 1024
+MAX_SQL_INDENT = 8
+MIN_SQL_WIDTH = 20
+MAX_SQL_WIDTH = 400
+SQL_STREAM_CHUNK = 1024 * 1024
+SQL_STREAM_BATCH = 1000
+SQL_FINGERPRINT_CACHE_SIZE = 4096
+SQL_FINGERPRINT_CACHE_CHARS = 4096
+MAX_SQL_NORMALIZE_BATCH = 10000
+MAX_SQL_FINGERPRINTS = 10000
+SQL_RESERVOIR_SIZE = 512
+MAX_SQL_REPORT_TOP = 1000
+
+MAX_TIMESTAMP_BATCH = 100000
+MAX_TIMESTAMP_UPLOAD_BYTES = 512 * 1024 * 1024
+TIMESTAMP_STREAM_BATCH = 1000
+
+MAX_JWT_BATCH = 10000
+JWT_KEY_CACHE_SIZE = 256
+JWT_JWKS_TTL = 300
+JWT_JWKS_DIR = Path(os.getenv("JWT_JWKS_DIR", Path(__file__).resolve().parent.parent / "jwks"))
@@ -0,0 +1,203 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config import API_KEY_LOOKUP_CHARS, API_KEY_STORE_FILE
+
+BASE62 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+CHECKSUM_LENGTH = 6
+PREFIX_RE = re.compile(r"^[A-Za-z][A-Za-z0-9]{0,15}$")
+TOKEN_FORMATS = ["hex", "base64", "urlsafe", "base62"]
+
+
+def _base62(value: int, width: int) -> str:
+    chars = []
+    while value:
+        value, rem = divmod(value, 62)
+        chars.append(BASE62[rem])
+    return "".join(reversed(chars)).rjust(width, "0")
+
+
+def format_token(raw: bytes, fmt: str) -> str:
+    if fmt == "base64":
+        return base64.b64encode(raw).decode("ascii")
+    if fmt == "urlsafe":
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+    if fmt == "base62":
+        return _base62(int.from_bytes(raw, "big"), (len(raw) * 8 * 100 + 594) // 595)
+    return raw.hex()
+
+
+def checksum(text: str) -> str:
+    """CRC32 of the key body as 6 base62 characters (the GitHub token scheme)."""
+    return _base62(zlib.crc32(text.encode("utf-8")), CHECKSUM_LENGTH)
+
+
+def build_key(prefix: Optional[str], body: str, with_checksum: bool) -> str:
+    key = f"{prefix}_{body}" if prefix else body
+    return key + checksum(key) if with_checksum else key
+
+
+def verify_checksum(key: str) -> bool:
+    """Offline check that a key was not mistyped or truncated; no store lookup needed."""
+    if len(key) <= CHECKSUM_LENGTH:
+        return False
+    body, suffix = key[:-CHECKSUM_LENGTH], key[-CHECKSUM_LENGTH:]
+    return hmac.compare_digest(checksum(body), suffix)
+
+
+def fingerprint(key: str) -> str:
+    # Keys carry >=128 random bits, so an unsalted SHA-256 is not brute-forceable.
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def lookup_id(key: str) -> str:
+    """Public identifier: the prefix plus the first characters of the random body."""
+    prefix, sep, body = key.partition("_")
+    if not sep:
+        return key[:API_KEY_LOOKUP_CHARS]
+    return f"{prefix}_{body[:API_KEY_LOOKUP_CHARS]}"
+
+
+def mint_tokens(count: int, nbytes: int, fmt: str) -> List[str]:
+    """Draw all randomness in one os.urandom call and slice it per token."""
+    block = os.urandom(count * nbytes)
+    return [format_token(block[i:i + nbytes], fmt) for i in range(0, count * nbytes, nbytes)]
+
+
+class KeyFingerprintStore:
+    """Issued keys indexed by lookup id, holding only SHA-256 fingerprints.
+
+    A dict keyed by lookup id gives O(1) lookups; minting re-draws any key
+    whose lookup id is already taken, so ids never collide. Mints run in
+    worker threads, so every read-modify-write of the records, and each
+    snapshot written to disk, happens under one lock.
+    """
+
+    def __init__(self, path: Path = API_KEY_STORE_FILE):
+        self.path = Path(path)
+        self._records: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.RLock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            if self._records is None:
+                try:
+                    self._records = json.loads(self.path.read_text(encoding="utf-8"))
+                except FileNotFoundError:
+                    self._records = {}
+            return self._records
+
+    def save(self) -> None:
+        """Write the records atomically; OSError propagates to the caller."""
+        with self._lock:
+            data = json.dumps(self._load())
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def __contains__(self, lookup: str) -> bool:
+        return lookup in self._load()
+
+    def _record(self, key: str, label: Optional[str]) -> Dict[str, Any]:
+        return {
+            "lookup_id": lookup_id(key),
+            "fingerprint": fingerprint(key),
+            "label": label,
+            "created_at": time.time(),
+            "revoked": False,
+        }
+
+    def add(self, key: str, label: Optional[str] = None) -> Dict[str, Any]:
+        record = self._record(key, label)
+        with self._lock:
+            self._load()[record["lookup_id"]] = record
+        return record
+
+    def add_new(self, keys: List[str], label: Optional[str] = None) -> List[str]:
+        """Register the keys whose lookup id is still free; return those keys.
+
+        The check and the insert happen under the lock, so concurrent mints
+        can never overwrite each other's records.
+        """
+        records = [self._record(key, label) for key in keys]
+        added = []
+        with self._lock:
+            store = self._load()
+            for key, record in zip(keys, records):
+                if record["lookup_id"] not in store:
+                    store[record["lookup_id"]] = record
+                    added.append(key)
+        return added
+
+    def discard(self, keys: List[str]) -> None:
+        with self._lock:
+            store = self._load()
+            for key in keys:
+                store.pop(lookup_id(key), None)
+
+    def get(self, lookup: str) -> Optional[Dict[str, Any]]:
+        return self._load().get(lookup)
+
+    def verify(self, key: str) -> Optional[Dict[str, Any]]:
+        record = self.get(lookup_id(key))
+        if record is None or not hmac.compare_digest(record["fingerprint"], fingerprint(key)):
+            return None
+        return record
+
+    def revoke(self, lookup: str) -> bool:
+        with self._lock:
+            record = self.get(lookup)
+            if record is None:
+                return False
+            # Revocation stays in effect in memory even if saving fails.
+            record["revoked"] = True
+            self.save()
+        return True
+
+
+key_store = KeyFingerprintStore()
+
+
+def mint_keys(
+    count: int,
+    nbytes: int,
+    fmt: str,
+    prefix: Optional[str],
+    with_checksum: bool,
+    store: Optional[KeyFingerprintStore] = None,
+    label: Optional[str] = None,
+) -> List[str]:
+    """Mint ``count`` distinct keys; when a store is given, register their fingerprints.
+
+    Raises OSError (after forgetting the new records) if the store cannot be saved.
+    """
+    keys: List[str] = []
+    seen = set()
+    while len(keys) < count:
+        batch = []
+        for body in mint_tokens(count - len(keys), nbytes, fmt):
+            key = build_key(prefix, body, with_checksum)
+            lookup = lookup_id(key) if store is not None else key
+            if lookup in seen:
+                continue
+            seen.add(lookup)
+            batch.append(key)
+        if store is not None:
+            batch = store.add_new(batch, label)
+        keys.extend(batch)
+    if store is not None:
+        try:
+            store.save()
+        except OSError:
+            store.discard(keys)
+            raise
+    return keys
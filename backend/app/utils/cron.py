@@ -0,0 +1,469 @@
+import calendar
+import heapq
+import itertools
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from ..config import CRON_CACHE_SIZE
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+MONTH_NAMES = {name.upper(): i for i, name in enumerate(calendar.month_abbr) if name}
+DAY_NAMES = {"SUN": 0, "MON": 1, "TUE": 2, "WED": 3, "THU": 4, "FRI": 5, "SAT": 6}
+
+# (label, min, max, names) in expression order; the optional sixth field is
+# seconds, as in croniter.
+FIELDS = [
+    ("minute", 0, 59, None),
+    ("hour", 0, 23, None),
+    ("day of month", 1, 31, None),
+    ("month", 1, 12, MONTH_NAMES),
+    ("day of week", 0, 7, DAY_NAMES),
+    ("second", 0, 59, None),
+]
+# Wall-clock offsets jump by at most two hours at a transition, so a
+# candidate this far behind the current one can no longer be overtaken.
+DST_MARGIN = timedelta(hours=3)
+UTC = timezone.utc
+
+
+class CronError(ValueError):
+    pass
+
+
+def next_bit(mask: int, start: int) -> Optional[int]:
+    """Lowest set bit at position >= start, or None."""
+    if start < 0:
+        start = 0
+    m = mask >> start
+    if not m:
+        return None
+    return start + (m & -m).bit_length() - 1
+
+
+def prev_bit(mask: int, start: int) -> Optional[int]:
+    """Highest set bit at position <= start, or None."""
+    if start < 0:
+        return None
+    m = mask & ((2 << start) - 1)
+    return m.bit_length() - 1 if m else None
+
+
+def bits(mask: int) -> List[int]:
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(low.bit_length() - 1)
+        mask ^= low
+    return out
+
+
+def _value(token: str, names: Optional[Dict[str, int]], label: str) -> int:
+    if names and token.upper() in names:
+        return names[token.upper()]
+    if not token.isdigit():
+        raise CronError(f"Invalid {label} value: {token!r}")
+    return int(token)
+
+
+def parse_term(term: str, label: str, lo: int, hi: int, names: Optional[Dict[str, int]]) -> Tuple[int, Dict[str, Any]]:
+    """Parse one comma-separated term into (bitmask, description parts)."""
+    base, _, step_text = term.partition("/")
+    step = 1
+    if step_text:
+        if not step_text.isdigit() or int(step_text) == 0:
+            raise CronError(f"Invalid step in {label} field: {term!r}")
+        step = int(step_text)
+
+    if base in ("*", "?"):
+        start, end, kind = lo, hi if label != "day of week" else 6, "all"
+    elif "-" in base:
+        a, b = base.split("-", 1)
+        start, end, kind = _value(a, names, label), _value(b, names, label), "range"
+        if label == "day of week" and end == 0:
+            end = 7  # FRI-SUN
+    else:
+        start = _value(base, names, label)
+        end, kind = (hi if step_text else start), ("from" if step_text else "value")
+        if label == "day of week" and step_text:
+            end = 6
+
+    if not lo <= start <= hi or not lo <= end <= hi:
+        raise CronError(f"{label.capitalize()} value out of range {lo}-{hi}: {term!r}")
+    if start > end:
+        raise CronError(f"Invalid {label} range: {term!r}")
+
+    mask = 0
+    for v in range(start, end + 1, step):
+        mask |= 1 << v
+    return mask, {"kind": kind, "start": start, "end": end, "step": step, "text": term}
+
+
+def describe_term(part: Dict[str, Any], label: str) -> str:
+    kind, start, end, step = part["kind"], part["start"], part["end"], part["step"]
+    if kind == "all":
+        return f"every {label}" if step == 1 else f"every {step} {label}s"
+    if kind == "value":
+        return f"at {label} {part['text']}"
+    if kind == "range" and step == 1:
+        return f"{label}s {part['text']}"
+    # Stepped range or "a/step": say both the stride and its bounds.
+    return f"every {step} {label}s from {start} through {end}"
+
+
+def describe_field(text: str, parts: List[Dict[str, Any]], label: str) -> str:
+    """Human-readable text for a field; simple forms keep the wording of
+    the original explainer ("every minute", "minutes 1-5", "at hour 3")."""
+    if len(parts) > 1 and all(p["kind"] == "value" for p in parts):
+        return f"{label}s {text}"
+    return " and ".join(describe_term(p, label) for p in parts)
+
+
+class CronSchedule:
+    """A cron expression compiled to one bitmask per field.
+
+    Day-of-month and day-of-week follow Vixie cron: if either field starts
+    with ``*`` both must match, otherwise either may match.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        text = MACROS.get(expression.strip().lower(), expression)
+        fields = text.split()
+        if len(fields) not in (5, 6):
+            raise CronError("Cron expression must have 5 or 6 fields")
+        self.has_seconds = len(fields) == 6
+        if not self.has_seconds:
+            fields.append("0")
+        self.fields = fields
+        self.masks: List[int] = []
+        self.parts: List[List[Dict[str, Any]]] = []
+        for value, (label, lo, hi, names) in zip(fields, FIELDS):
+            mask, parts = 0, []
+            for term in value.split(","):
+                if not term:
+                    raise CronError(f"Empty term in {label} field")
+                term_mask, part = parse_term(term, label, lo, hi, names)
+                mask |= term_mask
+                parts.append(part)
+            self.masks.append(mask)
+            self.parts.append(parts)
+
+        self.minutes, self.hours, self.doms, self.months, dows, self.seconds = self.masks
+        self.dows = (dows | (dows >> 7)) & 0x7F  # 7 is also Sunday
+        self.dom_star = fields[2].startswith(("*", "?"))
+        self.dow_star = fields[4].startswith(("*", "?"))
+        self.hour_star = fields[1].startswith("*")
+        if not self._can_fire():
+            raise CronError("Expression never fires (no month has a matching day)")
+
+    def _can_fire(self) -> bool:
+        if not self.dom_star and self.dow_star:
+            longest = max(calendar.monthrange(2000, m)[1] for m in bits(self.months))
+            return next_bit(self.doms, 1) is not None and next_bit(self.doms, 1) <= longest
+        return True
+
+    def day_mask(self, year: int, month: int) -> int:
+        return _day_mask(self.doms, self.dows, self.dom_star, self.dow_star, year, month)
+
+    def explain(self) -> Dict[str, str]:
+        keys = ["minute", "hour", "day_of_month", "month", "day_of_week", "second"]
+        count = 6 if self.has_seconds else 5
+        return {
+            key: describe_field(self.fields[i], self.parts[i], FIELDS[i][0])
+            for i, key in enumerate(keys[:count])
+        }
+
+    def values(self) -> Dict[str, List[int]]:
+        return {
+            "minute": bits(self.minutes),
+            "hour": bits(self.hours),
+            "day_of_month": bits(self.doms),
+            "month": bits(self.months),
+            "day_of_week": bits(self.dows),
+            "second": bits(self.seconds),
+        }
+
+    # -- wall-clock iteration -------------------------------------------
+
+    def iter_wall(self, start: datetime, reverse: bool = False, year_limit: Optional[int] = None) -> Iterator[datetime]:
+        """Matching naive wall-clock times from ``start`` (inclusive).
+
+        Each step jumps straight to the next set bit of the month, day,
+        hour, minute and second masks instead of walking minute by minute.
+        """
+        return self._backward(start, year_limit) if reverse else self._forward(start, year_limit)
+
+    def _forward(self, t: datetime, year_limit: Optional[int]) -> Iterator[datetime]:
+        y, mo, d, h, mi, s = t.year, t.month, t.day, t.hour, t.minute, t.second
+        last_year = year_limit if year_limit is not None else min(y + 400, 9999)
+        while y <= last_year:
+            m2 = next_bit(self.months, mo)
+            if m2 is None:
+                y, mo, d, h, mi, s = y + 1, 1, 1, 0, 0, 0
+                continue
+            if m2 != mo:
+                mo, d, h, mi, s = m2, 1, 0, 0, 0
+            d2 = next_bit(self.day_mask(y, mo), d)
+            if d2 is None:
+                mo, d, h, mi, s = mo + 1, 1, 0, 0, 0
+                continue
+            if d2 != d:
+                d, h, mi, s = d2, 0, 0, 0
+            h2 = next_bit(self.hours, h)
+            if h2 is None:
+                d, h, mi, s = d + 1, 0, 0, 0
+                continue
+            if h2 != h:
+                h, mi, s = h2, 0, 0
+            mi2 = next_bit(self.minutes, mi)
+            if mi2 is None:
+                h, mi, s = h + 1, 0, 0
+                continue
+            if mi2 != mi:
+                mi, s = mi2, 0
+            s2 = next_bit(self.seconds, s)
+            if s2 is None:
+                mi, s = mi + 1, 0
+                continue
+            yield datetime(y, mo, d, h, mi, s2)
+            s = s2 + 1
+
+    def _backward(self, t: datetime, year_limit: Optional[int]) -> Iterator[datetime]:
+        y, mo, d, h, mi, s = t.year, t.month, t.day, t.hour, t.minute, t.second
+        first_year = year_limit if year_limit is not None else max(y - 400, 1)
+        while y >= first_year:
+            m2 = prev_bit(self.months, mo)
+            if m2 is None:
+                y, mo, d, h, mi, s = y - 1, 12, 31, 23, 59, 59
+                continue
+            if m2 != mo:
+                mo, d, h, mi, s = m2, 31, 23, 59, 59
+            d2 = prev_bit(self.day_mask(y, mo), d)
+            if d2 is None:
+                mo, d, h, mi, s = mo - 1, 31, 23, 59, 59
+                continue
+            if d2 != d:
+                d, h, mi, s = d2, 23, 59, 59
+            h2 = prev_bit(self.hours, h)
+            if h2 is None:
+                d, h, mi, s = d - 1, 23, 59, 59
+                continue
+            if h2 != h:
+                h, mi, s = h2, 59, 59
+            mi2 = prev_bit(self.minutes, mi)
+            if mi2 is None:
+                h, mi, s = h - 1, 59, 59
+                continue
+            if mi2 != mi:
+                mi, s = mi2, 59
+            s2 = prev_bit(self.seconds, s)
+            if s2 is None:
+                mi, s = mi - 1, 59
+                continue
+            yield datetime(y, mo, d, h, mi, s2)
+            s = s2 - 1
+
+    # -- instants ---------------------------------------------------------
+
+    def iter_times(self, start: datetime, tz: Optional[ZoneInfo] = None, reverse: bool = False) -> Iterator[datetime]:
+        """Aware fire times strictly after (or before) ``start`` in ``tz``.
+
+        DST: a wall time skipped by spring-forward fires at the moment of
+        the transition; a repeated wall time fires once, or twice when the
+        hour field is a wildcard.
+
+        Iteration simply stops where it would leave the range ``datetime``
+        can represent, so a start at either end of it yields nothing.
+        """
+        try:
+            yield from self._iter_times(start, tz, reverse)
+        except OverflowError:
+            return
+
+    def _iter_times(self, start: datetime, tz: Optional[ZoneInfo], reverse: bool) -> Iterator[datetime]:
+        tz = tz or UTC
+        start = start.astimezone(tz) if start.tzinfo else start.replace(tzinfo=tz)
+        if tz is UTC:
+            # First whole second strictly after (or before) start.
+            wall = start.replace(tzinfo=None, microsecond=0)
+            if not reverse:
+                wall += timedelta(seconds=1)
+            elif not start.microsecond:
+                wall -= timedelta(seconds=1)
+            for t in self.iter_wall(wall, reverse):
+                yield t.replace(tzinfo=UTC)
+            return
+
+        margin = -DST_MARGIN if reverse else DST_MARGIN
+        wall_start = start.replace(tzinfo=None, microsecond=0) - margin
+        sign = -1 if reverse else 1
+        heap: List[Tuple[float, datetime]] = []
+        last = start
+        for wall in self.iter_wall(wall_start, reverse):
+            bound = to_instant(wall, tz, 0)
+            for instant in self._instants(wall, tz):
+                heapq.heappush(heap, (sign * instant.timestamp(), instant))
+            while heap and sign * heap[0][0] <= sign * (bound - margin).timestamp():
+                _, instant = heapq.heappop(heap)
+                if (instant > last) if not reverse else (instant < last):
+                    last = instant
+                    yield instant.astimezone(tz)
+        for _, instant in sorted(heap):
+            if (instant > last) if not reverse else (instant < last):
+                last = instant
+                yield instant.astimezone(tz)
+
+    def _instants(self, wall: datetime, tz: ZoneInfo) -> List[datetime]:
+        first = to_instant(wall, tz, 0)
+        second = to_instant(wall, tz, 1)
+        if first == second:
+            return [first]
+        if first > second:
+            # Nonexistent wall time: fire at the transition itself.
+            return [transition_instant(wall, tz)]
+        return [first, second] if self.hour_star else [first]
+
+    def next(self, count: int, start: datetime, tz: Optional[ZoneInfo] = None) -> List[datetime]:
+        out = []
+        for t in self.iter_times(start, tz):
+            out.append(t)
+            if len(out) >= count:
+                break
+        return out
+
+    def prev(self, count: int, start: datetime, tz: Optional[ZoneInfo] = None) -> List[datetime]:
+        out = []
+        for t in self.iter_times(start, tz, reverse=True):
+            out.append(t)
+            if len(out) >= count:
+                break
+        return out
+
+    def between(self, start: datetime, end: datetime, tz: Optional[ZoneInfo] = None, limit: int = 100000) -> List[datetime]:
+        """Fire times in [start, end), at most ``limit``."""
+        out = []
+        try:
+            start -= timedelta(microseconds=1)
+        except OverflowError:
+            return out
+        for t in self.iter_times(start, tz):
+            if t >= end or len(out) >= limit:
+                break
+            out.append(t)
+        return out
+
+
+def overlapping_pairs(run_lists: List[List[datetime]], limit: int) -> Tuple[int, List[Tuple[int, int, int]]]:
+    """Pairs of schedules that fire at the same instants.
+
+    Returns the number of overlapping pairs and up to ``limit`` of them as
+    ``(a, b, shared_runs)``, most shared first. Schedules with identical runs
+    are grouped, and each group's shared instants become bits of one int, so
+    a pair costs an AND and a popcount rather than a walk over the instants.
+    """
+    groups: Dict[Tuple[datetime, ...], List[int]] = {}
+    for index, runs in enumerate(run_lists):
+        if runs:
+            groups.setdefault(tuple(runs), []).append(index)
+    keys = list(groups)
+
+    owners: Dict[datetime, List[int]] = {}
+    for group, runs in enumerate(keys):
+        for run in runs:
+            owners.setdefault(run, []).append(group)
+    positions: List[List[int]] = [[] for _ in keys]
+    width = 0
+    for members in owners.values():
+        if len(members) > 1:
+            for group in members:
+                positions[group].append(width)
+            width += 1
+    masks = []
+    for bit_positions in positions:
+        buf = bytearray((width >> 3) + 1)
+        for bit in bit_positions:
+            buf[bit >> 3] |= 1 << (bit & 7)
+        masks.append(int.from_bytes(buf, "little"))
+
+    counted = [(len(runs), g, g) for g, runs in enumerate(keys) if len(groups[runs]) > 1]
+    live = [g for g, bit_positions in enumerate(positions) if bit_positions]
+    for i, a in enumerate(live):
+        mask = masks[a]
+        for b in live[i + 1:]:
+            shared = (mask & masks[b]).bit_count()
+            if shared:
+                counted.append((shared, a, b))
+    counted.sort(key=lambda c: (-c[0], c[1], c[2]))
+
+    total = 0
+    pairs: List[Tuple[int, int, int]] = []
+    for shared, a, b in counted:
+        left, right = groups[keys[a]], groups[keys[b]]
+        if a == b:
+            total += len(left) * (len(left) - 1) // 2
+            combos = itertools.combinations(left, 2)
+        else:
+            total += len(left) * len(right)
+            combos = ((min(x, y), max(x, y)) for x in left for y in right)
+        pairs.extend((x, y, shared) for x, y in itertools.islice(combos, max(limit - len(pairs), 0)))
+    return total, pairs
+
+
+def to_instant(wall: datetime, tz: ZoneInfo, fold: int) -> datetime:
+    return wall.replace(tzinfo=tz, fold=fold).astimezone(UTC)
+
+
+def transition_instant(wall: datetime, tz: ZoneInfo) -> datetime:
+    """First real instant after a wall time skipped by a forward transition."""
+    lo = to_instant(wall, tz, 1)
+    hi = to_instant(wall, tz, 0)
+    # The UTC offset changes somewhere in (lo, hi]; bisect to the minute.
+    while hi - lo > timedelta(minutes=1):
+        mid = lo + (hi - lo) / 2
+        if mid.astimezone(tz).replace(tzinfo=None) < wall:
+            lo = mid
+        else:
+            hi = mid
+    return hi.replace(second=0, microsecond=0)
+
+
+@lru_cache(maxsize=4096)
+def _day_mask(doms: int, dows: int, dom_star: bool, dow_star: bool, year: int, month: int) -> int:
+    first_weekday, ndays = calendar.monthrange(year, month)
+    all_days = ((1 << (ndays + 1)) - 1) & ~1
+    first = (first_weekday + 1) % 7  # cron counts from Sunday
+    dow_days = 0
+    for d in range(1, ndays + 1):
+        if dows >> ((first + d - 1) % 7) & 1:
+            dow_days |= 1 << d
+    if dom_star or dow_star:
+        return doms & dow_days & all_days
+    return (doms | dow_days) & all_days
+
+
+@lru_cache(maxsize=CRON_CACHE_SIZE)
+def compile_cron(expression: str) -> CronSchedule:
+    """Compiled schedule, cached by the normalized expression string."""
+    return CronSchedule(expression)
+
+
+def get_schedule(expression: str) -> CronSchedule:
+    return compile_cron(" ".join(expression.split()))
+
+
+@lru_cache(maxsize=64)
+def get_timezone(name: str) -> ZoneInfo:
+    try:
+        return UTC if name.upper() == "UTC" else ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise CronError(f"Unknown timezone: {name}")
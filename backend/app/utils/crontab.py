@@ -0,0 +1,419 @@
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ..config import MAX_CRON_SUGGEST_JOBS
+from .cron import MACROS, CronSchedule, bits, get_schedule
+
+ENV_LINE_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*\s*=")
+USER_RE = re.compile(r"^[a-z_][a-z0-9_.-]{0,31}\$?$")
+# Service accounts that are not also everyday command names.
+SYSTEM_USERS = frozenset({
+    "root", "nobody", "daemon", "www-data", "www", "_www", "apache", "nginx", "postgres", "mysql",
+    "redis", "ubuntu", "ec2-user", "centos",
+})
+
+
+def parse_crontab(text: str, system: Optional[bool] = None) -> List[Dict[str, Any]]:
+    """Split a crontab into jobs: line number, schedule text, command.
+
+    ``system`` crontabs (/etc/crontab, cron.d) carry a user column after the
+    schedule; when not given it is guessed from all job lines.
+    """
+    lines = []
+    for number, raw in enumerate(text.splitlines(), 1):
+        line = raw.strip()
+        if not line or line.startswith("#") or ENV_LINE_RE.match(line):
+            continue
+        tokens = line.split()
+        if tokens[0].lower() in MACROS or tokens[0].lower() == "@reboot":
+            lines.append((number, tokens[0], tokens[1:]))
+        else:
+            lines.append((number, " ".join(tokens[:5]), tokens[5:]))
+    if system is None:
+        system = _guess_system([rest for _, _, rest in lines])
+
+    jobs = []
+    for number, expression, rest in lines:
+        user = rest[0] if system and rest else None
+        command = " ".join(rest[1:] if system else rest)
+        jobs.append({"line": number, "expression": expression, "user": user, "command": command})
+    return jobs
+
+
+def _guess_system(rests: List[List[str]]) -> bool:
+    # Every line needs a user-shaped token before its command, and at least
+    # one of them must be a well-known account used as such (not, say, a
+    # ``mysql -e ...`` command line).
+    if not rests or not all(len(rest) > 1 and USER_RE.match(rest[0]) for rest in rests):
+        return False
+    return any(rest[0] in SYSTEM_USERS and not rest[1].startswith("-") for rest in rests)
+
+
+def _counts(indices: List[Sequence[int]], size: int):
+    if np is not None:
+        flat = np.concatenate([np.asarray(i, dtype=np.int64) for i in indices]) if indices else np.zeros(0, np.int64)
+        return np.bincount(flat, minlength=size).astype(np.int64)
+    # Jobs sharing a schedule share one index list; count each list once.
+    weights: Dict[int, List[Any]] = {}
+    for job in indices:
+        weights.setdefault(id(job), [job, 0])[1] += 1
+    counts = [0] * size
+    for job, weight in weights.values():
+        for i in job:
+            counts[i] += weight
+    return counts
+
+
+def _rotate(mask: int, shift: int) -> int:
+    shift %= 60
+    return ((mask << shift) | (mask >> (60 - shift))) & ((1 << 60) - 1)
+
+
+def _from_bytes(buf: bytearray) -> int:
+    return int.from_bytes(buf, "little")
+
+
+def mask_indices(mask: int) -> List[int]:
+    """Positions of the set bits of ``mask``, ascending."""
+    text = bin(mask)[:1:-1]
+    out = []
+    i = text.find("1")
+    while i >= 0:
+        out.append(i)
+        i = text.find("1", i + 1)
+    return out
+
+
+class MinuteGrid:
+    """The analysis window as bitmasks over its minutes (bit i = start + i minutes).
+
+    Each local minute-of-hour, hour and date maps to the mask of window
+    minutes that carry it, so a job's firing minutes are a handful of ORs and
+    ANDs of field masks instead of one datetime per run.
+    """
+
+    def __init__(self, start: datetime, minutes: int, tz=None):
+        self.size = minutes
+        self.full = (1 << minutes) - 1
+        width = (minutes >> 3) + 1
+        by_minute = [bytearray(width) for _ in range(60)]
+        by_hour = [bytearray(width) for _ in range(24)]
+        by_date: Dict[Tuple[int, int, int], bytearray] = {}
+        repeat = bytearray(width)
+        self.minute_of = bytearray(minutes)
+        # (window index, wall times skipped just before it by a DST gap)
+        self.gaps: List[Tuple[int, List[datetime]]] = []
+        previous = None
+        for i in range(minutes):
+            t = _local(start, i, tz)
+            byte, bit = i >> 3, 1 << (i & 7)
+            by_minute[t.minute][byte] |= bit
+            by_hour[t.hour][byte] |= bit
+            by_date.setdefault((t.year, t.month, t.day), bytearray(width))[byte] |= bit
+            self.minute_of[i] = t.minute
+            if tz is not None:
+                if t.fold and t.replace(fold=0).utcoffset() != t.utcoffset():
+                    repeat[byte] |= bit  # second pass through a repeated wall time
+                wall = t.replace(tzinfo=None)
+                if previous is not None and wall - previous > timedelta(minutes=1):
+                    skipped = []
+                    missing = previous + timedelta(minutes=1)
+                    while missing < wall:
+                        skipped.append(missing)
+                        missing += timedelta(minutes=1)
+                    self.gaps.append((i, skipped))
+                previous = wall
+        self.by_minute = [_from_bytes(b) for b in by_minute]
+        self.by_hour = [_from_bytes(b) for b in by_hour]
+        self.by_date = {key: _from_bytes(b) for key, b in by_date.items()}
+        self.repeat = _from_bytes(repeat)
+        # below[k]: window minutes whose local minute-of-hour is < k
+        self.below = [0] * 61
+        for k in range(60):
+            self.below[k + 1] = self.below[k] | self.by_minute[k]
+
+    def schedule_mask(self, schedule: CronSchedule) -> int:
+        """Window minutes in which ``schedule`` fires at least once.
+
+        DST follows CronSchedule.iter_times: skipped wall times fire at the
+        transition and repeated ones fire once unless the hour is a wildcard.
+        """
+        minutes = 0
+        for m in bits(schedule.minutes):
+            minutes |= self.by_minute[m]
+        hours = 0
+        for h in bits(schedule.hours):
+            hours |= self.by_hour[h]
+        days = 0
+        day_masks: Dict[Tuple[int, int], int] = {}
+        for (y, mo, d), mask in self.by_date.items():
+            if not schedule.months >> mo & 1:
+                continue
+            if (y, mo) not in day_masks:
+                day_masks[(y, mo)] = schedule.day_mask(y, mo)
+            if day_masks[(y, mo)] >> d & 1:
+                days |= mask
+        mask = minutes & hours & days
+        if not schedule.hour_star:
+            mask &= ~self.repeat
+        for index, skipped in self.gaps:
+            if any(_fires_at(schedule, wall) for wall in skipped):
+                mask |= 1 << index
+        return mask
+
+    def shifted(self, mask: int, shift: int) -> int:
+        """``mask`` with every minute moved ``shift`` minutes later within its hour."""
+        if not shift:
+            return mask
+        low = self.below[60 - shift]
+        return (((mask & low) << shift) | ((mask & ~low) >> (60 - shift))) & self.full
+
+
+def _fires_at(schedule: CronSchedule, wall: datetime) -> bool:
+    return bool(
+        schedule.months >> wall.month & 1
+        and schedule.day_mask(wall.year, wall.month) >> wall.day & 1
+        and schedule.hours >> wall.hour & 1
+        and schedule.minutes >> wall.minute & 1
+    )
+
+
+class BitCounts:
+    """Per-minute counts stored bit-sliced: ``planes[k]`` holds bit k of
+    every minute's count, so adding a job or scoring a candidate shift costs
+    a few big-int operations per plane rather than one per run."""
+
+    def __init__(self, masks: Iterable[int] = ()):
+        self.planes: List[int] = []
+        for mask in masks:
+            self.add(mask)
+
+    def add(self, mask: int) -> None:
+        carry = mask
+        for k, plane in enumerate(self.planes):
+            if not carry:
+                return
+            self.planes[k] = plane ^ carry
+            carry &= plane
+        if carry:
+            self.planes.append(carry)
+
+    def remove(self, mask: int) -> None:
+        """Decrement every minute in ``mask``; each must currently be >= 1."""
+        borrow = mask
+        for k, plane in enumerate(self.planes):
+            if not borrow:
+                return
+            self.planes[k] = plane ^ borrow
+            borrow &= ~plane
+
+    def total(self, mask: int) -> int:
+        return sum((plane & mask).bit_count() << k for k, plane in enumerate(self.planes))
+
+    def peak(self, mask: int) -> int:
+        value = 0
+        for k in range(len(self.planes) - 1, -1, -1):
+            hit = mask & self.planes[k]
+            if hit:
+                mask = hit
+                value |= 1 << k
+        return value
+
+
+def format_minutes(values: List[int]) -> str:
+    """Render a minute set compactly: a single value, a stepped range or a list."""
+    if len(values) == 1:
+        return str(values[0])
+    step = values[1] - values[0]
+    if len(values) > 2 and all(b - a == step for a, b in zip(values, values[1:])):
+        return f"{values[0]}-{values[-1]}/{step}"
+    return ",".join(map(str, values))
+
+
+def analyze_crontab(
+    jobs: List[Dict[str, Any]],
+    start: datetime,
+    end: datetime,
+    tz=None,
+    threshold: int = 2,
+    top: int = 20,
+    suggest: bool = True,
+) -> Dict[str, Any]:
+    """Per-minute firing counts for every job in [start, end).
+
+    Firing minutes come from the compiled bitset schedules laid over a
+    MinuteGrid of the window; counting (and, with NumPy, the offset search)
+    is vectorised over the whole window.
+    """
+    start = start.replace(second=0, microsecond=0)
+    if start.tzinfo is not None:
+        # Aware arithmetic in one zone is wall-clock arithmetic; count
+        # elapsed minutes in UTC so DST transitions are neither lost nor doubled.
+        start, end = start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+    minutes = int((end - start).total_seconds() // 60)
+    grid = MinuteGrid(start, minutes, tz)
+
+    valid, invalid, indices, masks = [], [], [], []
+    computed: Dict[CronSchedule, Tuple[int, List[int]]] = {}
+    for job in jobs:
+        if job["expression"] == "@reboot":
+            invalid.append({**job, "error": "@reboot has no schedule"})
+            continue
+        try:
+            schedule = get_schedule(job["expression"])
+        except ValueError as e:
+            invalid.append({**job, "error": str(e)})
+            continue
+        if schedule not in computed:
+            mask = grid.schedule_mask(schedule)
+            computed[schedule] = (mask, mask_indices(mask))
+        mask, index = computed[schedule]
+        # Seconds-level schedules are counted per minute.
+        per_minute = schedule.seconds.bit_count() if schedule.has_seconds else 1
+        valid.append({**job, "schedule": schedule, "runs": len(index) * per_minute})
+        indices.append(index)
+        masks.append(mask)
+
+    counts = _counts(indices, minutes)
+    count_list = counts.tolist() if np is not None else counts
+    total = sum(count_list)
+    peak = max(count_list) if count_list else 0
+
+    busy = sorted(
+        (i for i, c in enumerate(count_list) if c >= threshold),
+        key=lambda i: (-count_list[i], i),
+    )
+    # Byte views make membership tests O(1); shifting a window-sized int is not.
+    views = {mask: mask.to_bytes((minutes >> 3) + 1, "little") for mask in masks}
+    rows = [views[mask] for mask in masks]
+    hotspots = [
+        {
+            "time": _local(start, i, tz).isoformat(),
+            "count": count_list[i],
+            "jobs": [valid[j]["line"] for j, row in enumerate(rows) if row[i >> 3] >> (i & 7) & 1],
+        }
+        for i in busy[:top]
+    ]
+
+    hour_minute = [[0] * 60 for _ in range(24)]
+    weekday_hour = [[0] * 24 for _ in range(7)]
+    for i, c in enumerate(count_list):
+        if c:
+            t = _local(start, i, tz)
+            hour_minute[t.hour][t.minute] += c
+            weekday_hour[(t.weekday() + 1) % 7][t.hour] += c
+
+    result = {
+        "summary": {
+            "jobs": len(valid),
+            "invalid": len(invalid),
+            "window_minutes": minutes,
+            "total_runs": total,
+            "peak": peak,
+            "mean_per_minute": round(total / minutes, 4) if minutes else 0,
+            "busy_minutes": len(busy),
+            "backend": "numpy" if np is not None else "python",
+        },
+        "hotspots": hotspots,
+        "heatmap": {"hour_by_minute": hour_minute, "weekday_by_hour": weekday_hour},
+        "jobs": [
+            {"line": j["line"], "expression": j["expression"], "user": j["user"], "command": j["command"], "runs": j["runs"]}
+            for j in valid
+        ],
+        "invalid": invalid,
+    }
+    if suggest:
+        busy_mask = 0
+        for i in busy:
+            busy_mask |= 1 << i
+        result["suggestions"] = suggest_offsets(valid, indices, masks, counts, grid, busy_mask, threshold)
+    return result
+
+
+def _local(start: datetime, index: int, tz) -> datetime:
+    t = start + timedelta(minutes=index)
+    return t.astimezone(tz) if tz is not None else t
+
+
+def suggest_offsets(
+    jobs: List[Dict[str, Any]],
+    indices: List[List[int]],
+    masks: List[int],
+    counts,
+    grid: MinuteGrid,
+    busy_mask: int,
+    threshold: int = 2,
+    limit: int = MAX_CRON_SUGGEST_JOBS,
+) -> List[Dict[str, Any]]:
+    """Greedy minute shifts that flatten the load.
+
+    Jobs firing in the busiest minutes are moved one at a time to the minute
+    rotation whose target minutes are least loaded (which minimises the sum
+    of squared per-minute counts); hours and days are left alone. At most
+    ``limit`` jobs are tried, busiest first. Without NumPy the load is kept
+    as BitCounts and candidate shifts as masks.
+    """
+    if np is not None:
+        counts = counts.copy()
+        minute_of = np.frombuffer(bytes(grid.minute_of), dtype=np.uint8).astype(np.int64)
+    else:
+        counts = BitCounts(masks)
+    size = grid.size
+    order = sorted(range(len(jobs)), key=lambda j: -(masks[j] & busy_mask).bit_count())
+    suggestions = []
+    tried = 0
+    for j in order:
+        schedule: CronSchedule = jobs[j]["schedule"]
+        index, mask = indices[j], masks[j]
+        if not index or schedule.fields[0].startswith("*") and "/" not in schedule.fields[0]:
+            continue  # every-minute jobs cannot be shifted
+        peak_before = int(counts[index].max()) if np is not None else counts.peak(mask)
+        if peak_before < threshold:
+            continue
+        if tried >= limit:
+            break
+        tried += 1
+
+        if np is not None:
+            idx = np.asarray(index, dtype=np.int64)
+            minute = minute_of[idx]
+            counts[idx] -= 1
+        else:
+            counts.remove(mask)
+
+        best = None
+        for shift in range(60):
+            if np is not None:
+                target = idx + (minute + shift) % 60 - minute
+                target = target[(target >= 0) & (target < size)]
+                load = counts[target]
+                score = (int(load.sum()), int(load.max()) if len(load) else 0)
+            else:
+                target = grid.shifted(mask, shift)
+                score = (counts.total(target), counts.peak(target))
+            if best is None or score < best[0]:
+                best = (score, shift, target)
+
+        score, shift, target = best
+        if np is not None:
+            counts[target] += 1
+        else:
+            counts.add(target)
+        if shift:
+            fields = list(schedule.fields[:6 if schedule.has_seconds else 5])
+            fields[0] = format_minutes(bits(_rotate(schedule.minutes, shift)))
+            suggestions.append({
+                "line": jobs[j]["line"],
+                "expression": jobs[j]["expression"],
+                "suggested_expression": " ".join(fields),
+                "shift_minutes": shift if shift <= 30 else shift - 60,
+                "peak_before": peak_before,
+                "peak_after": score[1] + 1,
+            })
+    return suggestions
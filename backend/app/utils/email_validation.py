@@ -0,0 +1,290 @@
+import abc
+import asyncio
+import csv
+import io
+import json
+import re
+import socket
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..config import (
+    EMAIL_MX_CACHE_SIZE,
+    EMAIL_MX_CONCURRENCY,
+    EMAIL_MX_TIMEOUT,
+    EMAIL_MX_TTL,
+)
+
+DISPOSABLE_DOMAINS_PATH = Path(__file__).resolve().parent.parent / "data" / "disposable_domains.txt"
+
+# Legacy single-address check, kept for the "Invalid email format" issue.
+BASIC_EMAIL_RE = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+# RFC 5322 dot-atom local part and an LDH hostname with an alphabetic or IDNA TLD.
+_ATOM = r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+"
+_LABEL = r"[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?"
+EMAIL_RE = re.compile(
+    rf"^(?P<local>{_ATOM}(?:\.{_ATOM})*)@(?P<domain>(?:{_LABEL}\.)+(?:[A-Za-z]{{2,63}}|xn--[A-Za-z0-9-]{{1,59}}))$"
+)
+
+
+@lru_cache(maxsize=1)
+def load_disposable_domains() -> frozenset:
+    """Disposable-domain blocklist (disposable-email-domains, MIT), read once."""
+    with open(DISPOSABLE_DOMAINS_PATH, encoding="utf-8") as f:
+        return frozenset(line.strip().lower() for line in f if line.strip() and not line.startswith("#"))
+
+
+def is_disposable_domain(domain: str) -> bool:
+    """True if the domain or any parent domain is on the blocklist."""
+    blocklist = load_disposable_domains()
+    labels = domain.lower().rstrip(".").split(".")
+    return any(".".join(labels[i:]) in blocklist for i in range(len(labels) - 1))
+
+
+def check_address(email: str) -> Dict[str, Any]:
+    """Syntax checks for one address, with the same issue wording as /validate/email."""
+    email = email.strip()
+    issues = []
+    basic_valid = bool(BASIC_EMAIL_RE.match(email))
+    if not basic_valid:
+        issues.append("Invalid email format")
+    if email.count("@") != 1:
+        issues.append("Must contain exactly one @ symbol")
+    else:
+        local, domain = email.rsplit("@", 1)
+        if len(local) == 0:
+            issues.append("Local part is empty")
+        elif len(local) > 64:
+            issues.append("Local part exceeds 64 characters")
+        if len(domain) == 0:
+            issues.append("Domain is empty")
+        elif "." not in domain:
+            issues.append("Domain must contain a dot")
+        elif len(domain) > 253:
+            issues.append("Domain exceeds 253 characters")
+        if ".." in email:
+            issues.append("Cannot contain consecutive dots")
+        if len(email) > 254:
+            issues.append("Address exceeds 254 characters")
+        if not issues and not EMAIL_RE.match(email):
+            issues.append("Invalid email format")
+
+    domain = email.split("@")[-1].lower() if "@" in email else ""
+    return {
+        "email": email,
+        "valid": basic_valid and not issues,
+        "issues": issues,
+        "local_part": email.split("@")[0] if "@" in email else None,
+        "domain": domain or None,
+    }
+
+
+class MxResolver(abc.ABC):
+    """Resolver interface: return MX hosts for a domain, [] if none, raise on lookup failure."""
+
+    @abc.abstractmethod
+    async def resolve_mx(self, domain: str) -> List[str]:
+        ...
+
+
+class DnspythonResolver(MxResolver):
+    def __init__(self, timeout: float = EMAIL_MX_TIMEOUT):
+        import dns.asyncresolver
+
+        self._resolver = dns.asyncresolver.Resolver()
+        self._resolver.lifetime = timeout
+
+    async def resolve_mx(self, domain: str) -> List[str]:
+        import dns.exception
+        import dns.resolver
+
+        try:
+            answer = await self._resolver.resolve(domain, "MX")
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            return []
+        except dns.exception.DNSException as e:
+            raise LookupError(str(e) or type(e).__name__)
+        records = sorted(answer, key=lambda r: r.preference)
+        return [r.exchange.to_text().rstrip(".") for r in records]
+
+
+class AddressResolver(MxResolver):
+    """Fallback without dnspython: treat a resolvable host as its own implicit MX (RFC 5321 5.1)."""
+
+    def __init__(self, timeout: float = EMAIL_MX_TIMEOUT):
+        self.timeout = timeout
+
+    async def resolve_mx(self, domain: str) -> List[str]:
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(loop.getaddrinfo(domain, 25, type=socket.SOCK_STREAM), self.timeout)
+        except socket.gaierror:
+            return []
+        except asyncio.TimeoutError:
+            raise LookupError("timeout")
+        return [domain]
+
+
+class CachingResolver(MxResolver):
+    """Wraps another resolver with a bounded TTL cache (failures are not cached)."""
+
+    def __init__(self, resolver: MxResolver, ttl: float = EMAIL_MX_TTL, max_entries: int = EMAIL_MX_CACHE_SIZE):
+        self.resolver = resolver
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def resolve_mx(self, domain: str) -> List[str]:
+        key = domain.lower()
+        cached = self._cache.get(key)
+        now = time.monotonic()
+        if cached is not None and cached[0] > now:
+            self._cache.move_to_end(key)
+            return cached[1]
+        hosts = await self.resolver.resolve_mx(key)
+        self._cache[key] = (now + self.ttl, hosts)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return hosts
+
+
+_mx_resolver: Optional[MxResolver] = None
+
+
+def get_mx_resolver() -> MxResolver:
+    global _mx_resolver
+    if _mx_resolver is None:
+        try:
+            base: MxResolver = DnspythonResolver()
+        except ImportError:
+            base = AddressResolver()
+        _mx_resolver = CachingResolver(base)
+    return _mx_resolver
+
+
+def set_mx_resolver(resolver: Optional[MxResolver]) -> None:
+    """Replace the process-wide resolver (e.g. with a local stub); None restores the default."""
+    global _mx_resolver
+    _mx_resolver = resolver
+
+
+async def check_domains(domains: Iterable[str], concurrency: int = EMAIL_MX_CONCURRENCY) -> Dict[str, Dict[str, Any]]:
+    resolver = get_mx_resolver()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def check(domain: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                hosts = await resolver.resolve_mx(domain)
+            except Exception as e:
+                return {"mx": None, "has_mx": None, "error": str(e) or type(e).__name__}
+        return {"mx": hosts, "has_mx": bool(hosts), "error": None}
+
+    unique = list(dict.fromkeys(domains))
+    results = await asyncio.gather(*(check(d) for d in unique))
+    return dict(zip(unique, results))
+
+
+def _is_json_string(line: str) -> bool:
+    # A quoted CSV header such as "email","name" also starts with a quote.
+    try:
+        return isinstance(json.loads(line), str)
+    except ValueError:
+        return False
+
+
+def parse_address_list(text: str, fmt: str = "auto", column: Optional[str] = None) -> List[str]:
+    """Extract addresses from CSV, NDJSON or one-per-line text."""
+    stripped = text.lstrip("\ufeff").strip()
+    if not stripped:
+        return []
+    if fmt == "auto":
+        first = stripped.split("\n", 1)[0]
+        if first.startswith("{") or (first.startswith('"') and _is_json_string(first)):
+            fmt = "ndjson"
+        elif "," in first or ";" in first or "\t" in first:
+            fmt = "csv"
+        else:
+            fmt = "text"
+
+    if fmt == "ndjson":
+        emails = []
+        for number, line in enumerate(stripped.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                raise ValueError(f"Invalid JSON on line {number}")
+            emails.append(item.get(column or "email", "") if isinstance(item, dict) else str(item))
+        return [str(e) for e in emails]
+
+    if fmt == "csv":
+        dialect = csv.Sniffer().sniff(stripped[:4096], delimiters=",;\t")
+        rows = list(csv.reader(io.StringIO(stripped), dialect))
+        header = [h.strip().lower() for h in rows[0]]
+        wanted = (column or "email").lower()
+        if wanted in header:
+            index = header.index(wanted)
+            rows = rows[1:]
+        elif column:
+            raise ValueError(f"Column '{column}' not found")
+        else:
+            # No header: use the first column that looks like an address.
+            index = next((i for i, v in enumerate(rows[0]) if "@" in v), 0)
+        return [row[index] if index < len(row) else "" for row in rows]
+
+    if fmt == "text":
+        return [line.strip() for line in stripped.splitlines() if line.strip()]
+    raise ValueError("format must be auto, csv, ndjson or text")
+
+
+def _check_addresses(emails: List[str]) -> tuple:
+    results = [check_address(e) for e in emails]
+    domains = list(dict.fromkeys(r["domain"] for r in results if r["valid"]))
+    disposable = {d: is_disposable_domain(d) for d in domains}
+    return results, domains, disposable
+
+
+def _annotate(
+    results: List[Dict[str, Any]],
+    domains: List[str],
+    disposable: Dict[str, bool],
+    mx: Dict[str, Dict[str, Any]],
+    check_mx: bool,
+) -> Dict[str, Any]:
+    seen = set()
+    for r in results:
+        r["duplicate"] = r["email"].lower() in seen
+        seen.add(r["email"].lower())
+        domain = r["domain"]
+        r["is_disposable"] = disposable.get(domain, False) if r["valid"] else None
+        if check_mx:
+            info = mx.get(domain) if r["valid"] else None
+            r["has_mx"] = info["has_mx"] if info else None
+            if info and info["error"]:
+                r["mx_error"] = info["error"]
+
+    summary = {
+        "total": len(results),
+        "valid": sum(1 for r in results if r["valid"]),
+        "invalid": sum(1 for r in results if not r["valid"]),
+        "disposable": sum(1 for r in results if r["is_disposable"]),
+        "duplicates": sum(1 for r in results if r["duplicate"]),
+        "unique_domains": len(domains),
+    }
+    if check_mx:
+        summary["without_mx"] = sum(1 for r in results if r.get("has_mx") is False)
+    return {"summary": summary, "results": results}
+
+
+async def validate_batch(emails: List[str], check_mx: bool = False) -> Dict[str, Any]:
+    # Syntax and blocklist checks are CPU-bound over up to MAX_EMAIL_BATCH
+    # addresses; only the MX lookups belong on the event loop.
+    results, domains, disposable = await asyncio.to_thread(_check_addresses, emails)
+    mx = await check_domains(domains) if check_mx else {}
+    return await asyncio.to_thread(_annotate, results, domains, disposable, mx, check_mx)
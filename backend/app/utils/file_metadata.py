@@ -0,0 +1,656 @@
+import json
+import mimetypes
+import mmap
+import re
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import METADATA_PDF_STREAM_LIMIT, METADATA_TEXT_DECODE_LIMIT, METADATA_ZIP_NAME_LIMIT
+
+# All parsers take any buffer that supports slicing and find() - bytes or an
+# mmap - and only touch the header structures they need, so analysing a
+# multi-GB file reads a handful of pages instead of the whole thing.
+
+MAGIC_TYPES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+    (b"PK\x03\x04", "application/zip"),
+    (b"PK\x05\x06", "application/zip"),
+]
+
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+JPEG_STANDALONE_MARKERS = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8}
+
+EXIF_TAGS = {
+    0x010F: "make",
+    0x0110: "model",
+    0x0112: "orientation",
+    0x0131: "software",
+    0x0132: "datetime",
+    0x013B: "artist",
+    0x8298: "copyright",
+    0x829A: "exposure_time",
+    0x829D: "f_number",
+    0x8827: "iso",
+    0x9003: "datetime_original",
+    0x920A: "focal_length",
+    0xA002: "pixel_width",
+    0xA003: "pixel_height",
+    0xA434: "lens_model",
+}
+EXIF_IFD_POINTER = 0x8769
+GPS_IFD_POINTER = 0x8825
+EXIF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+
+PNG_COLOR_TYPES = {0: "grayscale", 2: "rgb", 3: "indexed", 4: "grayscale+alpha", 6: "rgba"}
+
+
+def detect_mime_type(buf, file_name: str) -> Optional[str]:
+    head = buf[:16]
+    for magic, mime in MAGIC_TYPES:
+        if head.startswith(magic):
+            return mime
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    mime, _ = mimetypes.guess_type(file_name)
+    return mime
+
+
+def _u16(buf, pos: int, order: str = ">") -> int:
+    return struct.unpack_from(order + "H", buf, pos)[0]
+
+
+def _u32(buf, pos: int, order: str = ">") -> int:
+    return struct.unpack_from(order + "I", buf, pos)[0]
+
+
+def parse_exif(tiff: bytes) -> Dict[str, Any]:
+    """Read the commonly useful tags from a TIFF-structured EXIF block."""
+    if tiff[:2] == b"II":
+        order = "<"
+    elif tiff[:2] == b"MM":
+        order = ">"
+    else:
+        return {}
+
+    result: Dict[str, Any] = {}
+
+    def read_value(entry: int):
+        tag_type = _u16(tiff, entry + 2, order)
+        count = _u32(tiff, entry + 4, order)
+        size = EXIF_TYPE_SIZES.get(tag_type)
+        if size is None:
+            return None
+        total = size * count
+        offset = entry + 8 if total <= 4 else _u32(tiff, entry + 8, order)
+        if offset + total > len(tiff):
+            return None
+        if tag_type == 2:
+            return tiff[offset:offset + total].split(b"\x00", 1)[0].decode("utf-8", "replace").strip()
+        if tag_type == 7:
+            return None
+        values = []
+        for i in range(min(count, 8)):
+            pos = offset + i * size
+            if tag_type == 1:
+                values.append(tiff[pos])
+            elif tag_type == 3:
+                values.append(_u16(tiff, pos, order))
+            elif tag_type == 4:
+                values.append(_u32(tiff, pos, order))
+            elif tag_type == 9:
+                values.append(struct.unpack_from(order + "i", tiff, pos)[0])
+            else:
+                fmt = order + ("II" if tag_type == 5 else "ii")
+                num, den = struct.unpack_from(fmt, tiff, pos)
+                values.append(round(num / den, 6) if den else None)
+        return values[0] if count == 1 else values
+
+    def walk(ifd_offset: int, names: Dict[int, str]) -> Dict[int, Any]:
+        raw = {}
+        if ifd_offset + 2 > len(tiff):
+            return raw
+        count = _u16(tiff, ifd_offset, order)
+        for i in range(min(count, 512)):
+            entry = ifd_offset + 2 + i * 12
+            if entry + 12 > len(tiff):
+                break
+            tag = _u16(tiff, entry, order)
+            if tag in names or tag in (EXIF_IFD_POINTER, GPS_IFD_POINTER):
+                raw[tag] = read_value(entry)
+        return raw
+
+    try:
+        ifd0 = walk(_u32(tiff, 4, order), EXIF_TAGS)
+        for tag, value in ifd0.items():
+            if tag in EXIF_TAGS and value is not None:
+                result[EXIF_TAGS[tag]] = value
+        if isinstance(ifd0.get(EXIF_IFD_POINTER), int):
+            for tag, value in walk(ifd0[EXIF_IFD_POINTER], EXIF_TAGS).items():
+                if tag in EXIF_TAGS and value is not None:
+                    result[EXIF_TAGS[tag]] = value
+        if isinstance(ifd0.get(GPS_IFD_POINTER), int):
+            gps = walk(ifd0[GPS_IFD_POINTER], {1: "lat_ref", 2: "lat", 3: "lon_ref", 4: "lon"})
+            lat, lon = gps.get(2), gps.get(4)
+            if isinstance(lat, list) and isinstance(lon, list) and len(lat) == 3 and len(lon) == 3:
+                lat_val = lat[0] + lat[1] / 60 + lat[2] / 3600
+                lon_val = lon[0] + lon[1] / 60 + lon[2] / 3600
+                if gps.get(1) == "S":
+                    lat_val = -lat_val
+                if gps.get(3) == "W":
+                    lon_val = -lon_val
+                result["gps"] = {"latitude": round(lat_val, 6), "longitude": round(lon_val, 6)}
+    except (struct.error, TypeError, ZeroDivisionError):
+        pass
+    return result
+
+
+def parse_jpeg(buf, size: int) -> Dict[str, Any]:
+    """Walk JPEG marker segments using their lengths until the first scan."""
+    info: Dict[str, Any] = {"format": "jpeg"}
+    pos = 2
+    while pos + 4 <= size:
+        if buf[pos] != 0xFF:
+            break
+        marker = buf[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker in JPEG_STANDALONE_MARKERS:
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            break
+        length = _u16(buf, pos + 2)
+        segment = pos + 4
+        if marker in JPEG_SOF_MARKERS and segment + 6 <= size:
+            info["bits_per_sample"] = buf[segment]
+            info["height"] = _u16(buf, segment + 1)
+            info["width"] = _u16(buf, segment + 3)
+            info["components"] = buf[segment + 5]
+            info["progressive"] = marker in (0xC2, 0xC6, 0xCA, 0xCE)
+        elif marker == 0xE0 and buf[segment:segment + 5] == b"JFIF\x00":
+            units = buf[segment + 7]
+            x_density = _u16(buf, segment + 8)
+            if units == 1:
+                info["dpi"] = x_density
+            elif units == 2:
+                info["dpi"] = round(x_density * 2.54)
+        elif marker == 0xE1 and buf[segment:segment + 6] == b"Exif\x00\x00":
+            info["exif"] = parse_exif(bytes(buf[segment + 6:pos + 2 + length]))
+        elif marker == 0xE2 and buf[segment:segment + 12] == b"ICC_PROFILE\x00":
+            info["icc_profile"] = True
+        pos += 2 + length
+    return info
+
+
+def parse_png(buf, size: int) -> Dict[str, Any]:
+    info: Dict[str, Any] = {"format": "png"}
+    if size < 33 or buf[12:16] != b"IHDR":
+        return info
+    info["width"] = _u32(buf, 16)
+    info["height"] = _u32(buf, 20)
+    info["bit_depth"] = buf[24]
+    info["color_type"] = PNG_COLOR_TYPES.get(buf[25], buf[25])
+    info["interlaced"] = buf[28] == 1
+
+    # Ancillary chunks that matter for metadata precede the image data.
+    pos, text_keys = 33, []
+    while pos + 8 <= size:
+        length = _u32(buf, pos)
+        chunk_type = bytes(buf[pos + 4:pos + 8])
+        data = pos + 8
+        if chunk_type in (b"IDAT", b"IEND"):
+            break
+        if chunk_type == b"acTL" and data + 4 <= size:
+            info["animated"] = True
+            info["frames"] = _u32(buf, data)
+        elif chunk_type == b"pHYs" and data + 9 <= size and buf[data + 8] == 1:
+            info["dpi"] = round(_u32(buf, data) * 0.0254)
+        elif chunk_type in (b"tEXt", b"zTXt", b"iTXt"):
+            key = bytes(buf[data:min(data + 80, data + length)]).split(b"\x00", 1)[0]
+            text_keys.append(key.decode("latin-1"))
+        elif chunk_type == b"iCCP":
+            info["icc_profile"] = True
+        elif chunk_type == b"eXIf":
+            info["exif"] = parse_exif(bytes(buf[data:data + length]))
+        pos = data + length + 4
+    if text_keys:
+        info["text_keys"] = text_keys
+    return info
+
+
+def parse_gif(buf, size: int) -> Dict[str, Any]:
+    info: Dict[str, Any] = {"format": "gif", "version": bytes(buf[3:6]).decode("ascii")}
+    if size >= 10:
+        info["width"] = _u16(buf, 6, "<")
+        info["height"] = _u16(buf, 8, "<")
+    if size >= 11:
+        flags = buf[10]
+        info["global_color_table"] = bool(flags & 0x80)
+        info["colors"] = 2 ** ((flags & 0x07) + 1) if flags & 0x80 else None
+    # NETSCAPE2.0 application extension marks a looping animation and sits
+    # right after the global colour table.
+    info["animated"] = buf.find(b"NETSCAPE2.0", 0, min(size, 4096)) != -1
+    return info
+
+
+def parse_webp(buf, size: int) -> Dict[str, Any]:
+    info: Dict[str, Any] = {"format": "webp"}
+    if size < 30:
+        return info
+    chunk = bytes(buf[12:16])
+    data = 20
+    if chunk == b"VP8X":
+        flags = buf[data]
+        info["width"] = int.from_bytes(buf[data + 4:data + 7], "little") + 1
+        info["height"] = int.from_bytes(buf[data + 7:data + 10], "little") + 1
+        info["animated"] = bool(flags & 0x02)
+        info["alpha"] = bool(flags & 0x10)
+        info["has_exif"] = bool(flags & 0x08)
+        info["icc_profile"] = bool(flags & 0x20)
+        info["encoding"] = "extended"
+    elif chunk == b"VP8 " and buf[data + 3:data + 6] == b"\x9d\x01\x2a":
+        info["width"] = _u16(buf, data + 6, "<") & 0x3FFF
+        info["height"] = _u16(buf, data + 8, "<") & 0x3FFF
+        info["encoding"] = "lossy"
+    elif chunk == b"VP8L" and buf[data] == 0x2F:
+        bits = _u32(buf, data + 1, "<")
+        info["width"] = (bits & 0x3FFF) + 1
+        info["height"] = ((bits >> 14) & 0x3FFF) + 1
+        info["alpha"] = bool((bits >> 28) & 1)
+        info["encoding"] = "lossless"
+    return info
+
+
+class PdfParser:
+    """Locate the page tree through startxref, xref tables/streams and the trailer."""
+
+    REF_RE = r"/{}\s+(\d+)\s+\d+\s+R"
+    XREF_SUBSECTION_RE = re.compile(rb"\s*(\d+)\s+(\d+)[ \t]*\r?\n?")
+
+    def __init__(self, buf, size: int):
+        self.buf = buf
+        self.size = size
+        self.offsets: Dict[int, Tuple[int, int, int]] = {}
+        self.trailer: Dict[str, Any] = {}
+        self._objstm_cache: Dict[int, Dict[int, bytes]] = {}
+
+    def _ref(self, text: bytes, key: str) -> Optional[int]:
+        m = re.search(self.REF_RE.format(key).encode(), text)
+        return int(m.group(1)) if m else None
+
+    def _int(self, text: bytes, key: str) -> Optional[int]:
+        m = re.search(rb"/" + key.encode() + rb"\s+(\d+)\b(?!\s+\d+\s+R)", text)
+        return int(m.group(1)) if m else None
+
+    def _dict_at(self, pos: int) -> Tuple[bytes, int]:
+        """Return the object text starting at pos (up to stream/endobj) and its end offset."""
+        end = self.buf.find(b"endobj", pos, min(self.size, pos + 1_000_000))
+        end = self.size if end == -1 else end
+        stream = self.buf.find(b"stream", pos, end)
+        stop = stream if stream != -1 else end
+        return bytes(self.buf[pos:stop]), stream
+
+    def _stream_data(self, text: bytes, stream_pos: int) -> bytes:
+        start = stream_pos + 6
+        if self.buf[start:start + 2] == b"\r\n":
+            start += 2
+        elif self.buf[start:start + 1] in (b"\n", b"\r"):
+            start += 1
+        length = self._int(text, "Length")
+        if length is None:
+            length_ref = self._ref(text, "Length")
+            length_text = self.object_text(length_ref) if length_ref is not None else None
+            m = re.search(rb"(\d+)\s*$", length_text or b"")
+            length = int(m.group(1)) if m else None
+        if length is None:
+            end = self.buf.find(b"endstream", start)
+            length = max(0, end - start)
+        raw = bytes(self.buf[start:start + length])
+        if b"/FlateDecode" in text:
+            inflater = zlib.decompressobj()
+            raw = inflater.decompress(raw, METADATA_PDF_STREAM_LIMIT)
+            if inflater.unconsumed_tail:
+                raise ValueError("PDF stream inflates beyond the size limit")
+            predictor = self._int(text, "Predictor")
+            if predictor and predictor >= 10:
+                raw = self._png_unpredict(raw, self._int(text, "Columns") or 1)
+        return raw
+
+    @staticmethod
+    def _png_unpredict(data: bytes, columns: int) -> bytes:
+        row_len = columns + 1
+        prev = bytearray(columns)
+        out = bytearray()
+        for i in range(0, len(data) - columns, row_len):
+            filter_type = data[i]
+            row = bytearray(data[i + 1:i + row_len])
+            if filter_type == 2:
+                row = bytearray((row[j] + prev[j]) & 0xFF for j in range(columns))
+            elif filter_type != 0:
+                raise ValueError("Unsupported PNG predictor in xref stream")
+            out += row
+            prev = row
+        return bytes(out)
+
+    def _read_xref_table(self, pos: int) -> bytes:
+        pos += 4
+        while True:
+            m = self.XREF_SUBSECTION_RE.match(self.buf[pos:pos + 64])
+            if not m:
+                break
+            start, count = int(m.group(1)), int(m.group(2))
+            pos += m.end()
+            for i in range(count):
+                entry = bytes(self.buf[pos:pos + 20])
+                if entry[17:18] == b"n":
+                    self.offsets.setdefault(start + i, (1, int(entry[:10]), 0))
+                pos += 20
+        trailer_pos = self.buf.find(b"trailer", pos, pos + 1024)
+        if trailer_pos == -1:
+            raise ValueError("Missing trailer")
+        end = self.buf.find(b"startxref", trailer_pos)
+        return bytes(self.buf[trailer_pos:end if end != -1 else trailer_pos + 4096])
+
+    def _read_xref_stream(self, pos: int) -> bytes:
+        text, stream_pos = self._dict_at(pos)
+        w = re.search(rb"/W\s*\[\s*(\d+)\s+(\d+)\s+(\d+)\s*\]", text)
+        if not w or stream_pos == -1:
+            raise ValueError("Malformed xref stream")
+        widths = [int(x) for x in w.groups()]
+        size = self._int(text, "Size") or 0
+        index = re.search(rb"/Index\s*\[([\d\s]+)\]", text)
+        ranges = [int(x) for x in index.group(1).split()] if index else [0, size]
+        data = self._stream_data(text, stream_pos)
+        entry_len = sum(widths)
+        offset = 0
+        for start, count in zip(ranges[::2], ranges[1::2]):
+            for i in range(count):
+                fields = []
+                cursor = offset
+                for width in widths:
+                    fields.append(int.from_bytes(data[cursor:cursor + width], "big") if width else None)
+                    cursor += width
+                offset += entry_len
+                kind = fields[0] if widths[0] else 1
+                if kind in (1, 2):
+                    self.offsets.setdefault(start + i, (kind, fields[1], fields[2] or 0))
+        return text
+
+    def load(self) -> None:
+        tail_start = max(0, self.size - 2048)
+        sx = self.buf.rfind(b"startxref", tail_start)
+        if sx == -1:
+            raise ValueError("startxref not found")
+        m = re.match(rb"startxref\s+(\d+)", self.buf[sx:sx + 40])
+        pos = int(m.group(1))
+        seen = set()
+        while pos is not None and pos not in seen and pos < self.size:
+            seen.add(pos)
+            if self.buf[pos:pos + 4] == b"xref":
+                trailer = self._read_xref_table(pos)
+                stm = self._int(trailer, "XRefStm")
+                if stm is not None and stm not in seen:
+                    self._read_xref_stream(stm)
+            else:
+                trailer = self._read_xref_stream(pos)
+            for key in ("Root", "Info"):
+                if key not in self.trailer:
+                    ref = self._ref(trailer, key)
+                    if ref is not None:
+                        self.trailer[key] = ref
+            if "encrypted" not in self.trailer:
+                self.trailer["encrypted"] = b"/Encrypt" in trailer
+            pos = self._int(trailer, "Prev")
+
+    def object_text(self, number: Optional[int]) -> Optional[bytes]:
+        entry = self.offsets.get(number)
+        if entry is None:
+            return None
+        kind, a, b = entry
+        if kind == 1:
+            text, _ = self._dict_at(a)
+            return text
+        if a not in self._objstm_cache:
+            container = self.offsets.get(a)
+            if container is None or container[0] != 1:
+                return None
+            text, stream_pos = self._dict_at(container[1])
+            data = self._stream_data(text, stream_pos)
+            first = self._int(text, "First") or 0
+            count = self._int(text, "N") or 0
+            header = data[:first].split()
+            pairs = [(int(header[i]), int(header[i + 1])) for i in range(0, min(len(header), count * 2) - 1, 2)]
+            objects = {}
+            for i, (num, off) in enumerate(pairs):
+                end = pairs[i + 1][1] if i + 1 < len(pairs) else len(data) - first
+                objects[num] = data[first + off:first + end]
+            self._objstm_cache[a] = objects
+        return self._objstm_cache[a].get(number)
+
+    def page_count(self) -> Optional[int]:
+        root = self.object_text(self.trailer.get("Root"))
+        pages = self.object_text(self._ref(root or b"", "Pages"))
+        return self._int(pages or b"", "Count")
+
+    def info(self) -> Dict[str, str]:
+        text = self.object_text(self.trailer.get("Info")) or b""
+        result = {}
+        for key in ("Title", "Author", "Subject", "Creator", "Producer", "CreationDate", "ModDate"):
+            m = re.search(rb"/" + key.encode() + rb"\s*(\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>)", text)
+            if m:
+                result[key.lower()] = _pdf_string(m.group(1))
+        return result
+
+
+def _pdf_string(token: bytes) -> str:
+    if token.startswith(b"<"):
+        raw = bytes.fromhex(re.sub(rb"\s", b"", token[1:-1]).decode("ascii"))
+    else:
+        raw = re.sub(rb"\\([nrtbf()\\])", lambda m: {b"n": b"\n", b"r": b"\r", b"t": b"\t",
+                                                    b"b": b"\b", b"f": b"\f"}.get(m.group(1), m.group(1)),
+                     token[1:-1])
+    if raw.startswith(b"\xfe\xff"):
+        return raw[2:].decode("utf-16-be", "replace")
+    return raw.decode("latin-1")
+
+
+PDF_PAGES_SCAN_RE = re.compile(rb"/Type\s*/Pages\b(?:(?!endobj).){0,512}?/Count\s+(\d+)", re.S)
+
+
+def parse_pdf(buf, size: int) -> Dict[str, Any]:
+    info: Dict[str, Any] = {"format": "pdf"}
+    m = re.match(rb"%PDF-(\d\.\d)", buf[:16])
+    if m:
+        info["version"] = m.group(1).decode("ascii")
+    parser = PdfParser(buf, size)
+    try:
+        parser.load()
+        info["encrypted"] = parser.trailer.get("encrypted", False)
+        info["pages"] = parser.page_count()
+        info["page_count_source"] = "xref"
+        info["document_info"] = parser.info()
+    except (ValueError, IndexError, struct.error, zlib.error, AttributeError, TypeError):
+        pass
+    if info.get("pages") is None:
+        # Damaged xref: fall back to the largest /Pages node count in the file.
+        counts = [int(c) for c in PDF_PAGES_SCAN_RE.findall(buf)]
+        if counts:
+            info["pages"] = max(counts)
+            info["page_count_source"] = "scan"
+    return info
+
+
+ZIP_KINDS = [
+    ("[Content_Types].xml", "ooxml"),
+    ("AndroidManifest.xml", "apk"),
+    ("META-INF/MANIFEST.MF", "jar"),
+    ("mimetype", "opendocument/epub"),
+]
+
+
+def parse_zip(buf, size: int) -> Dict[str, Any]:
+    """Read the end-of-central-directory record and walk the central directory."""
+    info: Dict[str, Any] = {"format": "zip"}
+    eocd = buf.rfind(b"PK\x05\x06", max(0, size - 65557))
+    if eocd == -1:
+        info["error"] = "End of central directory not found"
+        return info
+    total = _u16(buf, eocd + 10, "<")
+    cd_size = _u32(buf, eocd + 12, "<")
+    cd_offset = _u32(buf, eocd + 16, "<")
+    comment_len = _u16(buf, eocd + 20, "<")
+    if comment_len:
+        info["comment"] = bytes(buf[eocd + 22:eocd + 22 + comment_len]).decode("utf-8", "replace")
+
+    locator = eocd - 20
+    if locator >= 0 and buf[locator:locator + 4] == b"PK\x06\x07":
+        record = struct.unpack_from("<Q", buf, locator + 8)[0]
+        if buf[record:record + 4] == b"PK\x06\x06":
+            total, cd_size, cd_offset = struct.unpack_from("<QQQ", buf, record + 32)
+            info["zip64"] = True
+
+    names: List[str] = []
+    methods: Dict[str, int] = {}
+    uncompressed = compressed = directories = 0
+    encrypted = False
+    kinds = set()
+    pos, end = cd_offset, min(size, cd_offset + cd_size)
+    entries = 0
+    while pos + 46 <= end and buf[pos:pos + 4] == b"PK\x01\x02":
+        flags, method = struct.unpack_from("<HH", buf, pos + 8)
+        c_size, u_size = struct.unpack_from("<II", buf, pos + 20)
+        name_len, extra_len, comment_len = struct.unpack_from("<HHH", buf, pos + 28)
+        name = bytes(buf[pos + 46:pos + 46 + name_len]).decode("utf-8" if flags & 0x800 else "cp437", "replace")
+        if u_size == 0xFFFFFFFF or c_size == 0xFFFFFFFF:
+            extra = pos + 46 + name_len
+            extra_end = extra + extra_len
+            while extra + 4 <= extra_end:
+                header_id, data_len = struct.unpack_from("<HH", buf, extra)
+                if header_id == 0x0001:
+                    values = iter(struct.unpack_from("<" + "Q" * (data_len // 8), buf, extra + 4))
+                    if u_size == 0xFFFFFFFF:
+                        u_size = next(values, u_size)
+                    if c_size == 0xFFFFFFFF:
+                        c_size = next(values, c_size)
+                    break
+                extra += 4 + data_len
+
+        entries += 1
+        encrypted = encrypted or bool(flags & 0x1)
+        if name.endswith("/"):
+            directories += 1
+        uncompressed += u_size
+        compressed += c_size
+        method_name = {0: "stored", 8: "deflate", 9: "deflate64", 12: "bzip2", 14: "lzma", 93: "zstd"}.get(method, str(method))
+        methods[method_name] = methods.get(method_name, 0) + 1
+        for marker, kind in ZIP_KINDS:
+            if name == marker:
+                kinds.add(kind)
+        if len(names) < METADATA_ZIP_NAME_LIMIT:
+            names.append(name)
+        pos += 46 + name_len + extra_len + comment_len
+
+    info.update(
+        {
+            "entries": entries,
+            "declared_entries": total,
+            "files": entries - directories,
+            "directories": directories,
+            "uncompressed_size_bytes": uncompressed,
+            "compressed_size_bytes": compressed,
+            "compression_ratio": round(uncompressed / compressed, 2) if compressed else None,
+            "methods": methods,
+            "encrypted": encrypted,
+            "names": names,
+            "names_truncated": entries > len(names),
+        }
+    )
+    if kinds:
+        info["container"] = sorted(kinds)
+    return info
+
+
+def _count_lines(buf, size: int, chunk: int = 1 << 20) -> int:
+    return sum(buf[i:i + chunk].count(b"\n") for i in range(0, size, chunk))
+
+
+def analyze_buffer(buf, size: int, file_name: str) -> Dict[str, Any]:
+    _, ext = file_name.rsplit(".", 1) if "." in file_name else (file_name, "")
+    mime_type = detect_mime_type(buf, file_name)
+    is_zip = mime_type == "application/zip"
+    if is_zip:
+        # docx/xlsx/jar/epub etc. are zips; keep their specific type when known.
+        mime_type = mimetypes.guess_type(file_name)[0] or mime_type
+
+    metadata: Dict[str, Any] = {
+        "success": True,
+        "file_name": file_name,
+        "file_size_bytes": size,
+        "extension": ext.lower(),
+        "mime_type": mime_type or "application/octet-stream",
+    }
+    parsers = {
+        "image/jpeg": parse_jpeg,
+        "image/png": parse_png,
+        "image/gif": parse_gif,
+        "image/webp": parse_webp,
+    }
+
+    try:
+        if mime_type in parsers:
+            metadata["type"] = "image"
+            details = parsers[mime_type](buf, size)
+            for key in ("width", "height"):
+                if key in details:
+                    metadata[key] = details[key]
+            metadata["details"] = details
+        elif mime_type and mime_type.startswith("image/"):
+            metadata["type"] = "image"
+        elif mime_type == "application/pdf":
+            metadata["type"] = "pdf"
+            details = parse_pdf(buf, size)
+            if details.get("pages"):
+                metadata["pages"] = details["pages"]
+            metadata["details"] = details
+        elif is_zip:
+            metadata["type"] = "archive"
+            metadata["details"] = parse_zip(buf, size)
+        elif mime_type == "application/json":
+            metadata["type"] = "json"
+            if size <= METADATA_TEXT_DECODE_LIMIT:
+                try:
+                    json_data = json.loads(bytes(buf[:size]).decode("utf-8"))
+                    metadata["valid_json"] = True
+                    metadata["keys"] = list(json_data.keys()) if isinstance(json_data, dict) else None
+                except (UnicodeDecodeError, ValueError):
+                    metadata["valid_json"] = False
+        elif mime_type and mime_type.startswith("text/"):
+            metadata["type"] = "text"
+            metadata["line_count"] = _count_lines(buf, size) + 1
+            if size <= METADATA_TEXT_DECODE_LIMIT:
+                raw = bytes(buf[:size])
+                try:
+                    metadata["character_count"] = len(raw.decode("utf-8"))
+                except UnicodeDecodeError:
+                    metadata["character_count"] = len(raw.decode("latin-1"))
+        else:
+            metadata["type"] = "binary"
+    except (IndexError, struct.error, ValueError) as e:
+        metadata["parse_error"] = str(e)
+    return metadata
+
+
+def analyze_file(fileobj, file_name: str) -> Dict[str, Any]:
+    """Analyse an open binary file through a read-only mmap."""
+    fileobj.seek(0, 2)
+    size = fileobj.tell()
+    if size == 0:
+        return analyze_buffer(b"", 0, file_name)
+    with mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        return analyze_buffer(buf, size, file_name)
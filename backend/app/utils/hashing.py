@@ -0,0 +1,385 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, AsyncIterator, Callable, Dict, List, Optional
+
+from ..config import (
+    HASH_BLOCK_SIZE,
+    HASH_PARALLEL_THRESHOLD,
+    HASH_WORKERS,
+    BLAKE2_TREE_LEAF_SIZE,
+)
+
+# hashlib and zlib release the GIL for buffers over ~2KB, so feeding one
+# block to several hashers from a thread pool runs them on separate cores.
+_hash_pool: Optional[ThreadPoolExecutor] = None
+# Tree leaves get their own pool: a tree hasher's update already runs on the
+# hash pool, and waiting there on leaf tasks queued behind it would deadlock.
+_leaf_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_hash_pool() -> ThreadPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="hash")
+    return _hash_pool
+
+
+def _get_leaf_pool() -> ThreadPoolExecutor:
+    global _leaf_pool
+    if _leaf_pool is None:
+        _leaf_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="hash-leaf")
+    return _leaf_pool
+
+
+def shutdown_hash_pools() -> None:
+    global _hash_pool, _leaf_pool
+    for pool in (_hash_pool, _leaf_pool):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _hash_pool = _leaf_pool = None
+
+
+class _Checksum:
+    """hashlib-style wrapper around zlib's running checksums."""
+
+    def __init__(self, func: Callable[[bytes, int], int], initial: int):
+        self._func = func
+        self._value = initial
+        self.digest_size = 4
+
+    def update(self, data) -> None:
+        self._value = self._func(data, self._value)
+
+    def digest(self) -> bytes:
+        return (self._value & 0xFFFFFFFF).to_bytes(4, "big")
+
+    def hexdigest(self) -> str:
+        return format(self._value & 0xFFFFFFFF, "08x")
+
+
+class Blake2TreeHasher:
+    """BLAKE2 in tree mode (unlimited fanout, depth 2).
+
+    Fixed-size leaves are hashed independently - in parallel on the hash
+    leaf pool - and the root node hashes the concatenated leaf digests. The
+    result differs from plain sequential BLAKE2 by design.
+    """
+
+    def __init__(self, kind: str = "blake2b", leaf_size: int = BLAKE2_TREE_LEAF_SIZE):
+        self._cls = hashlib.blake2b if kind == "blake2b" else hashlib.blake2s
+        self.digest_size = self._cls.MAX_DIGEST_SIZE
+        self.leaf_size = leaf_size
+        self._pending = bytearray()
+        self._leaves: List[bytes] = []
+        self._digest: Optional[bytes] = None
+
+    def _params(self, **kwargs):
+        return dict(
+            digest_size=self.digest_size,
+            fanout=0,
+            depth=2,
+            leaf_size=self.leaf_size,
+            inner_size=self.digest_size,
+            **kwargs,
+        )
+
+    def _leaf(self, offset: int, data, last: bool) -> bytes:
+        return self._cls(data, node_offset=offset, node_depth=0, last_node=last, **self._params()).digest()
+
+    def _hash_leaves(self, blocks: List[bytes], last_index: Optional[int]) -> None:
+        start = len(self._leaves)
+        offsets = range(start, start + len(blocks))
+        lasts = [start + i == last_index for i in range(len(blocks))]
+        if len(blocks) > 1:
+            self._leaves.extend(_get_leaf_pool().map(self._leaf, offsets, blocks, lasts))
+        else:
+            self._leaves.extend(map(self._leaf, offsets, blocks, lasts))
+
+    def update(self, data) -> None:
+        self._pending += data
+        # Keep at least one byte back so the final leaf can be flagged last_node.
+        full = (len(self._pending) - 1) // self.leaf_size
+        if full > 0:
+            cut = full * self.leaf_size
+            view = bytes(self._pending[:cut])
+            del self._pending[:cut]
+            blocks = [view[i:i + self.leaf_size] for i in range(0, cut, self.leaf_size)]
+            self._hash_leaves(blocks, None)
+
+    def digest(self) -> bytes:
+        if self._digest is None:
+            self._hash_leaves([bytes(self._pending)], len(self._leaves))
+            self._pending = bytearray()
+            root = self._cls(node_offset=0, node_depth=1, last_node=True, **self._params())
+            for leaf in self._leaves:
+                root.update(leaf)
+            self._digest = root.digest()
+        return self._digest
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+
+def _optional_factories() -> Dict[str, Callable[[], object]]:
+    factories: Dict[str, Callable[[], object]] = {}
+    try:
+        import xxhash
+
+        factories.update(
+            {
+                "xxh32": xxhash.xxh32,
+                "xxh64": xxhash.xxh64,
+                "xxh3_64": xxhash.xxh3_64,
+                "xxh3_128": xxhash.xxh3_128,
+            }
+        )
+    except ImportError:
+        pass
+    try:
+        import blake3
+
+        factories["blake3"] = lambda: blake3.blake3(max_threads=blake3.blake3.AUTO)
+    except ImportError:
+        pass
+    return factories
+
+
+HASH_FACTORIES: Dict[str, Callable[[], object]] = {
+    "md5": hashlib.md5,
+    "sha1": hashlib.sha1,
+    "sha224": hashlib.sha224,
+    "sha256": hashlib.sha256,
+    "sha384": hashlib.sha384,
+    "sha512": hashlib.sha512,
+    "blake2b": hashlib.blake2b,
+    "blake2s": hashlib.blake2s,
+    "sha3_224": hashlib.sha3_224,
+    "sha3_256": hashlib.sha3_256,
+    "sha3_384": hashlib.sha3_384,
+    "sha3_512": hashlib.sha3_512,
+    "crc32": lambda: _Checksum(zlib.crc32, 0),
+    "adler32": lambda: _Checksum(zlib.adler32, 1),
+    "blake2b-tree": lambda: Blake2TreeHasher("blake2b"),
+    "blake2s-tree": lambda: Blake2TreeHasher("blake2s"),
+    **_optional_factories(),
+}
+
+
+def parse_algorithms(value: str) -> List[str]:
+    names = [name.strip().lower() for name in value.split(",") if name.strip()]
+    if names == ["all"]:
+        return list(HASH_FACTORIES)
+    unknown = [name for name in names if name not in HASH_FACTORIES]
+    if unknown or not names:
+        raise ValueError(
+            f"Unsupported algorithm(s): {', '.join(unknown) or 'none given'}. "
+            f"Available: {', '.join(HASH_FACTORIES)}"
+        )
+    return list(dict.fromkeys(names))
+
+
+class MultiHasher:
+    """Feed one pass over the data to several hashers at once."""
+
+    def __init__(self, algorithms: List[str]):
+        self.hashers = {name: HASH_FACTORIES[name]() for name in algorithms}
+        self.length = 0
+
+    def update(self, data) -> None:
+        self.length += len(data)
+        if len(self.hashers) > 1 and len(data) >= HASH_PARALLEL_THRESHOLD:
+            list(get_hash_pool().map(lambda h: h.update(data), self.hashers.values()))
+        else:
+            for hasher in self.hashers.values():
+                hasher.update(data)
+
+    async def update_async(self, data) -> None:
+        """Hash large blocks off the event loop, one pool task per algorithm."""
+        self.length += len(data)
+        if len(data) < HASH_PARALLEL_THRESHOLD:
+            for hasher in self.hashers.values():
+                hasher.update(data)
+            return
+        loop = asyncio.get_running_loop()
+        pool = get_hash_pool()
+        await asyncio.gather(
+            *(loop.run_in_executor(pool, hasher.update, data) for hasher in self.hashers.values())
+        )
+
+    def results(self, encoding: str = "hex") -> Dict[str, str]:
+        if encoding == "base64":
+            return {name: base64.b64encode(h.digest()).decode("utf-8") for name, h in self.hashers.items()}
+        return {name: h.hexdigest() for name, h in self.hashers.items()}
+
+
+async def hash_chunks(
+    chunks: AsyncIterator[bytes], algorithms: List[str], block_size: int = HASH_BLOCK_SIZE
+) -> MultiHasher:
+    """Hash an async byte stream, regrouping small network chunks into large blocks."""
+    hasher = MultiHasher(algorithms)
+    block = bytearray()
+    async for chunk in chunks:
+        block += chunk
+        if len(block) >= block_size:
+            await hasher.update_async(bytes(block))
+            block = bytearray()
+    if block:
+        await hasher.update_async(bytes(block))
+    return hasher
+
+
+# Hex digest length -> algorithm, for manifests that do not say which one they use.
+DIGEST_LENGTHS = {32: "md5", 40: "sha1", 56: "sha224", 64: "sha256", 96: "sha384", 128: "sha512"}
+
+_GNU_LINE_RE = re.compile(r"^\\?([0-9a-fA-F]+) [ *](.+)$")
+_HEX_RE = re.compile(r"^[0-9a-f]+$")
+_BSD_LINE_RE = re.compile(r"^\\?([A-Za-z0-9_-]+) ?\((.+)\) ?= ?([0-9a-fA-F]+)$")
+
+
+def normalize_member_name(name: str) -> str:
+    name = name.replace("\\", "/")
+    while name.startswith("./"):
+        name = name[2:]
+    return name.lstrip("/")
+
+
+def _manifest_entry(name: str, digest: str, algorithm: Optional[str]) -> Dict[str, str]:
+    digest = (digest or "").strip().lower()
+    if not name or not _HEX_RE.match(digest):
+        raise ValueError(f"Invalid manifest entry for {name!r}")
+    algorithm = (algorithm or DIGEST_LENGTHS.get(len(digest), "")).lower().replace("-", "_")
+    if algorithm not in HASH_FACTORIES:
+        raise ValueError(f"Cannot determine a supported algorithm for {name!r}")
+    return {"name": normalize_member_name(name), "algorithm": algorithm, "expected": digest}
+
+
+def parse_manifest(text: str, algorithm: Optional[str] = None) -> List[Dict[str, str]]:
+    """Parse sha256sum/md5sum (GNU or --tag BSD style) or JSON checksum manifests.
+
+    JSON may be an object of {name: digest} or a list of
+    {"name"|"path", "hash"|"digest", "algorithm"?} objects.
+    """
+    stripped = text.strip()
+    if stripped.startswith(("{", "[")):
+        data = json.loads(stripped)
+        if isinstance(data, dict):
+            return [_manifest_entry(name, digest, algorithm) for name, digest in data.items()]
+        return [
+            _manifest_entry(
+                item.get("name") or item.get("path"),
+                item.get("hash") or item.get("digest"),
+                item.get("algorithm") or algorithm,
+            )
+            for item in data
+        ]
+
+    entries = []
+    for number, line in enumerate(stripped.splitlines(), 1):
+        line = line.rstrip("\r")
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        # A leading backslash marks a name with escaped "\\" or "\n" (coreutils).
+        escaped = line.startswith("\\")
+        match = _BSD_LINE_RE.match(line)
+        if match:
+            tag, name, digest = match.groups()
+            entry_alg = algorithm or tag
+        else:
+            match = _GNU_LINE_RE.match(line)
+            if not match:
+                raise ValueError(f"Unrecognised manifest line {number}: {line[:80]}")
+            digest, name = match.groups()
+            entry_alg = algorithm
+        if escaped:
+            name = name.replace("\\\\", "\0").replace("\\n", "\n").replace("\0", "\\")
+        entries.append(_manifest_entry(name, digest, entry_alg))
+    return entries
+
+
+def hash_fileobj(fileobj: IO[bytes], algorithms: List[str], block_size: int = HASH_BLOCK_SIZE) -> Dict[str, str]:
+    """Hash a file object in blocks; meant to run on a pool worker.
+
+    Hashers are fed serially here - the parallelism comes from hashing many
+    files at once, and nesting pool tasks inside a pool task would deadlock.
+    """
+    hashers = {name: HASH_FACTORIES[name]() for name in algorithms}
+    while True:
+        block = fileobj.read(block_size)
+        if not block:
+            break
+        for hasher in hashers.values():
+            hasher.update(block)
+    return {name: hasher.hexdigest() for name, hasher in hashers.items()}
+
+
+async def verify_manifest(
+    entries: List[Dict[str, str]], openers: Dict[str, Callable[[], IO[bytes]]]
+) -> Dict[str, object]:
+    """Hash every listed file on the hash pool and compare in constant time.
+
+    ``openers`` maps normalised file names to callables returning a readable
+    binary file object; names that only match by basename are accepted when
+    the basename is unique.
+    """
+    by_basename: Dict[str, List[str]] = {}
+    for name in openers:
+        by_basename.setdefault(name.rsplit("/", 1)[-1], []).append(name)
+
+    def resolve(name: str) -> Optional[str]:
+        if name in openers:
+            return name
+        candidates = by_basename.get(name.rsplit("/", 1)[-1], [])
+        return candidates[0] if len(candidates) == 1 else None
+
+    wanted: Dict[str, List[str]] = {}
+    for entry in entries:
+        source = resolve(entry["name"])
+        if source is not None:
+            algs = wanted.setdefault(source, [])
+            if entry["algorithm"] not in algs:
+                algs.append(entry["algorithm"])
+
+    def job(source: str, algorithms: List[str]) -> Dict[str, str]:
+        with openers[source]() as fileobj:
+            return hash_fileobj(fileobj, algorithms)
+
+    loop = asyncio.get_running_loop()
+    pool = get_hash_pool()
+    sources = list(wanted)
+    outcomes = await asyncio.gather(
+        *(loop.run_in_executor(pool, job, source, wanted[source]) for source in sources),
+        return_exceptions=True,
+    )
+    computed = dict(zip(sources, outcomes))
+
+    results = []
+    counts = {"ok": 0, "mismatch": 0, "missing": 0, "error": 0}
+    for entry in entries:
+        source = resolve(entry["name"])
+        result = {**entry, "file": source, "computed": None, "error": None}
+        if source is None:
+            status = "missing"
+        elif isinstance(computed[source], Exception):
+            status = "error"
+            result["error"] = str(computed[source])
+        else:
+            result["computed"] = computed[source][entry["algorithm"]]
+            matched = hmac.compare_digest(result["computed"], entry["expected"])
+            status = "ok" if matched else "mismatch"
+        result["status"] = status
+        counts[status] += 1
+        results.append(result)
+
+    listed = set(wanted)
+    return {
+        "valid": counts["ok"] == len(entries),
+        "summary": {"entries": len(entries), **counts},
+        "results": results,
+        "unlisted": sorted(name for name in openers if name not in listed),
+    }
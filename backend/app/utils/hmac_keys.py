@@ -0,0 +1,108 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import secrets
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from ..config import MAX_HMAC_KEYS
+
+HMAC_ALGORITHMS = {
+    "sha256": hashlib.sha256,
+    "sha384": hashlib.sha384,
+    "sha512": hashlib.sha512,
+}
+
+
+def decode_value(value: str, encoding: str) -> bytes:
+    """Decode text given as utf-8, hex or base64 into bytes."""
+    try:
+        if encoding == "hex":
+            return bytes.fromhex(value)
+        if encoding == "base64":
+            return base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError(f"Value is not valid {encoding}")
+    if encoding != "utf-8":
+        raise ValueError("encoding must be utf-8, hex or base64")
+    return value.encode("utf-8")
+
+
+def _check_algorithm(algorithm: str) -> str:
+    algorithm = algorithm.lower()
+    if algorithm not in HMAC_ALGORITHMS:
+        raise ValueError(f"Supported: {', '.join(HMAC_ALGORITHMS)}")
+    return algorithm
+
+
+@lru_cache(maxsize=256)
+def prepared_context(key: bytes, algorithm: str) -> "hmac.HMAC":
+    """Keyed HMAC for an inline key; sign() copies it instead of re-keying."""
+    return hmac.new(key, digestmod=HMAC_ALGORITHMS[_check_algorithm(algorithm)])
+
+
+def sign(context: "hmac.HMAC", message: bytes) -> bytes:
+    mac = context.copy()
+    mac.update(message)
+    return mac.digest()
+
+
+def format_digest(digest: bytes, output: str) -> Dict[str, str]:
+    result = {}
+    if output in ("hex", "both"):
+        result["signature"] = digest.hex()
+    if output in ("base64", "both"):
+        result["signature_base64"] = base64.b64encode(digest).decode("ascii")
+    return result
+
+
+def verify(context: "hmac.HMAC", message: bytes, signature: str, encoding: str) -> bool:
+    try:
+        expected = decode_value(signature.strip(), encoding)
+    except ValueError:
+        return False
+    return hmac.compare_digest(sign(context, message), expected)
+
+
+class HmacKeyStore:
+    """In-memory key-id -> prepared HMAC context map.
+
+    The raw key is never returned; only the keyed context is kept. The oldest
+    key is dropped once MAX_HMAC_KEYS is exceeded.
+    """
+
+    def __init__(self, max_keys: int = MAX_HMAC_KEYS):
+        self.max_keys = max_keys
+        self._keys: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def add(self, key: bytes, algorithm: str, key_id: Optional[str] = None) -> Dict[str, Any]:
+        algorithm = _check_algorithm(algorithm)
+        key_id = key_id or secrets.token_hex(8)
+        entry = {
+            "key_id": key_id,
+            "algorithm": algorithm,
+            "created_at": time.time(),
+            "context": hmac.new(key, digestmod=HMAC_ALGORITHMS[algorithm]),
+        }
+        self._keys[key_id] = entry
+        self._keys.move_to_end(key_id)
+        while len(self._keys) > self.max_keys:
+            self._keys.popitem(last=False)
+        return entry
+
+    def get(self, key_id: str) -> Optional[Dict[str, Any]]:
+        return self._keys.get(key_id)
+
+    def remove(self, key_id: str) -> bool:
+        return self._keys.pop(key_id, None) is not None
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [
+            {k: v for k, v in entry.items() if k != "context"} for entry in self._keys.values()
+        ]
+
+
+hmac_keys = HmacKeyStore()
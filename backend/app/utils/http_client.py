@@ -0,0 +1,201 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config import (
+    HTTP_TIMEOUT,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    PING_HISTOGRAM_BUCKETS_MS,
+)
+
+_client = None
+
+# (start event, end event) pairs emitted by httpcore's "trace" extension.
+# DNS resolution happens inside connect_tcp, so it is folded into "connect".
+PING_PHASES = {
+    "connect": ("connect_tcp.started", "connect_tcp.complete"),
+    "tls": ("start_tls.started", "start_tls.complete"),
+    "send": ("send_request_headers.started", "send_request_body.complete"),
+    "wait": ("send_request_body.complete", "receive_response_headers.complete"),
+    "receive": ("receive_response_body.started", "receive_response_body.complete"),
+}
+
+# Pings only ever read; anything else could change state on the target.
+PING_METHODS = ("GET", "HEAD")
+
+
+def ping_method(method: Optional[str]) -> str:
+    """Normalise a ping method, defaulting to GET; ValueError if unsafe."""
+    method = (method or "GET").upper()
+    if method not in PING_METHODS:
+        raise ValueError(f"method must be one of {', '.join(PING_METHODS)}")
+    return method
+
+
+def get_http_client():
+    """Return the shared pooled client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        import httpx
+
+        _client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+def set_http_client(client) -> None:
+    """Swap the shared client, e.g. for one bound to a local stand-in server."""
+    global _client
+    _client = client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def latency_histogram(values: List[float]) -> List[Dict[str, Any]]:
+    counts = [0] * (len(PING_HISTOGRAM_BUCKETS_MS) + 1)
+    for value in values:
+        for i, bound in enumerate(PING_HISTOGRAM_BUCKETS_MS):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f"<={b}ms" for b in PING_HISTOGRAM_BUCKETS_MS]
+    labels.append(f">{PING_HISTOGRAM_BUCKETS_MS[-1]}ms")
+    return [{"bucket": label, "count": count} for label, count in zip(labels, counts)]
+
+
+def latency_stats(values: List[float]) -> Dict[str, Any]:
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0, "min": None, "avg": None, "p50": None, "p95": None, "max": None}
+    return {
+        "count": len(ordered),
+        "min": round(ordered[0], 2),
+        "avg": round(sum(ordered) / len(ordered), 2),
+        "p50": round(percentile(ordered, 50), 2),
+        "p95": round(percentile(ordered, 95), 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+async def ping_once(
+    url: str, method: str = "GET", timeout: Optional[float] = None, client=None
+) -> Dict[str, Any]:
+    import httpx
+
+    method = ping_method(method)
+    client = client or get_http_client()
+    marks: Dict[str, float] = {}
+
+    async def trace(event: str, info: Dict[str, Any]) -> None:
+        marks[event.split(".", 1)[-1]] = time.perf_counter()
+
+    start = time.perf_counter()
+    try:
+        resp = await client.request(
+            method,
+            url,
+            timeout=timeout if timeout is not None else HTTP_TIMEOUT,
+            extensions={"trace": trace},
+        )
+    except (httpx.HTTPError, httpx.InvalidURL) as e:
+        # InvalidURL is not an HTTPError; reporting it per sample keeps one
+        # malformed URL from failing the rest of a ping_many batch.
+        return {
+            "url": url,
+            "ok": False,
+            "error": str(e) or type(e).__name__,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+    elapsed = (time.perf_counter() - start) * 1000
+
+    phases = {}
+    for phase, (begin, end) in PING_PHASES.items():
+        if begin in marks and end in marks:
+            phases[phase] = round((marks[end] - marks[begin]) * 1000, 2)
+        else:
+            phases[phase] = None
+
+    return {
+        "url": url,
+        "ok": True,
+        "status_code": resp.status_code,
+        "status_text": resp.reason_phrase,
+        "elapsed_ms": round(elapsed, 2),
+        "phases": phases,
+        "redirects": len(resp.history),
+        "headers": dict(resp.headers),
+    }
+
+
+async def ping_many(
+    urls: List[str],
+    samples: int = 1,
+    concurrency: int = 10,
+    method: str = "GET",
+    timeout: Optional[float] = None,
+    client=None,
+) -> List[Dict[str, Any]]:
+    client = client or get_http_client()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(url: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await ping_once(url, method, timeout, client)
+
+    jobs = [run(url) for url in urls for _ in range(samples)]
+    results = await asyncio.gather(*jobs)
+
+    report = []
+    for index, url in enumerate(urls):
+        url_samples = results[index * samples:(index + 1) * samples]
+        ok = [s for s in url_samples if s["ok"]]
+        latencies = [s["elapsed_ms"] for s in ok]
+
+        status_codes: Dict[str, int] = {}
+        for s in ok:
+            key = str(s["status_code"])
+            status_codes[key] = status_codes.get(key, 0) + 1
+
+        phase_avgs = {}
+        for phase in PING_PHASES:
+            values = [s["phases"][phase] for s in ok if s["phases"][phase] is not None]
+            phase_avgs[phase] = round(sum(values) / len(values), 2) if values else None
+
+        report.append(
+            {
+                "url": url,
+                "samples": len(url_samples),
+                "errors": len(url_samples) - len(ok),
+                "error_messages": sorted({s["error"] for s in url_samples if not s["ok"]}),
+                "status_codes": status_codes,
+                "latency_ms": latency_stats(latencies),
+                "histogram": latency_histogram(latencies),
+                "phases_avg_ms": phase_avgs,
+            }
+        )
+    return report
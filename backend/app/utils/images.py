@@ -0,0 +1,357 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from ..config import (
+    IMAGE_WORKERS,
+    IMAGE_CACHE_DIR,
+    IMAGE_CACHE_MAX_BYTES,
+    MAX_BATCH_IMAGES,
+    MAX_BATCH_INFLATED_BYTES,
+    MAX_UPLOAD_BYTES,
+)
+
+_executor: Optional[Executor] = None
+
+IMAGE_FORMATS = {
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+    "jpg": ("JPEG", "image/jpeg", "jpg"),
+    "png": ("PNG", "image/png", "png"),
+    "webp": ("WEBP", "image/webp", "webp"),
+    "gif": ("GIF", "image/gif", "gif"),
+}
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+
+RESAMPLE_FILTERS = ["nearest", "box", "bilinear", "hamming", "bicubic", "lanczos"]
+FIT_MODES = ["stretch", "contain", "cover"]
+
+# Same factor Image.thumbnail uses: decode/reduce to at least twice the target
+# size with cheap integer scaling, then finish with the real filter.
+REDUCING_GAP = 2.0
+
+_ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def get_image_executor() -> Executor:
+    """Process pool for PIL work, falling back to threads where processes are unavailable."""
+    global _executor
+    if _executor is None:
+        try:
+            _executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+        except (OSError, NotImplementedError, ImportError):
+            _executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _executor
+
+
+def shutdown_image_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_image_job(func, *args):
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_image_executor(), func, *args)
+    except BrokenExecutor:
+        # A broken process pool (e.g. a worker killed by the OOM killer) is
+        # replaced on the next request.
+        shutdown_image_executor()
+        raise
+
+
+def parse_sizes(value: Optional[str]) -> List[Tuple[Optional[int], Optional[int]]]:
+    """Parse "320,640x480,x200" into (width, height) pairs."""
+    sizes = []
+    for part in (value or "").split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        width, _, height = part.partition("x")
+        w = int(width) if width else None
+        h = int(height) if height else None
+        if (w is not None and w < 1) or (h is not None and h < 1) or (w is None and h is None):
+            raise ValueError(f"Invalid size: {part}")
+        sizes.append((w, h))
+    return sizes
+
+
+def image_format(fmt: str) -> Tuple[str, str, str]:
+    """(PIL format, MIME type, extension) for ``fmt``.
+
+    Names outside IMAGE_FORMATS are passed to Pillow as-is (bmp, tiff, ...),
+    as /image/resize always allowed; Pillow rejects the ones it cannot write.
+    """
+    fmt = fmt.lower()
+    if fmt in IMAGE_FORMATS:
+        return IMAGE_FORMATS[fmt]
+    return fmt.upper(), f"image/{fmt}", fmt
+
+
+def attachment_header(filename: str) -> str:
+    """Content-Disposition for a possibly non-ASCII name (RFC 6266 / RFC 5987)."""
+    fallback = re.sub(r"[^A-Za-z0-9._-]", "_", filename)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+def size_label(width: Optional[int], height: Optional[int]) -> str:
+    if width and height:
+        return f"{width}x{height}"
+    if width:
+        return f"{width}w"
+    if height:
+        return f"{height}h"
+    return "original"
+
+
+def resolve_size(
+    src_w: int, src_h: int, width: Optional[int], height: Optional[int], fit: str
+) -> Tuple[Tuple[int, int], Optional[Tuple[int, int]]]:
+    """Return (scaled size, crop size) for a requested box."""
+    if fit == "stretch" or (width is None and height is None):
+        return (width or src_w, height or src_h), None
+
+    scale_w = width / src_w if width else None
+    scale_h = height / src_h if height else None
+    if fit == "cover" and scale_w and scale_h:
+        scale = max(scale_w, scale_h)
+        crop = (width, height)
+    else:
+        scale = min(s for s in (scale_w, scale_h) if s is not None)
+        crop = None
+    scale = min(scale, 1.0) if crop is None else scale
+    scaled = (max(1, round(src_w * scale)), max(1, round(src_h * scale)))
+    return scaled, crop
+
+
+def render_sizes(
+    data: bytes,
+    sizes: List[Tuple[Optional[int], Optional[int]]],
+    fmt: str = "jpeg",
+    quality: int = 80,
+    resample: str = "bicubic",
+    fit: str = "contain",
+    strip_metadata: bool = True,
+) -> List[Dict[str, Any]]:
+    """Decode once and encode one output per requested size.
+
+    Runs inside the image executor, so it only takes and returns picklable values.
+    """
+    from PIL import Image, ImageOps
+
+    pil_format = image_format(fmt)[0]
+    resample_filter = getattr(Image.Resampling, resample.upper())
+
+    img = Image.open(io.BytesIO(data))
+    rotated = img.getexif().get(0x0112) in _ROTATED_ORIENTATIONS
+    src_w, src_h = (img.height, img.width) if rotated else img.size
+
+    targets = [resolve_size(src_w, src_h, w, h, fit) for w, h in (sizes or [(None, None)])]
+    largest_w = max(t[0][0] for t in targets)
+    largest_h = max(t[0][1] for t in targets)
+    if rotated:
+        largest_w, largest_h = largest_h, largest_w
+    if img.format == "JPEG":
+        # Let libjpeg decode at 1/2..1/8 scale when the outputs are small enough.
+        img.draft(None, (int(largest_w * REDUCING_GAP), int(largest_h * REDUCING_GAP)))
+    img = ImageOps.exif_transpose(img)
+
+    if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    elif img.mode == "CMYK":
+        img = img.convert("RGB")
+
+    outputs = []
+    for (scaled, crop) in targets:
+        out_img = img
+        if out_img.size != scaled:
+            out_img = img.resize(scaled, resample_filter, reducing_gap=REDUCING_GAP)
+        if crop is not None:
+            left = (scaled[0] - crop[0]) // 2
+            top = (scaled[1] - crop[1]) // 2
+            out_img = out_img.crop((left, top, left + crop[0], top + crop[1]))
+
+        buf = io.BytesIO()
+        save_kwargs: Dict[str, Any] = {"format": pil_format}
+        if pil_format in ("JPEG", "WEBP") and quality:
+            save_kwargs["quality"] = quality
+        if pil_format == "JPEG":
+            save_kwargs["optimize"] = True
+        # The colour profile is kept either way; it is not identifying metadata.
+        if img.info.get("icc_profile") and pil_format != "GIF":
+            save_kwargs["icc_profile"] = img.info["icc_profile"]
+        if not strip_metadata and pil_format in ("JPEG", "WEBP", "PNG"):
+            exif = img.getexif()
+            if exif:
+                save_kwargs["exif"] = exif.tobytes()
+        out_img.save(buf, **save_kwargs)
+        outputs.append(
+            {"width": out_img.width, "height": out_img.height, "data": buf.getvalue()}
+        )
+    return outputs
+
+
+def safe_archive_name(name: str) -> str:
+    """A relative archive path for an uploaded name: no drive, root or ``..`` parts."""
+    parts = [p for p in name.replace("\\", "/").split("/") if p not in ("", ".", "..")]
+    if parts and len(parts[0]) == 2 and parts[0][1] == ":":
+        parts = parts[1:]
+    return "/".join(parts) or "image"
+
+
+def unique_archive_name(name: str, taken: set) -> str:
+    """``name``, or ``stem-2.ext``, ``stem-3.ext``, ... if already taken; records the result."""
+    candidate = name
+    stem, dot, ext = name.rpartition(".")
+    if not dot or "/" in ext:
+        stem, dot, ext = name, "", ""
+    n = 2
+    while candidate in taken:
+        candidate = f"{stem}-{n}{dot}{ext}"
+        n += 1
+    taken.add(candidate)
+    return candidate
+
+
+def expand_image_uploads(
+    uploads: List[Tuple[bytes, Optional[str]]]
+) -> List[Tuple[bytes, str]]:
+    """Flatten uploaded images and zip archives of images into (data, name) pairs."""
+    images: List[Tuple[bytes, str]] = []
+    inflated = 0
+    for index, (data, name) in enumerate(uploads):
+        if not data.startswith(b"PK\x03\x04"):
+            images.append((data, name or f"image-{index + 1}"))
+            continue
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or Path(info.filename).suffix.lower() not in IMAGE_EXTENSIONS:
+                    continue
+                if info.file_size > MAX_UPLOAD_BYTES:
+                    raise ValueError(f"{info.filename} is too large")
+                # zipfile never inflates past the declared size, so this
+                # bounds the memory a small, highly compressed archive can claim.
+                inflated += info.file_size
+                if inflated > MAX_BATCH_INFLATED_BYTES:
+                    raise ValueError(
+                        f"Archive contents exceed {MAX_BATCH_INFLATED_BYTES // (1024 * 1024)} MB uncompressed"
+                    )
+                images.append((zf.read(info), info.filename))
+                if len(images) > MAX_BATCH_IMAGES:
+                    break
+        if len(images) > MAX_BATCH_IMAGES:
+            break
+    if len(images) > MAX_BATCH_IMAGES:
+        raise ValueError(f"At most {MAX_BATCH_IMAGES} images per batch")
+    return images
+
+
+class DerivativeCache:
+    """Content-addressed on-disk cache of transformed images.
+
+    Keys combine the source digest with the transform spec. Entries are kept
+    in LRU order (persisted through file mtimes) and the oldest are evicted
+    once the total size passes max_bytes. Methods do blocking disk I/O and
+    are meant to be called from worker threads; a lock guards the index.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._size = 0
+        self._lock = threading.RLock()
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            entries = []
+            if self.root.exists():
+                for path in self.root.glob("*/*"):
+                    if path.is_file() and not path.name.endswith(".tmp"):
+                        st = path.stat()
+                        entries.append((st.st_mtime, path.name, st.st_size))
+            entries.sort()
+            self._index = OrderedDict((name, size) for _, name, size in entries)
+            self._size = sum(self._index.values())
+        return self._index
+
+    @staticmethod
+    def make_key(source_digest: str, spec: Dict[str, Any]) -> str:
+        raw = source_digest + json.dumps(spec, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                data = path.read_bytes()
+                os.utime(path)
+            except OSError:
+                self._size -= index.pop(key)
+                self.misses += 1
+                return None
+            index.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            index = self._load_index()
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+
+            self._size -= index.pop(key, 0)
+            index[key] = len(data)
+            self._size += len(data)
+            while self._size > self.max_bytes and index:
+                old_key, old_size = index.popitem(last=False)
+                self._size -= old_size
+                try:
+                    self._path(old_key).unlink()
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._load_index()
+            return {
+                "entries": len(index),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+derivative_cache = DerivativeCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES)
@@ -0,0 +1,397 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..config import JWT_JWKS_DIR, JWT_JWKS_TTL, JWT_KEY_CACHE_SIZE
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed448, ed25519, padding, rsa
+    from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+except ImportError:
+    serialization = None
+
+HMAC_HASHES = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+ASYMMETRIC_ALGORITHMS = [
+    "RS256", "RS384", "RS512", "PS256", "PS384", "PS512", "ES256", "ES384", "ES512", "EdDSA",
+]
+SUPPORTED_ALGORITHMS = list(HMAC_HASHES) + ASYMMETRIC_ALGORITHMS
+# Which JWK key type each algorithm family may be verified with; this is
+# what stops an RS256 public key from being accepted as an HS256 secret.
+ALG_KTY = {"HS": "oct", "RS": "RSA", "PS": "RSA", "ES": "EC", "Ed": "OKP"}
+EC_CURVES = {"ES256": ("secp256r1", 32), "ES384": ("secp384r1", 48), "ES512": ("secp521r1", 66)}
+
+
+class JwtError(ValueError):
+    pass
+
+
+def b64url_decode(segment: str) -> bytes:
+    try:
+        return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+    except (binascii.Error, ValueError):
+        raise JwtError("Invalid base64url segment")
+
+
+def _reject_constant(name: str):
+    raise JwtError(f"Header and payload must be JSON (got {name})")
+
+
+def _finite_float(text: str) -> float:
+    value = float(text)
+    if not math.isfinite(value):  # 1e400 overflows to infinity
+        raise JwtError(f"Number out of range: {text}")
+    return value
+
+
+def _load_segment(segment: str) -> Any:
+    # NaN/Infinity are not JSON and could not be rendered back in a response.
+    return json.loads(b64url_decode(segment), parse_constant=_reject_constant, parse_float=_finite_float)
+
+
+def split_token(token: str) -> Tuple[Dict[str, Any], Dict[str, Any], bytes, bytes]:
+    """Return (header, payload, signing_input, signature) for a compact JWS."""
+    parts = token.strip().split(".")
+    if len(parts) != 3:
+        raise JwtError("Invalid JWT structure - must have 3 parts")
+    try:
+        header = _load_segment(parts[0])
+        payload = _load_segment(parts[1])
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise JwtError("Header and payload must be JSON")
+    if not isinstance(header, dict) or not isinstance(payload, dict):
+        raise JwtError("Header and payload must be JSON objects")
+    return header, payload, f"{parts[0]}.{parts[1]}".encode("ascii"), b64url_decode(parts[2])
+
+
+def _require_cryptography() -> None:
+    if serialization is None:
+        raise JwtError("cryptography not installed; only HS* algorithms are available")
+
+
+def _hash_for(alg: str):
+    return {"256": hashes.SHA256, "384": hashes.SHA384, "512": hashes.SHA512}[alg[-3:]]()
+
+
+def _int(value: str) -> int:
+    return int.from_bytes(b64url_decode(value), "big")
+
+
+class VerificationKey:
+    """A parsed key with verifiers prepared once and reused for every token."""
+
+    def __init__(self, kty: str, key: Any, kid: Optional[str] = None, alg: Optional[str] = None):
+        self.kty = kty
+        self.key = key
+        self.kid = kid
+        self.alg = alg
+        self._verifiers: Dict[str, Callable[[bytes, bytes], bool]] = {}
+
+    def accepts(self, alg: str) -> bool:
+        if self.alg and self.alg != alg:
+            return False
+        if ALG_KTY.get(alg[:2]) != self.kty:
+            return False
+        if self.kty == "EC":
+            return self.key.curve.name == EC_CURVES[alg][0]
+        return True
+
+    def verifier(self, alg: str) -> Callable[[bytes, bytes], bool]:
+        verifier = self._verifiers.get(alg)
+        if verifier is None:
+            verifier = self._verifiers[alg] = self._build(alg)
+        return verifier
+
+    def _build(self, alg: str) -> Callable[[bytes, bytes], bool]:
+        if self.kty == "oct":
+            prepared = hmac.new(self.key, digestmod=HMAC_HASHES[alg])
+
+            def verify_hmac(message: bytes, signature: bytes) -> bool:
+                mac = prepared.copy()
+                mac.update(message)
+                return hmac.compare_digest(mac.digest(), signature)
+
+            return verify_hmac
+
+        key = self.key
+        if alg.startswith("RS"):
+            scheme = padding.PKCS1v15()
+            digest = _hash_for(alg)
+
+            def check(message: bytes, signature: bytes) -> None:
+                key.verify(signature, message, scheme, digest)
+
+        elif alg.startswith("PS"):
+            digest = _hash_for(alg)
+            scheme = padding.PSS(mgf=padding.MGF1(digest), salt_length=digest.digest_size)
+
+            def check(message: bytes, signature: bytes) -> None:
+                key.verify(signature, message, scheme, digest)
+
+        elif alg.startswith("ES"):
+            size = EC_CURVES[alg][1]
+            algorithm = ec.ECDSA(_hash_for(alg))
+
+            def check(message: bytes, signature: bytes) -> None:
+                # JWS carries raw r||s; cryptography wants DER.
+                if len(signature) != 2 * size:
+                    raise InvalidSignature()
+                r = int.from_bytes(signature[:size], "big")
+                s = int.from_bytes(signature[size:], "big")
+                key.verify(encode_dss_signature(r, s), message, algorithm)
+
+        else:
+
+            def check(message: bytes, signature: bytes) -> None:
+                key.verify(signature, message)
+
+        def verify_asymmetric(message: bytes, signature: bytes) -> bool:
+            try:
+                check(message, signature)
+            except InvalidSignature:
+                return False
+            return True
+
+        return verify_asymmetric
+
+
+@lru_cache(maxsize=JWT_KEY_CACHE_SIZE)
+def key_from_secret(secret: bytes, kid: Optional[str] = None) -> VerificationKey:
+    return VerificationKey("oct", secret, kid)
+
+
+@lru_cache(maxsize=JWT_KEY_CACHE_SIZE)
+def key_from_pem(pem: str, kid: Optional[str] = None) -> VerificationKey:
+    """Public key or X.509 certificate in PEM form."""
+    _require_cryptography()
+    data = pem.strip().encode("ascii")
+    try:
+        if b"BEGIN CERTIFICATE" in data:
+            from cryptography import x509
+
+            key = x509.load_pem_x509_certificate(data).public_key()
+        else:
+            key = serialization.load_pem_public_key(data)
+    except ValueError as e:
+        raise JwtError(f"Invalid PEM key: {e}")
+    if isinstance(key, rsa.RSAPublicKey):
+        kty = "RSA"
+    elif isinstance(key, ec.EllipticCurvePublicKey):
+        kty = "EC"
+    elif isinstance(key, (ed25519.Ed25519PublicKey, ed448.Ed448PublicKey)):
+        kty = "OKP"
+    else:
+        raise JwtError("Unsupported PEM key type")
+    return VerificationKey(kty, key, kid)
+
+
+def key_from_jwk(jwk: Dict[str, Any]) -> VerificationKey:
+    kty = jwk.get("kty")
+    kid, alg = jwk.get("kid"), jwk.get("alg")
+    if not all(v is None or isinstance(v, str) for v in (kty, kid, alg)):
+        raise JwtError("Invalid JWK: kty, kid and alg must be strings")
+    try:
+        if kty == "oct":
+            return VerificationKey("oct", b64url_decode(jwk["k"]), kid, alg)
+        _require_cryptography()
+        if kty == "RSA":
+            key = rsa.RSAPublicNumbers(_int(jwk["e"]), _int(jwk["n"])).public_key()
+        elif kty == "EC":
+            curve = {"P-256": ec.SECP256R1, "P-384": ec.SECP384R1, "P-521": ec.SECP521R1}[jwk["crv"]]()
+            key = ec.EllipticCurvePublicNumbers(_int(jwk["x"]), _int(jwk["y"]), curve).public_key()
+        elif kty == "OKP":
+            loader = {"Ed25519": ed25519.Ed25519PublicKey, "Ed448": ed448.Ed448PublicKey}[jwk["crv"]]
+            key = loader.from_public_bytes(b64url_decode(jwk["x"]))
+        else:
+            raise JwtError(f"Unsupported JWK kty: {kty}")
+    except KeyError as e:
+        raise JwtError(f"JWK is missing or has an unsupported {e}")
+    except (TypeError, ValueError) as e:
+        raise JwtError(f"Invalid JWK: {e}")
+    return VerificationKey(kty, key, kid, alg)
+
+
+class KeySet:
+    """Keys indexed by kid; keys without a kid are tried in order."""
+
+    def __init__(self, keys: Iterable[VerificationKey] = ()):
+        self.by_kid: Dict[str, VerificationKey] = {}
+        self.unnamed: List[VerificationKey] = []
+        for key in keys:
+            if key.kid:
+                self.by_kid[key.kid] = key
+            else:
+                self.unnamed.append(key)
+
+    def __len__(self) -> int:
+        return len(self.by_kid) + len(self.unnamed)
+
+    def candidates(self, kid: Optional[str], alg: str) -> List[VerificationKey]:
+        if kid is not None and kid in self.by_kid:
+            keys = [self.by_kid[kid]]
+        elif kid is not None:
+            keys = list(self.unnamed)
+        else:
+            keys = self.unnamed + list(self.by_kid.values())
+        return [k for k in keys if k.accepts(alg)]
+
+
+def parse_jwks(document: Dict[str, Any]) -> KeySet:
+    if not isinstance(document, dict) or not isinstance(document.get("keys"), list):
+        raise JwtError("JWKS must be an object with a 'keys' array")
+    keys = []
+    for jwk in document["keys"]:
+        if not isinstance(jwk, dict) or jwk.get("use", "sig") != "sig":
+            continue
+        keys.append(key_from_jwk(jwk))
+    return KeySet(keys)
+
+
+class JwksCache:
+    """Parsed key sets with TTL refresh.
+
+    Posted documents are keyed by a hash of their canonical JSON, so the same
+    JWKS sent with every request is parsed once per TTL. Files are read from
+    JWT_JWKS_DIR only and re-read when the TTL lapses or the file changes.
+    """
+
+    def __init__(self, ttl: float = JWT_JWKS_TTL, max_entries: int = JWT_KEY_CACHE_SIZE, directory: Path = JWT_JWKS_DIR):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.directory = Path(directory)
+        self._entries: "OrderedDict[str, Tuple[float, Any, KeySet]]" = OrderedDict()
+
+    def _get(self, key: str, version: Any) -> Optional[KeySet]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic() or entry[1] != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def _put(self, key: str, version: Any, keys: KeySet) -> KeySet:
+        self._entries[key] = (time.monotonic() + self.ttl, version, keys)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return keys
+
+    def from_document(self, document: Dict[str, Any]) -> KeySet:
+        canonical = json.dumps(document, sort_keys=True, separators=(",", ":"))
+        key = "doc:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return self._get(key, None) or self._put(key, None, parse_jwks(document))
+
+    def from_file(self, name: str) -> KeySet:
+        if not name or os.path.basename(name) != name or name.startswith("."):
+            raise JwtError("jwks_file must be a file name inside the JWKS directory")
+        path = self.directory / name
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            raise JwtError(f"JWKS file not found: {name}")
+        key = "file:" + name
+        cached = self._get(key, mtime)
+        if cached is not None:
+            return cached
+        try:
+            document = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            raise JwtError(f"Could not read JWKS file: {e}")
+        return self._put(key, mtime, parse_jwks(document))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+jwks_cache = JwksCache()
+
+
+def check_claims(
+    payload: Dict[str, Any],
+    now: float,
+    leeway: float = 0,
+    audience: Optional[str] = None,
+    issuer: Optional[str] = None,
+    require: Iterable[str] = (),
+) -> List[str]:
+    """Registered-claim problems for one payload (RFC 7519 4.1); empty if fine."""
+    errors = [f"Missing required claim: {claim}" for claim in require if claim not in payload]
+    for claim in ("exp", "nbf", "iat"):
+        if claim in payload and (isinstance(payload[claim], bool) or not isinstance(payload[claim], (int, float))):
+            errors.append(f"Claim '{claim}' must be a number")
+    if not errors:
+        if "exp" in payload and now >= payload["exp"] + leeway:
+            errors.append("Token has expired")
+        if "nbf" in payload and now < payload["nbf"] - leeway:
+            errors.append("Token is not yet valid (nbf)")
+        if "iat" in payload and payload["iat"] > now + leeway:
+            errors.append("Token was issued in the future (iat)")
+    if audience is not None:
+        aud = payload.get("aud")
+        audiences = aud if isinstance(aud, list) else [aud]
+        if audience not in audiences:
+            errors.append("Audience does not match")
+    if issuer is not None and payload.get("iss") != issuer:
+        errors.append("Issuer does not match")
+    return errors
+
+
+def verify_token(
+    token: str,
+    keys: KeySet,
+    algorithms: Optional[Iterable[str]] = None,
+    now: Optional[float] = None,
+    **claim_options: Any,
+) -> Dict[str, Any]:
+    """Verify one token's signature and claims; never raises for bad tokens."""
+    now = time.time() if now is None else now
+    try:
+        header, payload, signing_input, signature = split_token(token)
+    except JwtError as e:
+        return {"valid": False, "signature_valid": False, "errors": [str(e)]}
+
+    kid = header.get("kid")
+    result: Dict[str, Any] = {"header": header, "payload": payload, "kid": kid}
+    alg = header.get("alg")
+    allowed = list(algorithms) if algorithms else SUPPORTED_ALGORITHMS
+    errors: List[str] = []
+    signature_valid = False
+    if alg not in SUPPORTED_ALGORITHMS:
+        errors.append(f"Unsupported algorithm: {alg}")
+    elif alg not in allowed:
+        errors.append(f"Algorithm {alg} is not allowed")
+    elif kid is not None and not isinstance(kid, str):
+        errors.append("Invalid kid: must be a string")
+    else:
+        candidates = keys.candidates(kid, alg)
+        if not candidates:
+            errors.append("No matching key for kid/alg")
+        for key in candidates:
+            if key.verifier(alg)(signing_input, signature):
+                signature_valid = True
+                break
+        if candidates and not signature_valid:
+            errors.append("Signature verification failed")
+
+    errors.extend(check_claims(payload, now, **claim_options))
+    result.update({"valid": signature_valid and not errors, "signature_valid": signature_valid, "errors": errors})
+    return result
+
+
+def verify_tokens(tokens: List[str], keys: KeySet, **options: Any) -> Dict[str, Any]:
+    now = time.time()
+    results = [verify_token(t, keys, now=now, **options) for t in tokens]
+    valid = sum(1 for r in results if r["valid"])
+    return {
+        "summary": {"total": len(results), "valid": valid, "invalid": len(results) - valid},
+        "results": results,
+    }
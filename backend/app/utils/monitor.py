@@ -0,0 +1,185 @@
+import asyncio
+import heapq
+import itertools
+import random
+import secrets
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from ..config import (
+    MONITOR_CONCURRENCY,
+    MONITOR_HISTORY_SIZE,
+    MONITOR_JITTER,
+)
+from .http_client import ping_once, percentile
+
+
+class MonitorTarget:
+    def __init__(self, url: str, interval: float, method: str, timeout: float):
+        self.id = secrets.token_hex(6)
+        self.url = url
+        self.interval = interval
+        self.method = method
+        self.timeout = timeout
+        self.created_at = time.time()
+        # (checked_at, up, status_code, elapsed_ms, error)
+        self.results: deque = deque(maxlen=MONITOR_HISTORY_SIZE)
+        self.running = False
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "url": self.url,
+            "interval": self.interval,
+            "method": self.method,
+            "timeout": self.timeout,
+            "created_at": self.created_at,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        results = list(self.results)
+        up = [r for r in results if r[1]]
+        latencies = sorted(r[3] for r in up)
+
+        consecutive_failures = 0
+        for r in reversed(results):
+            if r[1]:
+                break
+            consecutive_failures += 1
+
+        def pct(p):
+            value = percentile(latencies, p)
+            return round(value, 2) if value is not None else None
+
+        return {
+            "checks": len(results),
+            "availability": round(len(up) / len(results) * 100, 2) if results else None,
+            "latency_ms": {
+                "min": latencies[0] if latencies else None,
+                "p50": pct(50),
+                "p95": pct(95),
+                "p99": pct(99),
+                "max": latencies[-1] if latencies else None,
+            },
+            "last_checked_at": results[-1][0] if results else None,
+            "last_status": results[-1][2] if results else None,
+            "is_up": results[-1][1] if results else None,
+            "consecutive_failures": consecutive_failures,
+        }
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        items = list(self.results)[-limit:] if limit > 0 else []
+        return [
+            {
+                "checked_at": checked_at,
+                "up": up,
+                "status_code": status_code,
+                "elapsed_ms": elapsed_ms,
+                "error": error,
+            }
+            for checked_at, up, status_code, elapsed_ms, error in items
+        ]
+
+
+class UptimeMonitor:
+    """Runs checks for all targets from a single scheduler task.
+
+    Due times live in a heap so one loop serves any number of targets; a
+    semaphore bounds how many checks are in flight at once.
+    """
+
+    def __init__(self, concurrency: int = MONITOR_CONCURRENCY, jitter: float = MONITOR_JITTER):
+        self.targets: Dict[str, MonitorTarget] = {}
+        self.jitter = jitter
+        self._concurrency = concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._checks: set = set()
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def _schedule(self, target: MonitorTarget, delay: float) -> None:
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), target.id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _next_delay(self, target: MonitorTarget) -> float:
+        spread = target.interval * self.jitter
+        return max(0.0, target.interval + random.uniform(-spread, spread))
+
+    def add(self, url: str, interval: float, method: str = "GET", timeout: float = 10.0) -> MonitorTarget:
+        target = MonitorTarget(url, interval, method, timeout)
+        self.targets[target.id] = target
+        self._ensure_started()
+        # Spread the first checks out so a bulk registration does not stampede.
+        self._schedule(target, random.uniform(0, min(interval, 1.0)))
+        return target
+
+    def remove(self, target_id: str) -> bool:
+        # Heap entries for removed targets are skipped lazily by the scheduler.
+        return self.targets.pop(target_id, None) is not None
+
+    async def _check(self, target: MonitorTarget) -> None:
+        async with self._semaphore:
+            try:
+                result = await ping_once(target.url, target.method, target.timeout)
+            except Exception as e:
+                result = {"ok": False, "elapsed_ms": None, "error": str(e)}
+        status_code = result.get("status_code")
+        up = result["ok"] and status_code < 400
+        target.results.append(
+            (time.time(), up, status_code, result["elapsed_ms"], result.get("error"))
+        )
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            due, _, target_id = self._heap[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            target = self.targets.get(target_id)
+            if target is None:
+                continue
+            # A slow check must not overlap with its own next run.
+            if not target.running:
+                target.running = True
+                task = asyncio.create_task(self._check(target))
+                self._checks.add(task)
+                task.add_done_callback(lambda t, target=target: self._finish(t, target))
+            self._schedule(target, self._next_delay(target))
+
+    def _finish(self, task: asyncio.Task, target: MonitorTarget) -> None:
+        self._checks.discard(task)
+        target.running = False
+
+    async def stop(self) -> None:
+        tasks = list(self._checks)
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._checks.clear()
+
+
+monitor = UptimeMonitor()
@@ -0,0 +1,96 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import time
+import urllib.parse
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from ..config import OTP_KEY_CACHE_SIZE
+
+OTP_ALGORITHMS = {
+    "sha1": hashlib.sha1,
+    "sha256": hashlib.sha256,
+    "sha512": hashlib.sha512,
+}
+
+
+def normalize_secret(secret: str) -> str:
+    return secret.replace(" ", "").replace("-", "").upper().rstrip("=")
+
+
+@lru_cache(maxsize=OTP_KEY_CACHE_SIZE)
+def _prepared_hmac(secret: str, algorithm: str) -> "hmac.HMAC":
+    """HMAC keyed with the decoded secret; callers copy() it per code.
+
+    Both the base32 decode and the HMAC key setup (inner/outer pads) happen
+    once per (secret, algorithm) pair.
+    """
+    try:
+        key = base64.b32decode(secret + "=" * ((8 - len(secret) % 8) % 8))
+    except (binascii.Error, ValueError):
+        raise ValueError("Secret is not valid base32")
+    return hmac.new(key, digestmod=OTP_ALGORITHMS[algorithm])
+
+
+def prepare(secret: str, algorithm: str = "sha1") -> "hmac.HMAC":
+    algorithm = algorithm.lower()
+    if algorithm not in OTP_ALGORITHMS:
+        raise ValueError(f"Unsupported algorithm. Available: {', '.join(OTP_ALGORITHMS)}")
+    return _prepared_hmac(normalize_secret(secret), algorithm)
+
+
+def hotp(prepared: "hmac.HMAC", counter: int, digits: int = 6) -> str:
+    mac = prepared.copy()
+    mac.update(counter.to_bytes(8, "big"))
+    digest = mac.digest()
+    offset = digest[-1] & 0x0F
+    code = int.from_bytes(digest[offset:offset + 4], "big") & 0x7FFFFFFF
+    return str(code % (10**digits)).zfill(digits)
+
+
+def time_counter(period: int, for_time: Optional[float] = None) -> int:
+    return int(time.time() if for_time is None else for_time) // period
+
+
+def verify(
+    prepared: "hmac.HMAC", code: str, counter: int, digits: int = 6, window: int = 1
+) -> Optional[int]:
+    """Return the matching offset from ``counter`` within +/-window, or None.
+
+    Every candidate in the window is computed and compared in constant time,
+    so timing does not reveal which step matched.
+    """
+    code = code.strip()
+    matched = None
+    for offset in range(-window, window + 1):
+        if counter + offset < 0:
+            continue
+        if hmac.compare_digest(hotp(prepared, counter + offset, digits), code) and matched is None:
+            matched = offset
+    return matched
+
+
+def codes_for_range(prepared: "hmac.HMAC", start_counter: int, count: int, digits: int = 6) -> List[str]:
+    return [hotp(prepared, c, digits) for c in range(start_counter, start_counter + count)]
+
+
+def provisioning_uri(
+    secret: str,
+    otp_type: str = "totp",
+    label: str = "UtilityTools:user",
+    issuer: str = "UtilityTools",
+    digits: int = 6,
+    period: int = 30,
+    algorithm: str = "sha1",
+    counter: int = 0,
+) -> str:
+    params: Dict[str, object] = {"secret": secret, "issuer": issuer, "digits": digits}
+    if otp_type == "totp":
+        params["period"] = period
+    else:
+        params["counter"] = counter
+    if algorithm != "sha1":
+        params["algorithm"] = algorithm.upper()
+    return f"otpauth://{otp_type}/{urllib.parse.quote(label, safe=':@')}?{urllib.parse.urlencode(params)}"
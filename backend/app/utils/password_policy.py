@@ -0,0 +1,217 @@
+import hashlib
+import json
+import string
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..config import MAX_REGISTERED_POLICIES
+
+UPPER = frozenset(string.ascii_uppercase)
+LOWER = frozenset(string.ascii_lowercase)
+DIGITS = frozenset(string.digits)
+SYMBOLS = frozenset("!@#$%^&*()_+-=[]{}|;':\",./<>?")
+
+
+class AhoCorasick:
+    """Case-insensitive multi-word matcher; one transition per input character."""
+
+    def __init__(self, words: Iterable[str]):
+        self.words: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        outputs: List[List[int]] = [[]]
+
+        for word in words:
+            key = word.lower()
+            if not key:
+                continue
+            state = 0
+            for ch in key:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(len(self.words))
+            self.words.append(word)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                outputs[nxt].extend(outputs[self._fail[nxt]])
+        self._out = [tuple(o) for o in outputs]
+
+    def step(self, state: int, ch: str) -> int:
+        goto, fail = self._goto, self._fail
+        while state and ch not in goto[state]:
+            state = fail[state]
+        return goto[state].get(ch, 0)
+
+    def outputs(self, state: int) -> Tuple[int, ...]:
+        return self._out[state]
+
+    def find(self, text: str) -> List[str]:
+        found: Dict[int, None] = {}
+        state = 0
+        for ch in text.lower():
+            state = self.step(state, ch)
+            for index in self._out[state]:
+                found[index] = None
+        return [self.words[i] for i in found]
+
+
+class PasswordPolicy:
+    """A password policy compiled once and then checked in one pass per password."""
+
+    def __init__(
+        self,
+        min_length: int = 8,
+        require_uppercase: bool = True,
+        require_lowercase: bool = True,
+        require_numbers: bool = True,
+        require_symbols: bool = False,
+        max_repeated: int = 3,
+        banned_words: Optional[Iterable[str]] = None,
+    ):
+        self.min_length = min_length
+        self.require_uppercase = require_uppercase
+        self.require_lowercase = require_lowercase
+        self.require_numbers = require_numbers
+        self.require_symbols = require_symbols
+        self.max_repeated = max_repeated
+        self.banned_words = tuple(dict.fromkeys(w for w in (banned_words or ()) if w))
+        self.automaton = AhoCorasick(self.banned_words) if self.banned_words else None
+
+    def settings(self) -> Dict[str, Any]:
+        return {
+            "min_length": self.min_length,
+            "require_uppercase": self.require_uppercase,
+            "require_lowercase": self.require_lowercase,
+            "require_numbers": self.require_numbers,
+            "require_symbols": self.require_symbols,
+            "max_repeated": self.max_repeated,
+            "banned_words": list(self.banned_words),
+        }
+
+    @property
+    def policy_id(self) -> str:
+        canonical = json.dumps(self.settings(), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+    def check(self, pwd: str) -> Tuple[List[str], List[str]]:
+        """Return (violations, passed) with the same wording as /password/policy."""
+        has_upper = has_lower = has_digit = has_symbol = False
+        run, longest_run, prev = 0, 0, None
+        automaton = self.automaton
+        state = 0
+        banned: Dict[int, None] = {}
+
+        for ch in pwd:
+            if ch in LOWER:
+                has_lower = True
+            elif ch in UPPER:
+                has_upper = True
+            elif ch in DIGITS:
+                has_digit = True
+            elif ch in SYMBOLS:
+                has_symbol = True
+            run = run + 1 if ch == prev else 1
+            if run > longest_run:
+                longest_run = run
+            prev = ch
+            if automaton is not None:
+                state = automaton.step(state, ch.lower())
+                for index in automaton.outputs(state):
+                    banned[index] = None
+
+        violations, passed = [], []
+        if len(pwd) >= self.min_length:
+            passed.append(f"Length >= {self.min_length}")
+        else:
+            violations.append(f"Must be at least {self.min_length} characters")
+
+        for required, present, ok, missing in (
+            (self.require_uppercase, has_upper, "Contains uppercase", "Must contain uppercase letter"),
+            (self.require_lowercase, has_lower, "Contains lowercase", "Must contain lowercase letter"),
+            (self.require_numbers, has_digit, "Contains numbers", "Must contain number"),
+            (self.require_symbols, has_symbol, "Contains symbols", "Must contain special character"),
+        ):
+            if required:
+                (passed if present else violations).append(ok if present else missing)
+
+        # Same threshold as the old (.)\1{max_repeated,} regex.
+        if longest_run > self.max_repeated:
+            violations.append("Too many repeated characters")
+        else:
+            passed.append("No excessive repetition")
+
+        for index in sorted(banned):
+            violations.append(f"Contains banned word: {self.banned_words[index]}")
+        return violations, passed
+
+
+@lru_cache(maxsize=256)
+def _compile(
+    min_length: int,
+    require_uppercase: bool,
+    require_lowercase: bool,
+    require_numbers: bool,
+    require_symbols: bool,
+    max_repeated: int,
+    banned_words: Tuple[str, ...],
+) -> PasswordPolicy:
+    return PasswordPolicy(
+        min_length,
+        require_uppercase,
+        require_lowercase,
+        require_numbers,
+        require_symbols,
+        max_repeated,
+        banned_words,
+    )
+
+
+def compile_policy(settings: Dict[str, Any]) -> PasswordPolicy:
+    """Return a cached compiled policy for the given settings."""
+    return _compile(
+        settings.get("min_length", 8),
+        settings.get("require_uppercase", True),
+        settings.get("require_lowercase", True),
+        settings.get("require_numbers", True),
+        settings.get("require_symbols", False),
+        settings.get("max_repeated", 3),
+        tuple(settings.get("banned_words") or ()),
+    )
+
+
+class PolicyRegistry:
+    """Registered policies keyed by a content-derived id, oldest evicted first."""
+
+    def __init__(self, max_policies: int = MAX_REGISTERED_POLICIES):
+        self.max_policies = max_policies
+        self._policies: "OrderedDict[str, PasswordPolicy]" = OrderedDict()
+
+    def register(self, settings: Dict[str, Any]) -> PasswordPolicy:
+        policy = PasswordPolicy(**settings)
+        self._policies[policy.policy_id] = policy
+        self._policies.move_to_end(policy.policy_id)
+        while len(self._policies) > self.max_policies:
+            self._policies.popitem(last=False)
+        return policy
+
+    def get(self, policy_id: str) -> Optional[PasswordPolicy]:
+        return self._policies.get(policy_id)
+
+
+policy_registry = PolicyRegistry()
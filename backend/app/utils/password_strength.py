@@ -0,0 +1,474 @@
+"""Password strength estimation.
+
+A compact take on zxcvbn: the password is matched against ranked
+dictionaries (with l33t and reversed variants), keyboard walks, character
+sequences, repeats and dates, and the cheapest way to cover it with those
+matches - or brute force for the gaps - gives the guess estimate. All guess
+arithmetic is done in log10 so long inputs never build huge integers.
+
+An optional Bloom filter of breached passwords can be built with
+``python -m app.utils.password_strength build <wordlist> <output>`` and is
+mmapped from PASSWORD_BLOOM_PATH on first use.
+"""
+
+import hashlib
+import math
+import mmap
+import re
+import struct
+import sys
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..config import PASSWORD_BLOOM_PATH, PASSWORD_STRENGTH_MAX_LENGTH
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+DICTIONARY_FILES = {
+    "passwords": "common_passwords.txt",
+    "english": "english_words.txt",
+}
+
+GUESSES_PER_SECOND = 10_000_000_000
+REFERENCE_YEAR = date.today().year
+MIN_YEAR_SPACE = 20
+
+RE_LOWER = re.compile(r"[a-z]")
+RE_UPPER = re.compile(r"[A-Z]")
+RE_DIGIT = re.compile(r"\d")
+RE_SYMBOL = re.compile(r"[!@#$%^&*()_+\-=\[\]{}|;':\",./<>?]")
+RE_REPEAT_GREEDY = re.compile(r"(.+)\1+")
+RE_REPEAT_LAZY = re.compile(r"(.+?)\1+")
+RE_DATE_DMY = re.compile(r"(?<!\d)(\d{1,2})([-/. ]?)(\d{1,2})\2(\d{4}|\d{2})(?!\d)")
+RE_DATE_YMD = re.compile(r"(?<!\d)(\d{4})([-/. ]?)(\d{1,2})\2(\d{1,2})(?!\d)")
+RE_YEAR = re.compile(r"(?<!\d)(19\d\d|20\d\d)(?!\d)")
+
+L33T_TABLE = {
+    "4": "a", "@": "a", "8": "b", "(": "c", "{": "c", "[": "c", "<": "c",
+    "3": "e", "6": "g", "9": "g", "1": "i", "!": "i", "|": "l", "0": "o",
+    "$": "s", "5": "s", "7": "t", "+": "t", "%": "x", "2": "z",
+}
+# "1" and "|" are also commonly used for "l".
+L33T_ALTERNATES = {"1": "l", "|": "i"}
+
+QWERTY_ROWS = (
+    ("`~", "1!", "2@", "3#", "4$", "5%", "6^", "7&", "8*", "9(", "0)", "-_", "=+"),
+    ("qQ", "wW", "eE", "rR", "tT", "yY", "uU", "iI", "oO", "pP", "[{", "]}", "\\|"),
+    ("aA", "sS", "dD", "fF", "gG", "hH", "jJ", "kK", "lL", ";:", "'\""),
+    ("zZ", "xX", "cC", "vV", "bB", "nN", "mM", ",<", ".>", "/?"),
+)
+QWERTY_OFFSETS = (0.0, 1.5, 1.75, 2.25)
+KEYPAD_ROWS = (("7", "8", "9", "/"), ("4", "5", "6", "*"), ("1", "2", "3", "-"), ("0", ".", "+"))
+
+
+def _build_graph(rows, offsets, diagonal_reach: float) -> Dict[str, frozenset]:
+    positions = {}
+    for r, row in enumerate(rows):
+        for c, key in enumerate(row):
+            for ch in key:
+                positions[ch] = (r, c + offsets[r])
+    graph = {}
+    for ch, (r, x) in positions.items():
+        graph[ch] = frozenset(
+            other
+            for other, (r2, x2) in positions.items()
+            if (r2 == r and abs(x2 - x) == 1) or (abs(r2 - r) == 1 and abs(x2 - x) <= diagonal_reach)
+        )
+    return graph
+
+
+KEYBOARD_GRAPHS = {
+    "qwerty": _build_graph(QWERTY_ROWS, QWERTY_OFFSETS, 0.75),
+    "keypad": _build_graph(KEYPAD_ROWS, (0, 0, 0, 0), 1.0),
+}
+_GRAPH_STATS = {
+    # (starting positions, average degree) over unshifted keys
+    name: (
+        len({k for k in graph if not k.isupper()}),
+        sum(len(v) for v in graph.values()) / max(len(graph), 1) / (2 if name == "qwerty" else 1),
+    )
+    for name, graph in KEYBOARD_GRAPHS.items()
+}
+
+
+@lru_cache(maxsize=1)
+def load_dictionaries() -> Dict[str, Dict[str, int]]:
+    """Ranked word lists (rank 1 = most common), read once per process."""
+    dictionaries = {}
+    for name, filename in DICTIONARY_FILES.items():
+        ranks: Dict[str, int] = {}
+        with open(DATA_DIR / filename, encoding="utf-8") as f:
+            for rank, line in enumerate(f, 1):
+                word = line.strip().lower()
+                if word and word not in ranks:
+                    ranks[word] = rank
+        dictionaries[name] = ranks
+    return dictionaries
+
+
+@lru_cache(maxsize=1)
+def _max_word_length() -> int:
+    return max(len(w) for ranks in load_dictionaries().values() for w in ranks)
+
+
+class BloomFilter:
+    """Read-only Bloom filter over an mmapped file.
+
+    Layout: b"UTBLOOM1", uint64 bit count, uint32 hash count, then the bit
+    array. Indexes use double hashing over a 128-bit BLAKE2b digest.
+    """
+
+    MAGIC = b"UTBLOOM1"
+    HEADER = struct.Struct(">8sQI")
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.bits, self.hashes = self.HEADER.unpack_from(self._mm, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"{path} is not a Bloom filter file")
+
+    @staticmethod
+    def _indexes(value: str, bits: int, hashes: int) -> Iterable[int]:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % bits for i in range(hashes))
+
+    def __contains__(self, value: str) -> bool:
+        base = self.HEADER.size
+        mm = self._mm
+        return all(mm[base + (i >> 3)] & (1 << (i & 7)) for i in self._indexes(value, self.bits, self.hashes))
+
+    @classmethod
+    def build(cls, words: Iterable[str], path: str, error_rate: float = 0.001) -> Tuple[int, int, int]:
+        items = [w.strip() for w in words if w.strip()]
+        n = max(len(items), 1)
+        bits = max(8, int(-n * math.log(error_rate) / (math.log(2) ** 2)))
+        hashes = max(1, round(bits / n * math.log(2)))
+        array = bytearray((bits + 7) // 8)
+        for word in items:
+            for i in cls._indexes(word, bits, hashes):
+                array[i >> 3] |= 1 << (i & 7)
+        with open(path, "wb") as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, bits, hashes))
+            f.write(array)
+        return len(items), bits, hashes
+
+
+@lru_cache(maxsize=1)
+def load_breach_filter() -> Optional[BloomFilter]:
+    if not PASSWORD_BLOOM_PATH:
+        return None
+    try:
+        return BloomFilter(PASSWORD_BLOOM_PATH)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def character_classes(password: str) -> Dict[str, bool]:
+    return {
+        "has_lowercase": bool(RE_LOWER.search(password)),
+        "has_uppercase": bool(RE_UPPER.search(password)),
+        "has_numbers": bool(RE_DIGIT.search(password)),
+        "has_symbols": bool(RE_SYMBOL.search(password)),
+    }
+
+
+def charset_size(classes: Dict[str, bool]) -> int:
+    return (
+        (26 if classes["has_lowercase"] else 0)
+        + (26 if classes["has_uppercase"] else 0)
+        + (10 if classes["has_numbers"] else 0)
+        + (32 if classes["has_symbols"] else 0)
+    )
+
+
+def entropy_bits(size: int, length: int) -> float:
+    return round(length * math.log2(size), 2) if size > 1 and length else 0.0
+
+
+def _match(pattern: str, i: int, j: int, token: str, log10_guesses: float, **extra) -> Dict[str, Any]:
+    return {"pattern": pattern, "i": i, "j": j, "token": token, "guesses_log10": log10_guesses, **extra}
+
+
+def _uppercase_log10(token: str) -> float:
+    upper = sum(1 for c in token if c.isupper())
+    if not upper or token.islower():
+        return 0.0
+    lower = sum(1 for c in token if c.islower())
+    if not lower or (upper == 1 and (token[0].isupper() or token[-1].isupper())):
+        return math.log10(2)
+    k = min(upper, lower)
+    return math.log10(sum(math.comb(upper + lower, i) for i in range(1, k + 1)))
+
+
+def _dictionary_matches(password: str) -> List[Dict[str, Any]]:
+    dictionaries = load_dictionaries()
+    lower = password.lower()
+    n = len(password)
+    longest = _max_word_length()
+    matches = []
+
+    def scan(text: str, kind: str, extra_log10: float, mapper=None):
+        for i in range(n):
+            for j in range(i + 2, min(n, i + longest)):
+                word = text[i:j + 1]
+                for name, ranks in dictionaries.items():
+                    rank = ranks.get(word)
+                    if rank is None:
+                        continue
+                    a, b = (n - 1 - j, n - 1 - i) if mapper == "reverse" else (i, j)
+                    token = password[a:b + 1]
+                    log10 = math.log10(rank) + _uppercase_log10(token) + extra_log10
+                    matches.append(
+                        _match("dictionary", a, b, token, log10, dictionary=name, matched_word=word, variant=kind)
+                    )
+
+    scan(lower, "plain", 0.0)
+    scan(lower[::-1], "reversed", math.log10(2), "reverse")
+
+    if any(c in L33T_TABLE for c in lower):
+        variants = {lower.translate(str.maketrans(L33T_TABLE))}
+        variants.add(lower.translate(str.maketrans({**L33T_TABLE, **L33T_ALTERNATES})))
+        for variant in variants - {lower}:
+            subs = sum(1 for a, b in zip(lower, variant) if a != b)
+            before = len(matches)
+            scan(variant, "l33t", subs * math.log10(2))
+            # Only keep l33t hits that actually cover a substituted character.
+            matches[before:] = [
+                m for m in matches[before:] if lower[m["i"]:m["j"] + 1] != m["matched_word"]
+            ]
+    return matches
+
+
+def _spatial_matches(password: str) -> List[Dict[str, Any]]:
+    matches = []
+    n = len(password)
+    for name, graph in KEYBOARD_GRAPHS.items():
+        starts, degree = _GRAPH_STATS[name]
+        i = 0
+        while i < n - 1:
+            j = i
+            turns = 0
+            direction = None
+            while j + 1 < n and password[j + 1] in graph.get(password[j], ()):
+                step = (password[j], password[j + 1])
+                if direction is not None and step != direction:
+                    turns += 1
+                direction = step
+                j += 1
+            if j - i >= 2:
+                token = password[i:j + 1]
+                length = len(token)
+                shifted = sum(1 for c in token if c.isupper() or c in "~!@#$%^&*()_+{}|:\"<>?")
+                log10 = math.log10(starts) + (length - 1) * math.log10(max(degree, 1.0))
+                log10 += math.log10(1 + turns) + (math.log10(2) if shifted else 0.0)
+                matches.append(_match("spatial", i, j, token, log10, graph=name, turns=turns))
+                i = j
+            else:
+                i += 1
+    return matches
+
+
+def _sequence_matches(password: str) -> List[Dict[str, Any]]:
+    matches = []
+    n = len(password)
+    i = 0
+    while i < n - 2:
+        delta = ord(password[i + 1]) - ord(password[i])
+        if abs(delta) not in (1, 2):
+            i += 1
+            continue
+        j = i + 1
+        while j + 1 < n and ord(password[j + 1]) - ord(password[j]) == delta:
+            j += 1
+        if j - i >= 2:
+            token = password[i:j + 1]
+            first = token[0]
+            if first in "aAzZ019":
+                base = 4
+            elif first.isdigit():
+                base = 10
+            elif first.isalpha():
+                base = 26 if first.islower() else 52
+            else:
+                base = 95
+            log10 = math.log10(base * len(token) * (1 if delta > 0 else 2))
+            matches.append(_match("sequence", i, j, token, log10, ascending=delta > 0))
+            i = j
+        else:
+            i += 1
+    return matches
+
+
+def _repeat_matches(password: str, size: int) -> List[Dict[str, Any]]:
+    matches = []
+    pos = 0
+    while pos < len(password):
+        greedy = RE_REPEAT_GREEDY.search(password, pos)
+        if not greedy:
+            break
+        lazy = RE_REPEAT_LAZY.search(password, pos)
+        if len(greedy.group(0)) > len(lazy.group(0)):
+            found = greedy
+            # The shortest unit that repeats to form the whole greedy match.
+            base = RE_REPEAT_LAZY.fullmatch(greedy.group(0)).group(1)
+        else:
+            found = lazy
+            base = lazy.group(1)
+        i, j = found.start(), found.end() - 1
+        count = len(found.group(0)) // len(base)
+        base_log10 = _most_guessable(base, size)[0] if len(base) > 1 else math.log10(max(size, 10))
+        log10 = base_log10 + math.log10(count)
+        matches.append(_match("repeat", i, j, found.group(0), log10, base_token=base, repeat_count=count))
+        pos = j + 1
+    return matches
+
+
+def _year_space(year: int) -> float:
+    return math.log10(max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE))
+
+
+def _date_matches(password: str) -> List[Dict[str, Any]]:
+    matches = []
+    for m in RE_DATE_DMY.finditer(password):
+        a, sep, b, y = int(m.group(1)), m.group(2), int(m.group(3)), m.group(4)
+        year = int(y) + (1900 if len(y) == 2 and int(y) > 50 else 2000 if len(y) == 2 else 0)
+        if (a <= 31 and b <= 12) or (a <= 12 and b <= 31):
+            log10 = math.log10(365) + _year_space(year) + (math.log10(4) if sep else 0.0)
+            matches.append(_match("date", m.start(), m.end() - 1, m.group(0), log10, year=year, separator=sep))
+    for m in RE_DATE_YMD.finditer(password):
+        year, sep, b, c = int(m.group(1)), m.group(2), int(m.group(3)), int(m.group(4))
+        if 1000 <= year <= 2099 and ((b <= 12 and c <= 31) or (c <= 12 and b <= 31)):
+            log10 = math.log10(365) + _year_space(year) + (math.log10(4) if sep else 0.0)
+            matches.append(_match("date", m.start(), m.end() - 1, m.group(0), log10, year=year, separator=sep))
+    for m in RE_YEAR.finditer(password):
+        year = int(m.group(1))
+        matches.append(_match("date", m.start(), m.end() - 1, m.group(0), _year_space(year), year=year, separator=""))
+    return matches
+
+
+def _most_guessable(password: str, size: int, matches: Optional[List[Dict[str, Any]]] = None) -> Tuple[float, List[Dict[str, Any]]]:
+    """Cheapest cover of the password by matches and brute-force characters (log10 guesses)."""
+    n = len(password)
+    if n == 0:
+        return 0.0, []
+    if matches is None:
+        matches = (
+            _dictionary_matches(password)
+            + _spatial_matches(password)
+            + _sequence_matches(password)
+            + _date_matches(password)
+        )
+    by_end: Dict[int, List[Dict[str, Any]]] = {}
+    for m in matches:
+        by_end.setdefault(m["j"], []).append(m)
+
+    char_log10 = math.log10(max(size, 10))
+    best = [0.0] + [math.inf] * n
+    back: List[Optional[Dict[str, Any]]] = [None] * (n + 1)
+    for k in range(1, n + 1):
+        best[k] = best[k - 1] + char_log10
+        for m in by_end.get(k - 1, ()):
+            # Each extra pattern in the sequence costs a little, as in zxcvbn.
+            cost = best[m["i"]] + max(m["guesses_log10"], 1.0) + 0.3
+            if cost < best[k]:
+                best[k], back[k] = cost, m
+
+    sequence = []
+    k = n
+    while k > 0:
+        m = back[k]
+        if m is None:
+            start = k - 1
+            while start > 0 and back[start] is None:
+                start -= 1
+            sequence.append(
+                _match("bruteforce", start, k - 1, password[start:k], (k - start) * char_log10)
+            )
+            k = start
+        else:
+            sequence.append(m)
+            k = m["i"]
+    sequence.reverse()
+    return best[n], sequence
+
+
+def _crack_time(log10_guesses: float) -> str:
+    log10_secs = log10_guesses - math.log10(GUESSES_PER_SECOND)
+    if log10_secs < 0:
+        return "instantly"
+    if log10_secs > math.log10(31536000 * 100):
+        return "centuries"
+    secs = 10 ** log10_secs
+    for unit, span in (("years", 31536000), ("days", 86400), ("hours", 3600), ("minutes", 60)):
+        if secs >= span:
+            return f"{int(secs / span)} {unit}"
+    return f"{int(secs)} seconds"
+
+
+def _pattern_score(log10_guesses: float) -> int:
+    for score, threshold in enumerate((3, 6, 8, 10)):
+        if log10_guesses < threshold:
+            return score
+    return 4
+
+
+PATTERN_WARNINGS = {
+    "dictionary": "Contains a common word or password",
+    "spatial": "Contains a keyboard pattern",
+    "sequence": "Contains sequential characters",
+    "repeat": "Contains repeated characters",
+    "date": "Contains a date or year",
+}
+
+
+def analyze_password(password: str) -> Dict[str, Any]:
+    """Return pattern matches, log-space guess estimates and derived ratings.
+
+    Only the first PASSWORD_STRENGTH_MAX_LENGTH characters are matched, so the
+    guess estimate for longer inputs is a conservative lower bound.
+    """
+    analyzed = password[:PASSWORD_STRENGTH_MAX_LENGTH]
+    classes = character_classes(password)
+    size = charset_size(classes)
+
+    breach_filter = load_breach_filter()
+    breached = breach_filter is not None and password in breach_filter
+    common_rank = load_dictionaries()["passwords"].get(password.lower())
+
+    matches = (
+        _dictionary_matches(analyzed)
+        + _spatial_matches(analyzed)
+        + _sequence_matches(analyzed)
+        + _date_matches(analyzed)
+        + _repeat_matches(analyzed, size)
+    )
+    log10_guesses, sequence = _most_guessable(analyzed, size, matches)
+    if breached:
+        log10_guesses = min(log10_guesses, 6.0)
+
+    return {
+        "classes": classes,
+        "charset_size": size,
+        "entropy_bits": entropy_bits(size, len(password)),
+        "guesses_log10": round(log10_guesses, 3),
+        "pattern_score": _pattern_score(log10_guesses),
+        "crack_time_estimate": _crack_time(log10_guesses),
+        "common_password_rank": common_rank,
+        "breached": breached if breach_filter is not None else None,
+        "sequence": [
+            {k: (round(v, 3) if k == "guesses_log10" else v) for k, v in m.items()} for m in sequence
+        ],
+        "patterns": sorted({m["pattern"] for m in sequence} - {"bruteforce"}),
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "build":
+        sys.exit("usage: python -m app.utils.password_strength build <wordlist> <output>")
+    with open(sys.argv[2], encoding="utf-8", errors="ignore") as f:
+        count, bits, hashes = BloomFilter.build(f, sys.argv[3])
+    print(f"{count} passwords, {bits} bits, {hashes} hashes -> {sys.argv[3]}")
@@ -0,0 +1,167 @@
+import math
+import os
+import string
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from ..config import PASSWORD_RANDOM_BLOCK_SIZE
+
+SYMBOLS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+AMBIGUOUS = "lo" + "IO" + "01"
+VOWELS = "aeiou"
+CONSONANTS = "bcdfghjkmnprstvwz"
+
+WORDLIST_PATH = Path(__file__).resolve().parent.parent / "data" / "wordlist_en_eff.txt"
+
+
+class RandomSource:
+    """Hands out unbiased random symbols drawn from large os.urandom blocks.
+
+    Bytes are mapped to an alphabet with rejection sampling: only byte values
+    below the largest multiple of the alphabet size are kept, so every symbol
+    is equally likely. For alphabets of up to 256 symbols the mapping and the
+    rejection both happen inside bytes.translate.
+    """
+
+    def __init__(self, block_size: int = PASSWORD_RANDOM_BLOCK_SIZE):
+        self.block_size = block_size
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _table(alphabet: str) -> Tuple[bytes, bytes]:
+        n = len(alphabet)
+        limit = 256 - 256 % n
+        table = bytes(ord(alphabet[b % n]) for b in range(limit)) + bytes(256 - limit)
+        return table, bytes(range(limit, 256))
+
+    def chars(self, alphabet: str, count: int) -> str:
+        """Return ``count`` characters drawn uniformly from a <=256 char ASCII alphabet."""
+        table, rejected = self._table(alphabet)
+        out = bytearray()
+        while len(out) < count:
+            want = max(self.block_size, (count - len(out)) * 2)
+            out += os.urandom(want).translate(table, rejected)
+        return out[:count].decode("ascii")
+
+    def indices(self, n: int, count: int) -> List[int]:
+        """Return ``count`` uniform integers in [0, n) for alphabets of any size."""
+        width = max(1, ((n - 1).bit_length() + 7) // 8)
+        span = 1 << (8 * width)
+        limit = span - span % n
+        out: List[int] = []
+        while len(out) < count:
+            want = max(self.block_size, (count - len(out)) * 2 * width)
+            block = os.urandom(want - want % width)
+            out.extend(
+                v % n
+                for v in (int.from_bytes(block[i:i + width], "big") for i in range(0, len(block), width))
+                if v < limit
+            )
+        return out[:count]
+
+
+@lru_cache(maxsize=1)
+def load_wordlist() -> Tuple[str, ...]:
+    """EFF large wordlist (7776 words), read once per process."""
+    words = []
+    with open(WORDLIST_PATH, encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if parts:
+                words.append(parts[-1])
+    return tuple(words)
+
+
+def build_charset(
+    include_lowercase: bool = True,
+    include_uppercase: bool = True,
+    include_numbers: bool = True,
+    include_symbols: bool = True,
+    exclude_ambiguous: bool = False,
+) -> Tuple[str, List[str], List[str]]:
+    """Return (alphabet, names of the sets used, the individual sets)."""
+    sets = []
+    for enabled, name, chars in (
+        (include_lowercase, "lowercase", string.ascii_lowercase),
+        (include_uppercase, "uppercase", string.ascii_uppercase),
+        (include_numbers, "numbers", string.digits),
+        (include_symbols, "symbols", SYMBOLS),
+    ):
+        if enabled:
+            if exclude_ambiguous:
+                chars = "".join(c for c in chars if c not in AMBIGUOUS)
+            sets.append((name, chars))
+    return "".join(c for _, c in sets), [n for n, _ in sets], [c for _, c in sets]
+
+
+def entropy_bits(alphabet_size: int, length: int) -> float:
+    if alphabet_size < 2 or length <= 0:
+        return 0.0
+    return round(length * math.log2(alphabet_size), 2)
+
+
+class PasswordGenerator:
+    """Bulk generator for random, pronounceable and diceware passwords."""
+
+    def __init__(self, source: Optional[RandomSource] = None):
+        self.source = source or RandomSource()
+
+    def random(self, length: int, alphabet: str, required: Sequence[str], count: int) -> Iterator[str]:
+        """Yield passwords containing at least one character of each required set.
+
+        Candidates missing a set are discarded rather than patched, which keeps
+        the output uniform over all valid passwords.
+        """
+        required_sets = [frozenset(r) for r in required]
+        produced = 0
+        while produced < count:
+            batch = count - produced
+            pool = self.source.chars(alphabet, batch * length)
+            for i in range(0, len(pool), length):
+                candidate = pool[i:i + length]
+                if required_sets and len(required_sets) <= length:
+                    present = set(candidate)
+                    if any(present.isdisjoint(r) for r in required_sets):
+                        continue
+                yield candidate
+                produced += 1
+
+    def pronounceable(self, length: int, count: int, capitalize: bool = False) -> Iterator[str]:
+        """Alternate consonants and vowels, starting with a consonant."""
+        n_cons = (length + 1) // 2
+        n_vow = length // 2
+        cons = self.source.chars(CONSONANTS, n_cons * count)
+        vows = self.source.chars(VOWELS, n_vow * count)
+        for i in range(count):
+            c = cons[i * n_cons:(i + 1) * n_cons]
+            v = vows[i * n_vow:(i + 1) * n_vow]
+            chars = [None] * length
+            chars[0::2] = c
+            chars[1::2] = v
+            word = "".join(chars)
+            yield word.capitalize() if capitalize else word
+
+    def diceware(
+        self, words: int, count: int, separator: str = "-", capitalize: bool = False
+    ) -> Iterator[str]:
+        wordlist = load_wordlist()
+        picks = self.source.indices(len(wordlist), words * count)
+        for i in range(count):
+            chosen = [wordlist[j] for j in picks[i * words:(i + 1) * words]]
+            if capitalize:
+                chosen = [w.capitalize() for w in chosen]
+            yield separator.join(chosen)
+
+
+def pronounceable_entropy(length: int) -> float:
+    return round(
+        ((length + 1) // 2) * math.log2(len(CONSONANTS)) + (length // 2) * math.log2(len(VOWELS)), 2
+    )
+
+
+def diceware_entropy(words: int) -> float:
+    return entropy_bits(len(load_wordlist()), words)
+
+
+password_generator = PasswordGenerator()
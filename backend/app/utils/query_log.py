@@ -0,0 +1,271 @@
+import io
+import json
+import math
+import random
+import re
+from array import array
+from itertools import chain, islice
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .http_client import percentile
+from .sql import fingerprint_query, iter_statements
+
+LOG_FORMATS = ["auto", "mysql-slow", "postgresql", "ndjson", "plain"]
+SORT_KEYS = {"total": "total_ms", "count": "count", "avg": "avg_ms", "p95": "p95_ms", "max": "max_ms"}
+
+MYSQL_QUERY_TIME_RE = re.compile(r"Query_time:\s*(\d+(?:\.\d+)?)")
+PG_DURATION_RE = re.compile(r"duration: (\d+(?:\.\d+)?) ms(?:\s+(?:statement|(?:execute|parse|bind) [^:]*):\s?(.*))?")
+PG_STATEMENT_RE = re.compile(r"\b(?:LOG|STATEMENT):\s+statement:\s?(.*)")
+EXAMPLE_CHARS = 1000
+# About 31 years; anything longer is a corrupt entry, and clamping keeps the
+# running sums finite however many such rows a log holds.
+MAX_DURATION_MS = 1e12
+DETECT_LINES = 50
+
+Entry = Tuple[str, Optional[float]]
+
+
+class QueryStats:
+    __slots__ = ("normalized", "example", "count", "timed", "total", "min", "max", "samples")
+
+    def __init__(self, normalized: str, example: str):
+        self.normalized = normalized
+        self.example = example[:EXAMPLE_CHARS]
+        self.count = 0
+        self.timed = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.samples = array("d")
+
+
+class QueryLogAggregator:
+    """Per-fingerprint counts and durations in bounded memory.
+
+    Sums, minima and maxima are exact; p95 comes from a fixed-size uniform
+    reservoir of durations per fingerprint (exact until it fills). The
+    number of fingerprints is capped; queries beyond it still count towards
+    the totals and are reported as untracked.
+    """
+
+    def __init__(self, dialect: str = "generic", max_fingerprints: int = 10000, reservoir_size: int = 512, seed=None):
+        self.dialect = dialect
+        self.max_fingerprints = max_fingerprints
+        self.reservoir_size = reservoir_size
+        self.rng = random.Random(seed)
+        self.stats: Dict[str, QueryStats] = {}
+        self.queries = 0
+        self.timed = 0
+        self.total = 0.0
+        self.untracked = 0
+
+    def add(self, query: str, duration_ms: Optional[float] = None) -> None:
+        self.queries += 1
+        if duration_ms is not None:
+            duration_ms = min(max(duration_ms, 0.0), MAX_DURATION_MS)
+            self.timed += 1
+            self.total += duration_ms
+        fingerprint, normalized = fingerprint_query(query.strip(), self.dialect)
+        stats = self.stats.get(fingerprint)
+        if stats is None:
+            if len(self.stats) >= self.max_fingerprints:
+                self.untracked += 1
+                return
+            stats = self.stats[fingerprint] = QueryStats(normalized, query.strip())
+        stats.count += 1
+        if duration_ms is None:
+            return
+        stats.timed += 1
+        stats.total += duration_ms
+        if duration_ms < stats.min:
+            stats.min = duration_ms
+        if duration_ms > stats.max:
+            stats.max = duration_ms
+        if len(stats.samples) < self.reservoir_size:
+            stats.samples.append(duration_ms)
+        else:
+            slot = self.rng.randrange(stats.timed)
+            if slot < self.reservoir_size:
+                stats.samples[slot] = duration_ms
+
+    def report(self, top: int = 50, sort: str = "total") -> Dict[str, Any]:
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+        rows = [self._row(fingerprint, stats) for fingerprint, stats in self.stats.items()]
+        key = SORT_KEYS[sort]
+        rows.sort(key=lambda r: (r[key] is not None, r[key] or 0, r["count"]), reverse=True)
+        return {
+            "summary": {
+                "queries": self.queries,
+                "timed_queries": self.timed,
+                "fingerprints": len(self.stats),
+                "untracked_queries": self.untracked,
+                "total_ms": round(self.total, 3),
+            },
+            "queries": rows[:top],
+        }
+
+    def _row(self, fingerprint: str, stats: QueryStats) -> Dict[str, Any]:
+        timed = stats.timed
+        return {
+            "fingerprint": fingerprint,
+            "normalized": stats.normalized,
+            "example": stats.example,
+            "count": stats.count,
+            "count_share": round(stats.count / self.queries, 4) if self.queries else 0,
+            "total_ms": round(stats.total, 3) if timed else None,
+            "time_share": round(stats.total / self.total, 4) if timed and self.total else None,
+            "avg_ms": round(stats.total / timed, 3) if timed else None,
+            "min_ms": round(stats.min, 3) if timed else None,
+            "max_ms": round(stats.max, 3) if timed else None,
+            "p95_ms": round(percentile(sorted(stats.samples), 95), 3) if timed else None,
+            "p95_exact": timed <= self.reservoir_size if timed else None,
+        }
+
+
+def parse_mysql_slow(lines: Iterable[str]) -> Iterator[Entry]:
+    """Entries of a MySQL/MariaDB slow query log: ``#`` header lines (with
+    Query_time in seconds) followed by the statement text."""
+    duration: Optional[float] = None
+    query: List[str] = []
+    in_entry = False
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if line.startswith("#"):
+            if query:
+                yield "\n".join(query), duration
+                query, duration = [], None
+            in_entry = True
+            match = MYSQL_QUERY_TIME_RE.search(line)
+            if match:
+                duration = float(match.group(1)) * 1000
+            continue
+        if not in_entry:
+            continue  # server banner before the first entry
+        lowered = line.strip().lower()
+        if not query and (not lowered or lowered.startswith(("set timestamp=", "use "))):
+            continue
+        query.append(line)
+    if query:
+        yield "\n".join(query), duration
+
+
+def parse_postgresql(lines: Iterable[str]) -> Iterator[Entry]:
+    """``duration: N ms  statement: ...`` entries from a PostgreSQL log,
+    with tab-indented continuation lines. A ``statement:`` line followed by a
+    bare ``duration:`` line (log_statement plus log_min_duration_statement)
+    counts once, with that duration."""
+    pending: Optional[List[str]] = None
+    pending_duration: Optional[float] = None
+    timed = False  # whether ``pending`` already has its duration
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if pending is not None and line[:1] in ("\t", " ") and line.strip():
+            pending.append(line.strip())
+            continue
+        match = PG_DURATION_RE.search(line)
+        if match and match.group(2) is None:
+            if pending is not None and not timed:
+                pending_duration, timed = float(match.group(1)), True
+            continue
+        if match or PG_STATEMENT_RE.search(line):
+            if pending is not None:
+                yield "\n".join(pending), pending_duration
+            if match:
+                pending, pending_duration, timed = [match.group(2)], float(match.group(1)), True
+            else:
+                pending, pending_duration, timed = [PG_STATEMENT_RE.search(line).group(1)], None, False
+            continue
+        if pending is not None:
+            yield "\n".join(pending), pending_duration
+            pending = None
+    if pending is not None:
+        yield "\n".join(pending), pending_duration
+
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[Entry]:
+    """One JSON object per line with ``query`` (or ``statement``/``sql``) and
+    ``duration_ms`` (or ``query_time`` in seconds)."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(record, dict):
+            continue
+        query = record.get("query") or record.get("statement") or record.get("sql")
+        if not isinstance(query, str):
+            continue
+        duration = record.get("duration_ms")
+        if duration is None and record.get("query_time") is not None:
+            duration = _number(record["query_time"])
+            duration = _number(duration * 1000) if duration is not None else None
+        else:
+            duration = _number(duration)
+        yield query, duration
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        number = float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+    # NaN/Infinity would poison the sums and cannot be rendered as JSON.
+    return number if number is not None and math.isfinite(number) else None
+
+
+def detect_log_format(head: List[str]) -> str:
+    for line in head:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped.startswith("{"):
+            return "ndjson"
+        if "Query_time:" in stripped or stripped.startswith(("# Time:", "# User@Host:")) or "mysqld, Version:" in stripped:
+            return "mysql-slow"
+        if PG_DURATION_RE.search(stripped) or PG_STATEMENT_RE.search(stripped):
+            return "postgresql"
+    return "plain"
+
+
+def iter_log(fileobj: IO[bytes], log_format: str = "auto", dialect: str = "generic") -> Tuple[str, Iterator[Entry]]:
+    """Resolve the format from the first lines and return ``(format, entries)``."""
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(LOG_FORMATS)}")
+    text = io.TextIOWrapper(fileobj, encoding="utf-8", errors="replace", newline="")
+    head = list(islice(text, DETECT_LINES))
+    if log_format == "auto":
+        log_format = detect_log_format(head)
+    lines = chain(head, text)
+    if log_format == "mysql-slow":
+        return log_format, parse_mysql_slow(lines)
+    if log_format == "postgresql":
+        return log_format, parse_postgresql(lines)
+    if log_format == "ndjson":
+        return log_format, parse_ndjson(lines)
+    statements = iter_statements(lines, dialect)
+    return log_format, (("".join(v for _, v in tokens), None) for _, tokens, _ in statements)
+
+
+def aggregate_log(
+    fileobj: IO[bytes],
+    log_format: str = "auto",
+    dialect: str = "generic",
+    top: int = 50,
+    sort: str = "total",
+    max_fingerprints: int = 10000,
+    reservoir_size: int = 512,
+) -> Dict[str, Any]:
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+    log_format, entries = iter_log(fileobj, log_format, dialect)
+    aggregator = QueryLogAggregator(dialect, max_fingerprints, reservoir_size)
+    for query, duration in entries:
+        if query.strip():
+            aggregator.add(query, duration)
+    report = aggregator.report(top, sort)
+    report["summary"].update({"format": log_format, "dialect": dialect})
+    return report
@@ -0,0 +1,247 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from unidecode import unidecode
+except ImportError:
+    unidecode = None
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:
+    lazy_pinyin = None
+
+NON_WORD_RE = re.compile(r"[^\w\s-]")
+SEPARATOR_RE = re.compile(r"[-\s]+")
+KANA_RE = re.compile(r"[぀-ヿ]+")
+HAN_RE = re.compile(r"[㐀-䶿一-鿿]+")
+
+LATIN = {
+    "ß": "ss", "æ": "ae", "Æ": "AE", "œ": "oe", "Œ": "OE", "ø": "o", "Ø": "O",
+    "þ": "th", "Þ": "TH", "ð": "d", "Ð": "D", "đ": "d", "Đ": "D", "ł": "l", "Ł": "L",
+    "ħ": "h", "Ħ": "H", "ı": "i", "ŋ": "ng", "Ŋ": "NG", "ĸ": "k", "ŀ": "l", "Ŀ": "L",
+    "&": " and ",
+}
+
+CYRILLIC = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "yo", "ж": "zh",
+    "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu",
+    "я": "ya",
+    # Ukrainian, Belarusian, Serbian, Macedonian
+    "є": "ye", "і": "i", "ї": "yi", "ґ": "g", "ў": "u", "ђ": "dj", "ј": "j", "љ": "lj",
+    "њ": "nj", "ћ": "c", "џ": "dz", "ѓ": "gj", "ќ": "kj", "ѕ": "dz",
+}
+
+GREEK = {
+    "α": "a", "β": "v", "γ": "g", "δ": "d", "ε": "e", "ζ": "z", "η": "i", "θ": "th",
+    "ι": "i", "κ": "k", "λ": "l", "μ": "m", "ν": "n", "ξ": "x", "ο": "o", "π": "p",
+    "ρ": "r", "σ": "s", "ς": "s", "τ": "t", "υ": "y", "φ": "f", "χ": "ch", "ψ": "ps",
+    "ω": "o", "ά": "a", "έ": "e", "ή": "i", "ί": "i", "ό": "o", "ύ": "y", "ώ": "o",
+    "ϊ": "i", "ϋ": "y", "ΐ": "i", "ΰ": "y",
+}
+
+# Revised Romanization of Korean, per jamo (no sound-change rules).
+HANGUL_INITIALS = ["g", "kk", "n", "d", "tt", "r", "m", "b", "pp", "s", "ss", "", "j", "jj", "ch", "k", "t", "p", "h"]
+HANGUL_MEDIALS = [
+    "a", "ae", "ya", "yae", "eo", "e", "yeo", "ye", "o", "wa", "wae", "oe", "yo", "u", "wo", "we", "wi",
+    "yu", "eu", "ui", "i",
+]
+HANGUL_FINALS = [
+    "", "k", "k", "k", "n", "n", "n", "t", "l", "k", "m", "l", "l", "l", "p", "l", "m", "p", "p", "t",
+    "t", "ng", "t", "t", "k", "t", "p", "t",
+]
+
+# Modified Hepburn; digraphs are matched before single kana.
+KANA = {
+    "あ": "a", "い": "i", "う": "u", "え": "e", "お": "o",
+    "か": "ka", "き": "ki", "く": "ku", "け": "ke", "こ": "ko",
+    "が": "ga", "ぎ": "gi", "ぐ": "gu", "げ": "ge", "ご": "go",
+    "さ": "sa", "し": "shi", "す": "su", "せ": "se", "そ": "so",
+    "ざ": "za", "じ": "ji", "ず": "zu", "ぜ": "ze", "ぞ": "zo",
+    "た": "ta", "ち": "chi", "つ": "tsu", "て": "te", "と": "to",
+    "だ": "da", "ぢ": "ji", "づ": "zu", "で": "de", "ど": "do",
+    "な": "na", "に": "ni", "ぬ": "nu", "ね": "ne", "の": "no",
+    "は": "ha", "ひ": "hi", "ふ": "fu", "へ": "he", "ほ": "ho",
+    "ば": "ba", "び": "bi", "ぶ": "bu", "べ": "be", "ぼ": "bo",
+    "ぱ": "pa", "ぴ": "pi", "ぷ": "pu", "ぺ": "pe", "ぽ": "po",
+    "ま": "ma", "み": "mi", "む": "mu", "め": "me", "も": "mo",
+    "や": "ya", "ゆ": "yu", "よ": "yo",
+    "ら": "ra", "り": "ri", "る": "ru", "れ": "re", "ろ": "ro",
+    "わ": "wa", "ゐ": "i", "ゑ": "e", "を": "o", "ん": "n", "ゔ": "vu",
+    "ぁ": "a", "ぃ": "i", "ぅ": "u", "ぇ": "e", "ぉ": "o", "ゃ": "ya", "ゅ": "yu", "ょ": "yo",
+    "きゃ": "kya", "きゅ": "kyu", "きょ": "kyo", "ぎゃ": "gya", "ぎゅ": "gyu", "ぎょ": "gyo",
+    "しゃ": "sha", "しゅ": "shu", "しょ": "sho", "じゃ": "ja", "じゅ": "ju", "じょ": "jo",
+    "ちゃ": "cha", "ちゅ": "chu", "ちょ": "cho", "にゃ": "nya", "にゅ": "nyu", "にょ": "nyo",
+    "ひゃ": "hya", "ひゅ": "hyu", "ひょ": "hyo", "びゃ": "bya", "びゅ": "byu", "びょ": "byo",
+    "ぴゃ": "pya", "ぴゅ": "pyu", "ぴょ": "pyo", "みゃ": "mya", "みゅ": "myu", "みょ": "myo",
+    "りゃ": "rya", "りゅ": "ryu", "りょ": "ryo",
+    "ふぁ": "fa", "ふぃ": "fi", "ふぇ": "fe", "ふぉ": "fo", "てぃ": "ti", "でぃ": "di",
+}
+# Katakana sit 0x60 above their hiragana counterparts.
+KANA.update({"".join(chr(ord(c) + 0x60) for c in k): v for k, v in list(KANA.items())})
+KANA_TOKEN_RE = re.compile("|".join(sorted(map(re.escape, KANA), key=len, reverse=True)))
+
+
+def _with_upper(table: Dict[str, str]) -> Dict[str, str]:
+    out = dict(table)
+    for ch, latin in table.items():
+        upper = ch.upper()
+        if upper != ch and upper not in out and len(upper) == 1:
+            out[upper] = latin.capitalize()
+    return out
+
+
+@lru_cache(maxsize=1)
+def transliteration_table() -> Dict[int, str]:
+    """Codepoint -> ASCII map for str.translate, built once per process."""
+    table: Dict[int, str] = {}
+    for source in (LATIN, _with_upper(CYRILLIC), _with_upper(GREEK)):
+        table.update({ord(k): v for k, v in source.items()})
+    for index in range(11172):
+        initial, rest = divmod(index, 588)
+        medial, final = divmod(rest, 28)
+        table[0xAC00 + index] = HANGUL_INITIALS[initial] + HANGUL_MEDIALS[medial] + HANGUL_FINALS[final]
+    return table
+
+
+def _romanize_kana(run: str) -> str:
+    out: List[str] = []
+    double_next = False
+    pos = 0
+    while pos < len(run):
+        ch = run[pos]
+        if ch in "っッ":
+            double_next = True
+            pos += 1
+            continue
+        if ch == "ー":
+            if out and out[-1]:
+                out.append(out[-1][-1])
+            pos += 1
+            continue
+        match = KANA_TOKEN_RE.match(run, pos)
+        if not match:
+            out.append(ch)
+            pos += 1
+            continue
+        latin = KANA[match.group()]
+        if double_next:
+            latin = ("t" if latin.startswith("ch") else latin[0]) + latin
+            double_next = False
+        out.append(latin)
+        pos = match.end()
+    return "".join(out)
+
+
+def _romanize_han(run: str) -> str:
+    if lazy_pinyin is not None:
+        return " " + " ".join(lazy_pinyin(run)) + " "
+    return run
+
+
+def transliterate(text: str) -> str:
+    """Best-effort ASCII rendering of ``text``.
+
+    Built-in tables cover Latin extras, Cyrillic, Greek, Hangul and kana;
+    Chinese uses pypinyin (a requirement) and anything else unidecode, when
+    installed. Remaining characters are reduced to their base letters or
+    dropped.
+    """
+    if KANA_RE.search(text):
+        text = KANA_RE.sub(lambda m: " " + _romanize_kana(m.group()) + " ", text)
+    if lazy_pinyin is not None and HAN_RE.search(text):
+        text = HAN_RE.sub(lambda m: _romanize_han(m.group()), text)
+    text = text.translate(transliteration_table())
+    if unidecode is not None and not text.isascii():
+        text = unidecode(text)
+    text = unicodedata.normalize("NFKD", text)
+    return text.encode("ascii", "ignore").decode("ascii")
+
+
+def slugify(
+    text: str,
+    separator: str = "-",
+    lowercase: bool = True,
+    max_length: Optional[int] = None,
+    transliterate_text: bool = True,
+) -> str:
+    if transliterate_text:
+        text = transliterate(text)
+    else:
+        text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    if lowercase:
+        text = text.lower()
+    text = NON_WORD_RE.sub("", text)
+    # A function replacement keeps backslashes in the separator literal.
+    text = SEPARATOR_RE.sub(lambda m: separator, text).strip("-_" + separator)
+    if max_length and len(text) > max_length:
+        cut = text[:max_length]
+        # Prefer cutting at a word boundary.
+        if separator and separator in cut and text[max_length:max_length + len(separator)] != separator:
+            cut = cut.rsplit(separator, 1)[0]
+        text = cut.strip("-_" + separator)
+    return text
+
+
+class SlugAllocator:
+    """Hands out slugs unique against a taken set, suffixing -2, -3, ...
+
+    The next free suffix per base slug is remembered, so n titles that all
+    slug to the same base cost O(n) rather than O(n^2) probes.
+    """
+
+    def __init__(self, existing: Iterable[str] = (), separator: str = "-", max_length: Optional[int] = None):
+        self.taken = set(existing)
+        self.separator = separator
+        self.max_length = max_length
+        self._next: Dict[str, int] = {}
+
+    def allocate(self, slug: str) -> str:
+        if slug not in self.taken:
+            self.taken.add(slug)
+            return slug
+        n = self._next.get(slug, 2)
+        while True:
+            suffix = f"{self.separator}{n}"
+            base = slug
+            if self.max_length and len(base) + len(suffix) > self.max_length:
+                room = self.max_length - len(suffix)
+                if room < 1:
+                    # No room for any of the base: fall back to the bare number.
+                    if len(str(n)) > self.max_length:
+                        raise ValueError(f"max_length {self.max_length} is too short to keep {slug!r} unique")
+                    base, suffix = "", str(n)
+                else:
+                    base = base[:room].rstrip("-_" + self.separator)
+            candidate = base + suffix
+            n += 1
+            if candidate not in self.taken:
+                break
+        self._next[slug] = n
+        self.taken.add(candidate)
+        return candidate
+
+
+def slugify_batch(
+    titles: List[str],
+    existing: Iterable[str] = (),
+    separator: str = "-",
+    lowercase: bool = True,
+    max_length: Optional[int] = None,
+    transliterate_text: bool = True,
+    fallback: str = "untitled",
+) -> Dict[str, object]:
+    allocator = SlugAllocator(existing, separator, max_length)
+    fallback = fallback[:max_length] if max_length else fallback
+    results = []
+    suffixed = 0
+    for title in titles:
+        base = slugify(title, separator, lowercase, max_length, transliterate_text) or fallback
+        slug = allocator.allocate(base)
+        suffixed += slug != base
+        results.append({"title": title, "slug": slug, "base": base})
+    return {"count": len(results), "suffixed": suffixed, "slugs": results}
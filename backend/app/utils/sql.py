@@ -0,0 +1,623 @@
+import hashlib
+import io
+import json
+import re
+from functools import lru_cache
+from itertools import chain
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from ..config import (
+    MAX_SQL_INDENT,
+    MAX_SQL_WIDTH,
+    MIN_SQL_WIDTH,
+    SQL_FINGERPRINT_CACHE_CHARS,
+    SQL_FINGERPRINT_CACHE_SIZE,
+)
+
+Token = Tuple[str, str]
+
+DIALECTS = ["generic", "postgresql", "mysql", "sqlite", "tsql"]
+KEYWORD_CASES = ["upper", "lower", "preserve"]
+
+KEYWORDS = frozenset("""
+ADD ALL ALTER AND ANY AS ASC BEGIN BETWEEN BY CASCADE CASE CAST CHECK COALESCE COLUMN COMMIT CONFLICT
+CONSTRAINT COUNT CREATE CROSS CURRENT_DATE CURRENT_TIME CURRENT_TIMESTAMP DATABASE DEFAULT DELETE DESC
+DISTINCT DO DROP ELSE END ESCAPE EXCEPT EXISTS EXPLAIN FALSE FETCH FIRST FOR FOREIGN FROM FULL FUNCTION
+GRANT GROUP HAVING IF ILIKE IN INDEX INNER INSERT INTERSECT INTO IS JOIN KEY LAST LATERAL LEFT LIKE LIMIT
+MAX MIN NATURAL NEXT NOT NULL NULLS OF OFFSET ON ONLY OR ORDER OUTER OVER PARTITION PRIMARY PROCEDURE
+REFERENCES RENAME REPLACE RETURNING REVOKE RIGHT ROLLBACK ROW ROWS SCHEMA SELECT SET SOME SUM AVG TABLE
+TEMPORARY THEN TO TRANSACTION TRIGGER TRUE TRUNCATE UNION UNIQUE UPDATE USING VALUES VIEW WHEN WHERE
+WINDOW WITH
+BIGINT BINARY BLOB BOOLEAN CHAR DATE DECIMAL DOUBLE FLOAT INT INTEGER INTERVAL NUMERIC REAL SMALLINT TEXT
+TIME TIMESTAMP VARCHAR
+""".split())
+
+DIALECT_KEYWORDS = {
+    "generic": frozenset(),
+    "postgresql": frozenset("""
+        BIGSERIAL BYTEA CONCURRENTLY EXTENSION JSONB LANGUAGE MATERIALIZED NOTHING PLPGSQL RETURNS SEQUENCE
+        SERIAL TIMESTAMPTZ UUID VACUUM ANALYZE
+    """.split()),
+    "mysql": frozenset("""
+        AUTO_INCREMENT CHARSET DELIMITER DUPLICATE ENGINE IGNORE LONGTEXT MEDIUMTEXT REGEXP SHOW STRAIGHT_JOIN
+        TINYINT UNSIGNED USE
+    """.split()),
+    "sqlite": frozenset("""
+        AUTOINCREMENT GLOB PRAGMA REINDEX ROWID VACUUM WITHOUT
+    """.split()),
+    "tsql": frozenset("""
+        DECLARE EXEC GO IDENTITY NOLOCK NVARCHAR OUTPUT PROC TOP TRY CATCH
+    """.split()),
+}
+
+# Keywords that start a clause on a new line at the current block indent.
+CLAUSES = frozenset("""
+SELECT FROM WHERE GROUP ORDER HAVING LIMIT OFFSET FETCH UNION INTERSECT EXCEPT INSERT VALUES UPDATE SET
+DELETE RETURNING WITH WINDOW JOIN LEFT RIGHT INNER FULL CROSS NATURAL
+""".split())
+# Keywords written like function calls, with no space before "(".
+FUNCTION_KEYWORDS = frozenset("""
+AVG CAST CHAR COALESCE COUNT DECIMAL LEFT MAX MIN NUMERIC REPLACE RIGHT SUM VARCHAR
+""".split())
+JOIN_MODIFIERS = frozenset("LEFT RIGHT INNER FULL OUTER CROSS NATURAL".split())
+# Clause keywords that do not break when they continue the previous keyword.
+CLAUSE_CONTINUATIONS = {"FROM": {"DELETE"}, "SET": {"UPDATE"}}
+
+# MySQL version comments (/*! ... */) execute; optimizer hints (/*+ ... */) steer plans.
+EXECUTABLE_COMMENTS = ("/*!", "/*+")
+DELIMITER_DIALECTS = ("generic", "mysql")
+# Tokens ending this close to the end of a partial buffer are re-lexed with
+# the next chunk, since more input could extend them (dollar-quote tags).
+LOOKAHEAD_CHARS = 256
+
+OPERATOR_CHARS = set("-+*/%<>=~!^&|@#:?")
+WORD_CHARS = re.compile(r"[\w$]")
+
+
+@lru_cache(maxsize=None)
+def _lexer(dialect: str) -> "re.Pattern":
+    """One compiled alternation per dialect; tokens are matched left to right
+    so every character is examined once."""
+    if dialect not in DIALECTS:
+        raise ValueError(f"dialect must be one of {', '.join(DIALECTS)}")
+    mysql = dialect == "mysql"
+    # Most tokens are whitespace, words and punctuation, so those are tried
+    # first; the word pattern steps aside for prefixed literals (E'', N'', U&"").
+    prefixes = r"[NnBbXx]'" + (r"|_\w+'" if mysql else r"|[Uu]&['\"]")
+    if dialect in ("postgresql", "generic"):
+        prefixes += r"|[Ee]'"
+    parts = [
+        ("ws", r"\s+"),
+        ("name", rf"(?!{prefixes})[^\W\d][\w$]*" + (r"|\#\#?\w+" if dialect == "tsql" else "")),
+        ("number", r"0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"),
+        ("punct", r"[(),;.{}]"),
+        # MySQL only starts a -- comment when whitespace follows: 1--1 is 1 - -1.
+        ("comment", (r"--(?=\s|\Z)[^\n]*" if mysql else r"--[^\n]*") + r"|/\*.*?(?:\*/|\Z)" + (r"|\#[^\n]*" if mysql else "")),
+    ]
+    if dialect in ("postgresql", "generic"):
+        parts.append(("string", r"\$\$.*?(?:\$\$|\Z)|\$(?P<tag>[^\W\d]\w*)\$.*?(?:\$(?P=tag)\$|\Z)"))
+        parts.append(("string", r"[Ee]'[^'\\]*(?:(?:''|\\.)[^'\\]*)*'?"))
+    if mysql:
+        parts.append(("string", r"(?:[NnBbXx]|_\w+)?'[^'\\]*(?:(?:''|\\.)[^'\\]*)*'?"))
+        parts.append(("string", r"\"[^\"\\]*(?:(?:\"\"|\\.)[^\"\\]*)*\"?"))
+    else:
+        parts.append(("string", r"(?:[NnBbXx]|[Uu]&)?'[^']*(?:''[^']*)*'?"))
+        parts.append(("ident", r"(?:[Uu]&)?\"[^\"]*(?:\"\"[^\"]*)*\"?"))
+    if dialect in ("mysql", "sqlite", "generic"):
+        parts.append(("ident", r"`[^`]*(?:``[^`]*)*`?"))
+    if dialect in ("tsql", "sqlite"):
+        parts.append(("ident", r"\[[^\]]*\]?"))
+    parts += [
+        ("param", r"\?\d*|(?<!:):[^\W\d]\w*|\$\d+|%\(\w+\)s|%s|@@?\w+"),
+        ("op", r"::|<=>|<>|!=|<=|>=|\|\|/?|->>|->|\#>>|\#>|@>|<@|&&|<<|>>|[-+*/%<>=~!^&|@\#:?]"),
+        ("punct", r"[\[\]]"),
+        ("other", r"."),
+    ]
+    groups = "|".join(f"(?P<{kind}{i}>{pattern})" for i, (kind, pattern) in enumerate(parts))
+    return re.compile(groups, re.S)
+
+
+def tokenize(text: str, dialect: str = "generic") -> Iterator[Token]:
+    """Yield ``(kind, value)`` tokens covering ``text`` exactly.
+
+    Kinds: ws, comment, string, ident (quoted identifier), number, name,
+    keyword, param, op, punct, other. Unterminated strings and comments run
+    to the end of the input rather than failing.
+    """
+    pattern, kinds, keywords = _lexer_tables(dialect)
+    prev = None
+    for match in pattern.finditer(text):
+        kind = kinds[match.lastindex]
+        value = match.group()
+        # Words after a dot are column/table names even when reserved.
+        if kind == "name" and value.upper() in keywords and prev != ".":
+            kind = "keyword"
+        if kind != "ws" and kind != "comment":
+            prev = value
+        yield kind, value
+
+
+@lru_cache(maxsize=None)
+def _lexer_tables(dialect: str):
+    pattern = _lexer(dialect)
+    kinds = {v: k.rstrip("0123456789") for k, v in pattern.groupindex.items() if k != "tag"}
+    return pattern, kinds, KEYWORDS | DIALECT_KEYWORDS[dialect]
+
+
+def minify(tokens: Iterable[Token]) -> str:
+    """Join tokens without comments or redundant whitespace.
+
+    A single space is kept only where gluing two tokens would change how the
+    result lexes (two words, ``- -``, ``E 'x'`` and the like); literals are
+    emitted verbatim, and so are version comments and optimizer hints.
+    """
+    out: List[str] = []
+    last = ""
+    for kind, value in tokens:
+        if kind == "ws":
+            continue
+        if kind == "comment":
+            if not value.startswith(EXECUTABLE_COMMENTS):
+                continue
+            if last:
+                out.append(" ")
+            out.append(value)
+            last = " "  # always separate the comment from what follows
+            continue
+        if last and (last == " " or _needs_space(last, value)):
+            out.append(" ")
+        out.append(value)
+        last = value
+    return "".join(out)
+
+
+def _needs_space(prev: str, value: str) -> bool:
+    a, b = prev[-1], value[0]
+    if WORD_CHARS.match(a) and (WORD_CHARS.match(b) or b in "'\"`"):
+        return True
+    # 'a' 'b' and "x" "y" would merge into one literal with an escaped quote.
+    if a in "'\"`" and b in "'\"`":
+        return True
+    if a in OPERATOR_CHARS and b in OPERATOR_CHARS:
+        return True
+    if a == "/" and b == "*" or a == "*" and b == "/":
+        return True
+    # "1 .5" and "t. 1" would merge into a different number.
+    return a.isdigit() and b == "." or a == "." and b.isdigit()
+
+
+class SqlFormatter:
+    """Reindents a token stream in one pass.
+
+    Clause keywords start a new line at the current block level, AND/OR
+    start continuation lines, subqueries and CREATE TABLE column lists open
+    an indented block, and long lines are wrapped greedily at ``width``.
+    Parentheses that do not open a block (function calls, IN lists, OVER
+    clauses) stay inline.
+    """
+
+    def __init__(self, indent: int = 2, keyword_case: str = "upper", width: int = 80):
+        if keyword_case not in KEYWORD_CASES:
+            raise ValueError(f"keyword_case must be one of {', '.join(KEYWORD_CASES)}")
+        if not 0 <= indent <= MAX_SQL_INDENT:
+            raise ValueError(f"indent must be between 0 and {MAX_SQL_INDENT}")
+        if not MIN_SQL_WIDTH <= width <= MAX_SQL_WIDTH:
+            raise ValueError(f"width must be between {MIN_SQL_WIDTH} and {MAX_SQL_WIDTH}")
+        self.unit = " " * indent
+        self.keyword_case = keyword_case
+        self.width = width
+
+    def format(self, tokens: Iterable[Token]) -> str:
+        self.lines: List[str] = []
+        self.line: List[str] = []
+        self.indent = ""
+        self.content = False
+        self.col = 0
+        self.base = 0
+        self.level = 0
+        # (opens a block, base to restore, indent level of the opening line)
+        self.stack: List[Tuple[bool, int, int]] = []
+        self.prev: Optional[Token] = None
+        self.prev_keyword = ""
+        self.unary = False
+        self.between = False
+        self.statement: List[str] = []
+
+        for token, next_token, gap, newline_before in _significant(tokens):
+            self._token(token, next_token, gap, newline_before)
+        self._flush()
+        while self.lines and not self.lines[-1]:
+            self.lines.pop()
+        return "\n".join(self.lines)
+
+    # -- output helpers -------------------------------------------------
+
+    def _flush(self):
+        if self.content:
+            self.lines.append(self.indent + "".join(self.line))
+        self.line = []
+        self.content = False
+        self.col = len(self.indent)
+
+    def _newline(self, level: int):
+        self._flush()
+        self.level = level
+        self.indent = self.unit * level
+        self.col = len(self.indent)
+
+    def _emit(self, text: str, space: bool, wrap: bool = True):
+        if self.content and space:
+            if wrap and self.col + 1 + len(text) > self.width:
+                self._newline(self.base + 1)
+            else:
+                self.line.append(" ")
+                self.col += 1
+        self.line.append(text)
+        self.col += len(text)
+        self.content = True
+
+    def _in_block(self) -> bool:
+        return not self.stack or self.stack[-1][0]
+
+    # -- token handling -------------------------------------------------
+
+    def _token(self, token: Token, next_token: Optional[Token], gap: bool, newline_before: bool):
+        kind, value = token
+        upper = value.upper() if kind == "keyword" else ""
+
+        if kind == "comment":
+            if newline_before and self.content:
+                self._newline(self.base)
+            self._emit(value, True, wrap=False)
+            if value.startswith(("--", "#")):
+                self._newline(self.base)
+            return
+
+        if value == ";":
+            self._emit(";", False)
+            self._newline(0)
+            self.lines.append("")
+            self.base, self.stack, self.statement = 0, [], []
+            self.prev, self.prev_keyword, self.unary, self.between = None, "", False, False
+            return
+
+        if kind == "keyword":
+            if self.keyword_case == "upper":
+                value = upper
+            elif self.keyword_case == "lower":
+                value = value.lower()
+            if len(self.statement) < 3:
+                self.statement.append(upper)
+            if self._in_block() and self._starts_clause(upper, next_token):
+                self._newline(self.base)
+            elif upper in ("AND", "OR") and self._in_block():
+                if upper == "AND" and self.between:
+                    self.between = False
+                else:
+                    self._newline(self.base + 1)
+            if upper == "BETWEEN":
+                self.between = True
+
+        if value == "(":
+            opens_subquery = next_token is not None and next_token[0] == "keyword" and next_token[1].upper() in (
+                "SELECT", "WITH",
+            )
+            opens_columns = (
+                self.statement[:2] == ["CREATE", "TABLE"] or self.statement[:3] == ["CREATE", "TEMPORARY", "TABLE"]
+            ) and not self.stack and self.prev is not None and self.prev[0] in ("name", "ident")
+            self._emit("(", self._space_before(token, gap))
+            self.stack.append((opens_subquery or opens_columns, self.base, self.level))
+            if opens_subquery or opens_columns:
+                self.base = self.level + 1
+                self._newline(self.base)
+            self._remember(token, kind, upper)
+            return
+
+        if value == ")":
+            block, saved, level = self.stack.pop() if self.stack else (False, self.base, self.level)
+            if block:
+                self.base = saved
+                self._newline(level)
+            self._emit(")", False)
+            self._remember(token, kind, upper)
+            return
+
+        if value == ",":
+            self._emit(",", False)
+            if self.stack and self.stack[-1][0] and self.statement[:1] == ["CREATE"] and len(self.stack) == 1:
+                self._newline(self.base)
+            self._remember(token, kind, upper)
+            return
+
+        self._emit(value, self._space_before(token, gap))
+        self._remember(token, kind, upper)
+
+    def _starts_clause(self, upper: str, next_token: Optional[Token]) -> bool:
+        if upper not in CLAUSES:
+            return False
+        if upper in ("LEFT", "RIGHT") and next_token is not None and next_token[1] == "(":
+            return False  # LEFT()/RIGHT() string functions
+        if upper == "JOIN" and self.prev_keyword in JOIN_MODIFIERS:
+            return False
+        if upper in JOIN_MODIFIERS and self.prev_keyword in JOIN_MODIFIERS:
+            return False
+        if self.prev_keyword in CLAUSE_CONTINUATIONS.get(upper, ()) and self.prev is not None and self.prev[0] == "keyword":
+            return False
+        return True
+
+    def _space_before(self, token: Token, gap: bool) -> bool:
+        kind, value = token
+        if self.prev is None:
+            return False
+        prev_kind, prev_value = self.prev
+        if self.unary:
+            return False
+        if value in (",", ")", ".", "::", "]") or prev_value in ("(", ".", "::", "["):
+            return False
+        if value == "(" and prev_kind in ("name", "ident", "keyword") and not gap:
+            return False  # function call, as written
+        return True
+
+    def _remember(self, token: Token, kind: str, upper: str):
+        prev = self.prev
+        self.unary = kind == "op" and token[1] in ("-", "+") and (
+            prev is None or prev[0] in ("op", "keyword") or prev[1] in ("(", ",")
+        )
+        self.prev = token
+        self.prev_keyword = upper if kind == "keyword" else ""
+
+
+def _significant(tokens: Iterable[Token]) -> Iterator[Tuple[Token, Optional[Token], bool, bool]]:
+    """Drop whitespace, yielding each token with the next non-comment token,
+    whether whitespace preceded it and whether that whitespace held a newline."""
+    pending: List[Tuple[Token, bool, bool]] = []
+    gap = newline = False
+    for token in tokens:
+        if token[0] == "ws":
+            gap = True
+            newline = newline or "\n" in token[1]
+            continue
+        if token[0] != "comment":
+            for held, held_gap, held_newline in pending:
+                yield held, token, held_gap, held_newline
+            pending = []
+        pending.append((token, gap, newline))
+        gap = newline = False
+    for held, held_gap, held_newline in pending:
+        yield held, None, held_gap, held_newline
+
+
+def normalize(tokens: Iterable[Token]) -> str:
+    """Canonical text for a query: literals and parameters become ``?``,
+    ``IN (?, ?, ...)`` becomes ``IN (?+)``, repeated VALUES rows collapse to
+    one, comments and spacing are dropped, keywords are upper-cased and
+    unquoted names lower-cased."""
+    out: List[Tuple[str, str]] = []
+    opens: List[int] = []
+    last_row = None  # (index of its ")", values) for the last all-placeholder group
+    for kind, value in tokens:
+        if kind == "ws" or kind == "comment" or value == ";":
+            continue
+        if kind in ("string", "number", "param") or kind == "keyword" and value.upper() in ("TRUE", "FALSE"):
+            # A sign in front of a literal is part of it: "= -5" -> "= ?".
+            if out and out[-1][1] in ("-", "+") and (
+                len(out) == 1 or out[-2][0] in ("op", "keyword") or out[-2][1] in ("(", ",")
+            ):
+                out.pop()
+            out.append(("?", "?"))
+            continue
+        if kind == "keyword":
+            value = value.upper()
+        elif kind == "name":
+            value = value.lower()
+        if value == "(":
+            opens.append(len(out))
+        elif value == ")" and opens:
+            start = opens.pop()
+            inner = tuple(v for _, v in out[start + 1:])
+            if inner and all(v in ("?", "?+", ",") for v in inner):
+                if start and out[start - 1][1] == "IN":
+                    del out[start + 1:]
+                    out.append(("?", "?+"))
+                elif last_row is not None and last_row[0] == start - 2 and last_row[1] == inner and out[start - 1][1] == ",":
+                    del out[start - 1:]
+                    continue
+                out.append(("punct", ")"))
+                last_row = (len(out) - 1, inner)
+                continue
+        out.append((kind, value))
+
+    parts: List[str] = []
+    prev: Optional[Tuple[str, str]] = None
+    for kind, value in out:
+        if prev is not None and not (
+            value in (",", ")", ".", "::")
+            or prev[1] in ("(", ".", "::")
+            or value == "(" and (prev[0] == "name" or prev[1] in FUNCTION_KEYWORDS)
+        ):
+            parts.append(" ")
+        parts.append(value)
+        prev = (kind, value)
+    return "".join(parts)
+
+
+def fingerprint_query(query: str, dialect: str = "generic") -> Tuple[str, str]:
+    """``(fingerprint, normalized)``; the fingerprint is a 64-bit BLAKE2b of
+    the normalized text, so it is stable across processes and releases of
+    the same normalization rules.
+
+    Only short queries go through the process-wide cache, so a dump of huge
+    INSERTs is not kept alive between requests.
+    """
+    if len(query) <= SQL_FINGERPRINT_CACHE_CHARS:
+        return _fingerprint_cached(query, dialect)
+    return _fingerprint(query, dialect)
+
+
+@lru_cache(maxsize=SQL_FINGERPRINT_CACHE_SIZE)
+def _fingerprint_cached(query: str, dialect: str) -> Tuple[str, str]:
+    return _fingerprint(query, dialect)
+
+
+def _fingerprint(query: str, dialect: str) -> Tuple[str, str]:
+    normalized = normalize(tokenize(query, dialect))
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest(), normalized
+
+
+def format_sql(
+    text: str,
+    dialect: str = "generic",
+    indent: int = 2,
+    keyword_case: str = "upper",
+    width: int = 80,
+) -> str:
+    return SqlFormatter(indent, keyword_case, width).format(tokenize(text, dialect))
+
+
+def minify_sql(text: str, dialect: str = "generic") -> str:
+    return minify(tokenize(text, dialect))
+
+
+def iter_statements(chunks: Iterable[str], dialect: str = "generic") -> Iterator[Tuple[int, List[Token], Optional[str]]]:
+    """Split a script arriving in text chunks into statements.
+
+    Yields ``(line, tokens, delimiter)``: the line the statement starts on,
+    its tokens without the terminator, and the delimiter that ended it (None
+    for a trailing unterminated statement). Terminators inside strings,
+    dollar quotes and comments are ignored, and for MySQL-style scripts a
+    ``DELIMITER`` line switches the terminator, as the mysql client does.
+
+    Only the unfinished tail of the input is buffered. When one token spans
+    many chunks (a large literal) the buffer is allowed to double before it
+    is lexed again, which keeps the total work linear.
+    """
+    pattern, kinds, keywords = _lexer_tables(dialect)
+    delimiter_commands = dialect in DELIMITER_DIALECTS
+    delimiter = ";"
+    tokens: List[Token] = []
+    started = False
+    line = start = 1
+    prev = None
+    buf = ""
+    want = 0
+
+    for chunk in chain(chunks, [None]):
+        final = chunk is None
+        if not final:
+            buf += chunk
+            if len(buf) < want:
+                continue
+        pos = 0
+        restart = True
+        while restart:
+            restart = False
+            for match in pattern.finditer(buf, pos):
+                if not final and match.end() > len(buf) - LOOKAHEAD_CHARS - len(delimiter):
+                    break  # may continue in the next chunk
+                kind = kinds[match.lastindex]
+                value = match.group()
+                cut = -1
+                if delimiter == ";":
+                    if value == ";":
+                        cut = match.start()
+                elif kind != "ws" and kind != "comment" and kind != "ident":
+                    # Like the mysql client, match a custom delimiter anywhere
+                    # outside literals, including inside a word (END$$).
+                    if kind == "string":
+                        cut = match.start() if buf.startswith(delimiter, match.start()) else -1
+                    else:
+                        cut = buf.find(delimiter, match.start(), match.end() + len(delimiter) - 1)
+                if cut >= 0:
+                    if cut > match.start():
+                        tokens.append((kind, buf[match.start():cut]))
+                        started = True
+                    if started:
+                        yield start, tokens, delimiter
+                    tokens, started = [], False
+                    pos = cut + len(delimiter)
+                    restart = True
+                    break
+                if kind == "name" and value.upper() in keywords and prev != ".":
+                    kind = "keyword"
+                if delimiter_commands and not started and kind in ("name", "keyword") and value.upper() == "DELIMITER":
+                    end = buf.find("\n", match.end())
+                    if end < 0 and not final:
+                        break
+                    end = len(buf) if end < 0 else end + 1
+                    words = buf[match.end():end].split()
+                    if words:
+                        delimiter = words[0]
+                    tokens = []
+                    line += buf.count("\n", match.start(), end)
+                    pos, restart = end, True
+                    break
+                if kind != "ws" and (kind != "comment" or value.startswith(EXECUTABLE_COMMENTS)):
+                    if not started:
+                        tokens, started, start = [], True, line
+                    prev = value
+                if started:
+                    tokens.append((kind, value))
+                line += value.count("\n")
+                pos = match.end()
+        buf = buf[pos:]
+        want = 2 * len(buf)
+
+    if started:
+        yield start, tokens, None
+
+
+def _read_chunks(fileobj: IO[bytes], size: int) -> Iterator[str]:
+    # newline="" keeps CRLFs inside literals byte-for-byte.
+    text = io.TextIOWrapper(fileobj, encoding="utf-8", errors="replace", newline="")
+    return iter(lambda: text.read(size), "")
+
+
+def _statement_text(tokens: List[Token]) -> str:
+    return "".join(value for _, value in tokens).strip()
+
+
+def stream_split(
+    fileobj: IO[bytes],
+    dialect: str = "generic",
+    minified: bool = False,
+    chunk_size: int = 1024 * 1024,
+    batch: int = 1000,
+) -> Iterator[str]:
+    """NDJSON, one record per statement, yielded in batches."""
+    out = []
+    for index, (line, tokens, delimiter) in enumerate(iter_statements(_read_chunks(fileobj, chunk_size), dialect)):
+        text = minify(tokens) if minified else _statement_text(tokens)
+        out.append(json.dumps({"index": index, "line": line, "delimiter": delimiter, "statement": text}) + "\n")
+        if len(out) >= batch:
+            yield "".join(out)
+            out = []
+    if out:
+        yield "".join(out)
+
+
+def stream_minify(
+    fileobj: IO[bytes],
+    dialect: str = "generic",
+    chunk_size: int = 1024 * 1024,
+    batch: int = 1000,
+) -> Iterator[str]:
+    """A minified script, one statement per line.
+
+    Statements that were terminated by a custom delimiter are written back
+    under a DELIMITER line so the output runs in the mysql client unchanged.
+    """
+    out = []
+    current = ";"
+    for _, tokens, delimiter in iter_statements(_read_chunks(fileobj, chunk_size), dialect):
+        delimiter = delimiter or ";"  # terminate a trailing statement
+        if delimiter != current:
+            out.append(f"DELIMITER {delimiter}\n")
+            current = delimiter
+        out.append(minify(tokens) + delimiter + "\n")
+        if len(out) >= batch:
+            yield "".join(out)
+            out = []
+    if current != ";":
+        out.append("DELIMITER ;\n")
+    if out:
+        yield "".join(out)
@@ -0,0 +1,335 @@
+import csv
+import io
+import json
+import re
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+UTC = timezone.utc
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+EPOCH_UNITS = {"unix": 1, "unix_ms": 10**3, "unix_us": 10**6, "unix_ns": 10**9}
+INPUT_FORMATS = ["auto", *EPOCH_UNITS, "iso", "rfc2822"]
+OUTPUT_FORMATS = ["iso", *EPOCH_UNITS, "rfc2822"]
+
+NUMBER_RE = re.compile(r"^[+-]?(\d+)(?:\.(\d+))?$")
+DIGIT_RE = re.compile(r"\d")
+SHAPE_CACHE_SIZE = 256
+# Rows sampled per CSV column to decide whether it holds timestamps.
+SAMPLE_ROWS = 20
+
+
+@lru_cache(maxsize=128)
+def get_zone(name: str):
+    """Cached tz lookup; ZoneInfo construction reads tzdata from disk."""
+    if name.upper() in ("UTC", "Z"):
+        return UTC
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {name}")
+
+
+def epoch_unit(digits: int) -> str:
+    """Unit for an integer part of ``digits`` digits, with the same seconds/ms
+    cut-off as /timestamp/convert (more than 10 digits is not seconds)."""
+    if digits <= 10:
+        return "unix"
+    if digits <= 13:
+        return "unix_ms"
+    if digits <= 16:
+        return "unix_us"
+    return "unix_ns"
+
+
+def parse_epoch(value: str, unit: str, assume_tz=UTC) -> datetime:
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Not a number: {value!r}")
+    if not number.is_finite():
+        raise ValueError(f"Not a finite number: {value!r}")
+    try:
+        seconds = number / EPOCH_UNITS[unit]
+        whole = int(seconds // 1)
+        micros = int((seconds - whole) * 1_000_000)
+    except InvalidOperation:
+        raise ValueError(f"Epoch value out of range: {value!r}")
+    return EPOCH + timedelta(seconds=whole, microseconds=micros)
+
+
+def parse_iso(value: str, assume_tz=UTC) -> datetime:
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00").replace("z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=assume_tz)
+
+
+def parse_rfc2822(value: str, assume_tz=UTC) -> datetime:
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        raise ValueError(f"Not an RFC 2822 date: {value!r}")
+    return dt if dt.tzinfo else dt.replace(tzinfo=assume_tz)
+
+
+PARSERS: Dict[str, Callable[..., datetime]] = {
+    "iso": parse_iso,
+    "rfc2822": parse_rfc2822,
+    **{unit: (lambda v, tz=UTC, unit=unit: parse_epoch(v, unit, tz)) for unit in EPOCH_UNITS},
+}
+
+
+def shape_of(value: str) -> Tuple:
+    """Values with the same shape share a format: digits collapse to 9 and
+    epoch numbers are keyed by integer-part length."""
+    match = NUMBER_RE.match(value)
+    if match:
+        return ("number", len(match.group(1)))
+    return ("text", DIGIT_RE.sub("9", value))
+
+
+def detect_format(value: str) -> str:
+    match = NUMBER_RE.match(value)
+    if match:
+        return epoch_unit(len(match.group(1)))
+    for name in ("iso", "rfc2822"):
+        try:
+            PARSERS[name](value)
+            return name
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized timestamp: {value!r}")
+
+
+class ColumnParser:
+    """Parses one column of values, inferring each value shape's format once.
+
+    Logs rarely mix formats within a column, so after the first row nearly
+    every value is a dict hit on its shape followed by a direct parse.
+    """
+
+    def __init__(self, fmt: str = "auto", assume_tz=UTC):
+        if fmt not in INPUT_FORMATS:
+            raise ValueError(f"from_format must be one of {', '.join(INPUT_FORMATS)}")
+        self.fmt = fmt
+        self.assume_tz = assume_tz
+        self.shapes: Dict[Tuple, str] = {}
+        self.formats: Dict[str, int] = {}
+
+    def parse(self, value: Any) -> Tuple[datetime, str]:
+        text = str(value).strip()
+        if not text:
+            raise ValueError("Empty value")
+        fmt = self.fmt
+        if fmt == "auto":
+            shape = shape_of(text)
+            fmt = self.shapes.get(shape)
+            if fmt is None:
+                fmt = detect_format(text)
+                if len(self.shapes) < SHAPE_CACHE_SIZE:
+                    self.shapes[shape] = fmt
+        return PARSERS[fmt](text, self.assume_tz), fmt
+
+    def convert(self, value: Any, formatter: "Formatter") -> Tuple[Any, str]:
+        """Parse and format ``value``, counting its format only on success."""
+        dt, fmt = self.parse(value)
+        output = formatter(dt)
+        self.formats[fmt] = self.formats.get(fmt, 0) + 1
+        return output, fmt
+
+
+class Formatter:
+    def __init__(self, output: str = "iso", tz=UTC, pattern: Optional[str] = None):
+        if output not in OUTPUT_FORMATS:
+            raise ValueError(f"output must be one of {', '.join(OUTPUT_FORMATS)}")
+        self.output = output
+        self.tz = tz
+        self.pattern = pattern
+
+    def __call__(self, dt: datetime) -> Any:
+        if self.pattern:
+            return dt.astimezone(self.tz).strftime(self.pattern)
+        if self.output in EPOCH_UNITS:
+            delta = dt - EPOCH
+            micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+            return micros * EPOCH_UNITS[self.output] // 1_000_000
+        local = dt.astimezone(self.tz)
+        if self.output == "rfc2822":
+            return format_datetime(local)
+        return local.isoformat()
+
+
+def convert_values(values: Sequence[Any], parser: ColumnParser, formatter: Formatter) -> Dict[str, Any]:
+    results = []
+    failed = 0
+    for value in values:
+        try:
+            output, fmt = parser.convert(value, formatter)
+            results.append({"input": value, "output": output, "format": fmt})
+        except (ValueError, OverflowError) as e:
+            failed += 1
+            results.append({"input": value, "output": None, "error": str(e)})
+    return {
+        "summary": {
+            "total": len(results),
+            "converted": len(results) - failed,
+            "failed": failed,
+            "formats": parser.formats,
+        },
+        "results": results,
+    }
+
+
+def _timestamp_columns(header: List[str], rows: List[List[str]], wanted: Optional[List[str]]) -> List[int]:
+    if wanted:
+        missing = [c for c in wanted if c not in header]
+        if missing:
+            raise ValueError(f"Columns not found: {', '.join(missing)}")
+        return [header.index(c) for c in wanted]
+    found = []
+    for index in range(len(header)):
+        sample = [r[index].strip() for r in rows if index < len(r) and r[index].strip()]
+        if not sample:
+            continue
+        if all(_looks_like_timestamp(value) for value in sample):
+            found.append(index)
+    return found
+
+
+def _looks_like_timestamp(value: str) -> bool:
+    # Small integers (ids, counts) parse as epochs too; require at least
+    # nine digits, i.e. 1973 onwards in seconds.
+    match = NUMBER_RE.match(value)
+    if match:
+        return len(match.group(1)) >= 9
+    try:
+        detect_format(value)
+    except ValueError:
+        return False
+    return True
+
+
+def stream_convert(
+    fileobj: IO[bytes],
+    mode: str,
+    parser_factory: Callable[[], ColumnParser],
+    formatter: Formatter,
+    columns: Optional[List[str]] = None,
+    replace: bool = False,
+    batch_rows: int = 1000,
+) -> Iterator[str]:
+    """Convert a spooled upload row by row, yielding output in batches.
+
+    ``lines`` input yields NDJSON records; ``csv`` input yields CSV with the
+    timestamp columns converted in place or appended as ``<column>_<output>``.
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8", errors="replace", newline="")
+    if mode == "lines":
+        parser = parser_factory()
+        out = []
+        for line in text:
+            value = line.strip().lstrip("\ufeff")
+            if not value:
+                continue
+            try:
+                output, fmt = parser.convert(value, formatter)
+                out.append(_json_line(value, output, fmt, None))
+            except (ValueError, OverflowError) as e:
+                out.append(_json_line(value, None, None, str(e)))
+            if len(out) >= batch_rows:
+                yield "".join(out)
+                out = []
+        if out:
+            yield "".join(out)
+        return
+
+    dialect, reader, header = _open_csv(text)
+    if header is None:
+        return
+    head_rows = [row for _, row in zip(range(SAMPLE_ROWS), reader)]
+    targets = _timestamp_columns(header, head_rows, columns)
+    parsers = {i: parser_factory() for i in targets}
+    suffix = "formatted" if formatter.pattern else formatter.output
+
+    buf = io.StringIO()
+    writer = csv.writer(buf, dialect)
+    writer.writerow(header if replace else header + [f"{header[i]}_{suffix}" for i in targets])
+
+    def convert(row: List[str]) -> List[str]:
+        converted = []
+        for i in targets:
+            cell = row[i] if i < len(row) else ""
+            try:
+                converted.append(parsers[i].convert(cell, formatter)[0] if cell.strip() else "")
+            except (ValueError, OverflowError):
+                converted.append("")
+        if replace:
+            row = list(row)
+            for i, value in zip(targets, converted):
+                if i < len(row) and value != "":
+                    row[i] = value
+            return row
+        return row + converted
+
+    count = 0
+    for row in _chain_rows(head_rows, reader):
+        writer.writerow(convert(row))
+        count += 1
+        if count % batch_rows == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def _open_csv(text: IO[str]):
+    sample = text.read(64 * 1024)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(_chain(sample, text), dialect)
+    header = next(reader, None)
+    if header is not None:
+        header[0] = header[0].lstrip("\ufeff")
+    return dialect, reader, header
+
+
+def check_csv_columns(fileobj: IO[bytes], columns: Optional[List[str]]) -> None:
+    """Fail early on a missing header or unknown ``columns``, before any
+    output is streamed; leaves ``fileobj`` rewound."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8", errors="replace", newline="")
+    try:
+        _, _, header = _open_csv(text)
+    finally:
+        text.detach()
+        fileobj.seek(0)
+    if header is None:
+        raise ValueError("CSV upload is empty")
+    missing = [c for c in columns or () if c not in header]
+    if missing:
+        raise ValueError(f"Columns not found: {', '.join(missing)}")
+
+
+def _json_line(value: str, output: Any, fmt: Optional[str], error: Optional[str]) -> str:
+    record = {"input": value, "output": output}
+    if error:
+        record["error"] = error
+    else:
+        record["format"] = fmt
+    return json.dumps(record) + "\n"
+
+
+def _chain(first: str, rest: IO[str]) -> Iterator[str]:
+    # csv.reader needs lines; re-split the sniffed prefix and continue.
+    buffered = io.StringIO(first + rest.readline())
+    yield from buffered
+    yield from rest
+
+
+def _chain_rows(head: List[List[str]], reader) -> Iterator[List[str]]:
+    yield from head
+    yield from reader
@@ -0,0 +1,114 @@
+import tempfile
+from typing import IO, AsyncIterator, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from ..config import MAX_UPLOAD_BYTES
+
+
+def is_multipart(request: Request) -> bool:
+    return request.headers.get("content-type", "").startswith("multipart/form-data")
+
+
+async def read_upload(
+    request: Request, field: str = "file", max_bytes: int = MAX_UPLOAD_BYTES
+) -> Tuple[bytes, Optional[str]]:
+    """Read a single uploaded file from a multipart form field or the raw body."""
+    if is_multipart(request):
+        form = await request.form()
+        upload = form.get(field)
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail=f"Multipart field '{field}' is required")
+        if upload.size is not None and upload.size > max_bytes:
+            raise HTTPException(status_code=413, detail="Upload too large")
+        return await upload.read(), upload.filename
+
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > max_bytes:
+        raise HTTPException(status_code=413, detail="Upload too large")
+
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail="Upload too large")
+        chunks.append(chunk)
+    if not size:
+        raise HTTPException(status_code=400, detail="Request body is empty")
+    return b"".join(chunks), request.headers.get("x-file-name")
+
+
+async def read_uploads(
+    request: Request, field: str = "files", max_bytes: int = MAX_UPLOAD_BYTES
+) -> List[Tuple[bytes, Optional[str]]]:
+    """Read every file sent under a repeated multipart field, or the raw body as one file."""
+    if not is_multipart(request):
+        return [await read_upload(request, max_bytes=max_bytes)]
+
+    form = await request.form()
+    uploads = [u for u in form.getlist(field) if not isinstance(u, str)]
+    if not uploads:
+        raise HTTPException(status_code=400, detail=f"Multipart field '{field}' is required")
+    if sum(u.size or 0 for u in uploads) > max_bytes:
+        raise HTTPException(status_code=413, detail="Upload too large")
+    return [(await u.read(), u.filename) for u in uploads]
+
+
+async def spool_upload(
+    request: Request, field: str = "file", max_bytes: int = MAX_UPLOAD_BYTES
+) -> Tuple[IO[bytes], Optional[str]]:
+    """Stream an upload into a temporary file so it can be mmapped instead of held in memory."""
+    if is_multipart(request):
+        form = await request.form()
+        upload = form.get(field)
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail=f"Multipart field '{field}' is required")
+        if upload.size is not None and upload.size > max_bytes:
+            raise HTTPException(status_code=413, detail="Upload too large")
+        return upload.file, upload.filename
+
+    spool = tempfile.TemporaryFile()
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail="Upload too large")
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.flush()
+    return spool, request.headers.get("x-file-name")
+
+
+async def iter_upload(
+    request: Request,
+    field: str = "file",
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = 1024 * 1024,
+) -> AsyncIterator[bytes]:
+    """Yield an upload chunk by chunk from a multipart field or the raw body."""
+    if is_multipart(request):
+        form = await request.form()
+        upload = form.get(field)
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail=f"Multipart field '{field}' is required")
+        if upload.size is not None and upload.size > max_bytes:
+            raise HTTPException(status_code=413, detail="Upload too large")
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > max_bytes:
+        raise HTTPException(status_code=413, detail="Upload too large")
+
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail="Upload too large")
+        yield chunk
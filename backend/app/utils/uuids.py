@@ -0,0 +1,305 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+NAMESPACES = {
+    "dns": uuid.NAMESPACE_DNS,
+    "url": uuid.NAMESPACE_URL,
+    "oid": uuid.NAMESPACE_OID,
+    "x500": uuid.NAMESPACE_X500,
+}
+UUID_KINDS = ["1", "4", "5", "6", "7", "ulid"]
+CROCKFORD32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_CROCKFORD_VALUES = {c: i for i, c in enumerate(CROCKFORD32)}
+
+# Fast-path shape checks run before any int/UUID object is built.
+UUID_RE = re.compile(
+    r"^(?:urn:uuid:)?(\{)?([0-9a-f]{8})-?([0-9a-f]{4})-?([0-9a-f]{4})-?([0-9a-f]{4})-?([0-9a-f]{12})(?(1)\})$",
+    re.IGNORECASE,
+)
+ULID_RE = re.compile(r"^[0-7][0-9A-HJKMNP-TV-Z]{25}$", re.IGNORECASE)
+
+# Offset between the Gregorian epoch (1582-10-15) and the Unix epoch in 100ns ticks.
+GREGORIAN_OFFSET = 0x01B21DD213814000
+
+# Byte tables for stamping version/variant bits into raw random bytes.
+_VERSION_TABLES = {v: bytes((b & 0x0F) | (v << 4) for b in range(256)) for v in (4, 5, 6, 7, 8)}
+_VARIANT_TABLE = bytes((b & 0x3F) | 0x80 for b in range(256))
+
+
+def resolve_namespace(namespace: Optional[str]) -> uuid.UUID:
+    """Named namespace (dns, url, oid, x500) or any UUID string; defaults to dns."""
+    if not namespace:
+        return uuid.NAMESPACE_DNS
+    named = NAMESPACES.get(namespace.lower())
+    if named is not None:
+        return named
+    try:
+        return uuid.UUID(namespace)
+    except ValueError:
+        raise ValueError("namespace must be dns, url, oid, x500 or a UUID")
+
+
+def _format(raw: bytes) -> List[str]:
+    """Split a buffer of 16-byte records into canonical UUID strings."""
+    h = raw.hex()
+    return [
+        f"{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}"
+        for i in range(0, len(h), 32)
+    ]
+
+
+def _stamp(buf: bytearray, version: int) -> bytearray:
+    buf[6::16] = buf[6::16].translate(_VERSION_TABLES[version])
+    buf[8::16] = buf[8::16].translate(_VARIANT_TABLE)
+    return buf
+
+
+def uuid4_batch(count: int) -> List[str]:
+    """``count`` random UUIDs from a single urandom draw."""
+    return _format(_stamp(bytearray(os.urandom(16 * count)), 4))
+
+
+def uuid5_batch(names: Sequence[str], namespace: uuid.UUID) -> List[str]:
+    """Name-based UUIDs; the namespace is hashed once and the SHA-1 state copied per name."""
+    base = hashlib.sha1(namespace.bytes)
+    buf = bytearray()
+    for name in names:
+        h = base.copy()
+        h.update(name.encode("utf-8"))
+        buf += h.digest()[:16]
+    return _format(_stamp(buf, 5))
+
+
+def uuid1_batch(count: int) -> List[str]:
+    return [str(uuid.uuid1()) for _ in range(count)]
+
+
+class MonotonicClock:
+    """Time-ordered id state shared by v6, v7 and ULID generators.
+
+    Within one process every id is strictly greater than the previous one,
+    even for many ids in the same millisecond, so B-tree inserts stay
+    append-only. When the per-tick counter is exhausted the timestamp is
+    advanced by one tick instead of blocking.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._v7_ms = -1
+        self._v7_counter = 0
+        self._v6_ticks = -1
+        self._ulid_ms = -1
+        self._ulid_random = 0
+        self._node = int.from_bytes(os.urandom(6), "big") | (1 << 40)  # multicast bit: random node
+        self._clock_seq = int.from_bytes(os.urandom(2), "big") & 0x3FFF
+
+    def uuid7(self, count: int) -> List[str]:
+        # RFC 9562 method 1: a 12-bit counter in rand_a, seeded randomly
+        # with its top bit clear on each new millisecond.
+        rand = os.urandom(10 * count)
+        out = bytearray()
+        with self._lock:
+            ms, counter = self._v7_ms, self._v7_counter
+            for i in range(count):
+                now = time.time_ns() // 1_000_000
+                if now > ms:
+                    ms, counter = now, int.from_bytes(rand[10 * i:10 * i + 2], "big") & 0x7FF
+                else:
+                    counter += 1
+                    if counter > 0xFFF:
+                        ms, counter = ms + 1, 0
+                out += ms.to_bytes(6, "big")
+                out += (0x7000 | counter).to_bytes(2, "big")
+                out += rand[10 * i + 2:10 * i + 10]
+            self._v7_ms, self._v7_counter = ms, counter
+        out[8::16] = out[8::16].translate(_VARIANT_TABLE)
+        return _format(out)
+
+    def uuid6(self, count: int) -> List[str]:
+        out = bytearray()
+        with self._lock:
+            ticks = self._v6_ticks
+            node, clock_seq = self._node, self._clock_seq
+            for _ in range(count):
+                ticks = max(time.time_ns() // 100 + GREGORIAN_OFFSET, ticks + 1)
+                value = (
+                    ((ticks >> 12) << 80)
+                    | (0x6 << 76)
+                    | ((ticks & 0xFFF) << 64)
+                    | ((0x8000 | clock_seq) << 48)
+                    | node
+                )
+                out += value.to_bytes(16, "big")
+            self._v6_ticks = ticks
+        return _format(out)
+
+    def ulid(self, count: int) -> List[str]:
+        # ULID spec monotonicity: same millisecond -> previous random part + 1.
+        rand = os.urandom(10 * count)
+        values = []
+        with self._lock:
+            ms, random_part = self._ulid_ms, self._ulid_random
+            for i in range(count):
+                now = time.time_ns() // 1_000_000
+                if now > ms:
+                    ms, random_part = now, int.from_bytes(rand[10 * i:10 * i + 10], "big")
+                else:
+                    random_part += 1
+                    if random_part >> 80:
+                        ms, random_part = ms + 1, int.from_bytes(rand[10 * i:10 * i + 10], "big")
+                values.append((ms << 80) | random_part)
+            self._ulid_ms, self._ulid_random = ms, random_part
+        return [encode_ulid(v) for v in values]
+
+
+def encode_ulid(value: int) -> str:
+    chars = [CROCKFORD32[(value >> shift) & 0x1F] for shift in range(125, -5, -5)]
+    return "".join(chars)
+
+
+clock = MonotonicClock()
+
+
+def generate(kind: str, count: int) -> List[str]:
+    if kind == "4":
+        return uuid4_batch(count)
+    if kind == "7":
+        return clock.uuid7(count)
+    if kind == "6":
+        return clock.uuid6(count)
+    if kind == "ulid":
+        return clock.ulid(count)
+    if kind == "1":
+        return uuid1_batch(count)
+    raise ValueError(f"Unsupported version. Available: {', '.join(k for k in UUID_KINDS if k != '5')}")
+
+
+def generate_batches(kind: str, count: int, batch_size: int) -> Iterator[List[str]]:
+    remaining = count
+    while remaining > 0:
+        batch = min(remaining, batch_size)
+        yield generate(kind, batch)
+        remaining -= batch
+
+
+def decode_ulid(text: str) -> int:
+    value = 0
+    for ch in text.upper():
+        value = (value << 5) | _CROCKFORD_VALUES[ch]
+    return value
+
+
+def _variant(value: int) -> str:
+    top = value >> 61 & 0x7
+    if top < 4:
+        return uuid.RESERVED_NCS
+    if top < 6:
+        return uuid.RFC_4122
+    if top == 6:
+        return uuid.RESERVED_MICROSOFT
+    return uuid.RESERVED_FUTURE
+
+
+def _iso(seconds: float) -> Optional[str]:
+    try:
+        return datetime.fromtimestamp(seconds, timezone.utc).isoformat(timespec="microseconds").replace("+00:00", "Z")
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+def embedded_timestamp(value: int, version: int) -> Optional[str]:
+    """Creation time carried by a v1, v6 or v7 UUID (given as a 128-bit int)."""
+    if version == 1:
+        ticks = ((value >> 64) & 0xFFF) << 48 | ((value >> 80) & 0xFFFF) << 32 | value >> 96
+    elif version == 6:
+        ticks = (value >> 80) << 12 | (value >> 64) & 0xFFF
+    elif version == 7:
+        return _iso((value >> 80) / 1000)
+    else:
+        return None
+    return _iso((ticks - GREGORIAN_OFFSET) / 10_000_000)
+
+
+def parse_id(text: str) -> Dict[str, Any]:
+    """Classify one UUID or ULID string; invalid input never raises."""
+    text = text.strip()
+    match = UUID_RE.match(text)
+    if match:
+        value = int("".join(match.groups()[1:]), 16)
+        variant = _variant(value)
+        version = (value >> 76) & 0xF if variant == uuid.RFC_4122 else None
+        result = {
+            "input": text,
+            "valid": True,
+            "type": "uuid",
+            "uuid": str(uuid.UUID(int=value)),
+            "version": version,
+            "variant": variant,
+        }
+        if value == 0:
+            result["type"] = "nil"
+        elif value == (1 << 128) - 1:
+            result["type"] = "max"
+        timestamp = embedded_timestamp(value, version) if version else None
+        if timestamp:
+            result["timestamp"] = timestamp
+        return result
+
+    if ULID_RE.match(text):
+        value = decode_ulid(text)
+        return {
+            "input": text,
+            "valid": True,
+            "type": "ulid",
+            "ulid": text.upper(),
+            "uuid": str(uuid.UUID(int=value)),
+            "timestamp": _iso((value >> 80) / 1000),
+        }
+    return {"input": text, "valid": False, "error": "Invalid UUID/ULID format"}
+
+
+def validate_ids(items: Iterable[str], invalid_only: bool = False) -> Dict[str, Any]:
+    """Parse many ids in one pass, with per-kind counts and duplicate detection."""
+    results = []
+    kinds: Counter = Counter()
+    seen = set()
+    total = valid = duplicates = 0
+    earliest = latest = None
+
+    for item in items:
+        result = parse_id(item)
+        total += 1
+        if result["valid"]:
+            valid += 1
+            kind = result["type"] if result["type"] != "uuid" else f"v{result['version'] or '?'}"
+            kinds[kind] += 1
+            canonical = result["uuid"]
+            result["duplicate"] = canonical in seen
+            duplicates += result["duplicate"]
+            seen.add(canonical)
+            ts = result.get("timestamp")
+            if ts:
+                earliest = ts if earliest is None or ts < earliest else earliest
+                latest = ts if latest is None or ts > latest else latest
+        if not invalid_only or not result["valid"]:
+            results.append(result)
+
+    return {
+        "summary": {
+            "total": total,
+            "valid": valid,
+            "invalid": total - valid,
+            "duplicates": duplicates,
+            "by_type": dict(kinds),
+            "earliest_timestamp": earliest,
+            "latest_timestamp": latest,
+        },
+        "results": results,
+    }
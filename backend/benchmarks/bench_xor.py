@@ -0,0 +1,48 @@
+"""Compare the old per-character XOR with the bytes-level implementation.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_xor [size_mb ...]
+"""
+
+import os
+import sys
+import time
+
+from app.utils.xor import XorStream, backend, legacy_xor, xor_bytes
+
+KEY = b"benchmark-key-0123456789"
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main(sizes_mb):
+    print(f"xor backend: {backend()}")
+    print(f"{'size':>8} {'legacy MB/s':>12} {'bytes MB/s':>12} {'stream MB/s':>12} {'speedup':>8}")
+    for size_mb in sizes_mb:
+        size = int(size_mb * 1024 * 1024)
+        data = os.urandom(size)
+        text = data.decode("latin-1")
+
+        legacy = timed(legacy_xor, text, KEY.decode("latin-1"))
+        whole = timed(xor_bytes, data, KEY)
+
+        def streamed():
+            stream = XorStream(KEY)
+            for i in range(0, size, 1024 * 1024):
+                stream.update(data[i:i + 1024 * 1024])
+
+        chunked = timed(streamed)
+        assert xor_bytes(data, KEY).decode("latin-1") == legacy_xor(text, KEY.decode("latin-1"))
+        print(
+            f"{size_mb:>6}MB {size_mb / legacy:>12.1f} {size_mb / whole:>12.1f} "
+            f"{size_mb / chunked:>12.1f} {legacy / whole:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main([float(arg) for arg in sys.argv[1:]] or [1, 4, 16])